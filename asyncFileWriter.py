@@ -0,0 +1,69 @@
+import asyncio
+import os
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+async def run_blocking(executor: Optional[Executor], function: Callable[..., Any], *args: Any) -> Any:
+    """Call a blocking function on the executor, or inline when there is none"""
+    if executor is None:
+        return function(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+
+
+class AsyncFileWriter:
+    """File writer for coroutines that does its disk I/O on an executor thread
+
+    Chunks are collected in memory and handed to the executor once buffer_size bytes are pending, so
+    open/write/fsync/close never block the event loop. With fsync_bytes set, the data is flushed to disk
+    every fsync_bytes written and at close, batching the syncs instead of one per chunk. Without an
+    executor every call runs inline, as plain file writes would.
+    """
+
+    def __init__(self, path: Path, mode: str = 'wb', executor: Optional[Executor] = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE, fsync_bytes: Optional[int] = None):
+        self.path = path
+        self.mode = mode
+        self.executor = executor
+        self.buffer_size = buffer_size
+        self.fsync_bytes = fsync_bytes
+        self.buffer = bytearray()
+        self.unsynced = 0
+        self.file: Any = None
+
+    async def __aenter__(self) -> 'AsyncFileWriter':
+        self.file = await run_blocking(self.executor, open, self.path, self.mode)
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        try:
+            # Whatever arrived is kept even on error, so an interrupted download can resume from it
+            await self.flush(sync=self.fsync_bytes is not None)
+        finally:
+            await run_blocking(self.executor, self.file.close)
+
+    async def write(self, chunk: bytes) -> None:
+        """Queue a chunk, writing the buffer out once it is full"""
+        self.buffer += chunk
+        if len(self.buffer) >= self.buffer_size:
+            await self.flush(sync=self.fsync_bytes is not None and self.unsynced + len(self.buffer) >= self.fsync_bytes)
+
+    async def flush(self, sync: bool = False) -> None:
+        """Write the pending buffer, and with sync=True force everything written so far to disk"""
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        self.unsynced += len(data)
+        await run_blocking(self.executor, self.write_data, data, sync)
+        if sync:
+            self.unsynced = 0
+
+    def write_data(self, data: bytes, sync: bool) -> None:
+        """Blocking part of a flush, run on the executor"""
+        if data:
+            self.file.write(data)
+        if sync:
+            self.file.flush()
+            os.fsync(self.file.fileno())
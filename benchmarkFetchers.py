@@ -0,0 +1,239 @@
+import asyncio
+import aiohttp
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+import argparse
+from dotenv import load_dotenv
+from rateLimiter import AdaptiveRateLimiter
+from retryPolicy import RetryPolicy
+from jsonBackend import write_json
+from mockOpenApiServer import add_mock_server_arguments, create_server_from_args
+from fetchAssemblyData import AssemblyDataFetcher
+from filterBillsAndFetchVotes import BillsFilterAndVoteFetcher
+from fetchConferenceData import ConferenceDataFetcher
+from downloadConferencePdfs import ConferencePdfDownloader
+
+load_dotenv()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class RequestRecorder:
+    """aiohttp trace hooks that record the latency of every HTTP request"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.trace_config = aiohttp.TraceConfig()
+        self.trace_config.on_request_start.append(self.on_request_start)
+        self.trace_config.on_request_end.append(self.on_request_end)
+        self.trace_config.on_request_exception.append(self.on_request_exception)
+
+    async def on_request_start(self, session, context, params) -> None:
+        context.started = time.perf_counter()
+
+    async def on_request_end(self, session, context, params) -> None:
+        self.latencies.append(time.perf_counter() - context.started)
+        if params.response.status >= 400:
+            self.errors += 1
+
+    async def on_request_exception(self, session, context, params) -> None:
+        self.latencies.append(time.perf_counter() - context.started)
+        self.errors += 1
+
+
+class FetcherBenchmark:
+    """Runs every fetcher class end to end against one Open API server and reports throughput"""
+
+    def __init__(self, work_dir: Path, requests_per_second: float, max_retries: int = 5,
+                 verbose: bool = False, pdf_concurrency: Optional[List[int]] = None, pdf_write_threads: int = 4):
+        self.work_dir = work_dir
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.verbose = verbose
+        self.pdf_concurrency = pdf_concurrency or [5]
+        self.pdf_write_threads = pdf_write_threads
+
+    def create_rate_limiter(self) -> AdaptiveRateLimiter:
+        """Fresh rate limiter per fetcher so one stage's backoff does not leak into the next"""
+        return AdaptiveRateLimiter(self.requests_per_second)
+
+    async def measure(self, name: str, stage) -> Dict[str, Any]:
+        """Run one stage with a fresh recorder and summarize its requests"""
+        recorder = RequestRecorder()
+        print(f'Benchmarking {name}...')
+        output = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO())
+        started = time.perf_counter()
+        with output:
+            rows = await stage([recorder.trace_config])
+        elapsed = time.perf_counter() - started
+
+        return {
+            'fetcher': name,
+            'rows': rows,
+            'requests': len(recorder.latencies),
+            'errors': recorder.errors,
+            'seconds': elapsed,
+            'rows_per_second': rows / elapsed if elapsed else 0.0,
+            'requests_per_second': len(recorder.latencies) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(recorder.latencies, 50) * 1000,
+            'p99_ms': percentile(recorder.latencies, 99) * 1000
+        }
+
+    async def run_assembly(self, trace_configs: List[aiohttp.TraceConfig]) -> int:
+        """AssemblyDataFetcher: members, member history and bills for every term"""
+        fetcher = AssemblyDataFetcher(rate_limiter=self.create_rate_limiter(),
+                                      retry_policy=RetryPolicy(max_attempts=self.max_retries),
+                                      base_dir=self.work_dir, trace_configs=trace_configs)
+        timings = await fetcher.run()
+        return sum(timing['total_items'] for timing in timings)
+
+    async def run_votes(self, trace_configs: List[aiohttp.TraceConfig]) -> int:
+        """BillsFilterAndVoteFetcher: per-bill vote lookups for passed bills"""
+        fetcher = BillsFilterAndVoteFetcher(self.create_rate_limiter(), base_dir=self.work_dir,
+                                            trace_configs=trace_configs)
+        # Filtering is local work; run it untimed so only the API calls are measured
+        with contextlib.redirect_stdout(io.StringIO()):
+            fetcher.process_bills_data()
+        results = await fetcher.fetch_vote_data()
+        return self.count_result_rows(results)
+
+    async def run_votes_bulk(self, trace_configs: List[aiohttp.TraceConfig]) -> int:
+        """BillsFilterAndVoteFetcher in bulk mode: term-wide vote pages split by bill"""
+        # Separate directory, otherwise the per-bill run's status index marks every bill as done
+        bulk_dir = self.work_dir / 'bulk_votes'
+        bulk_dir.mkdir(exist_ok=True)
+        shutil.copy(self.work_dir / 'assembly_filtered_bills_passed.json', bulk_dir)
+        fetcher = BillsFilterAndVoteFetcher(self.create_rate_limiter(), base_dir=bulk_dir,
+                                            trace_configs=trace_configs, fetch_mode='bulk')
+        results = await fetcher.fetch_vote_data()
+        return self.count_result_rows(results)
+
+    async def run_conferences(self, trace_configs: List[aiohttp.TraceConfig]) -> int:
+        """ConferenceDataFetcher: per-bill conference lookups"""
+        fetcher = ConferenceDataFetcher(self.create_rate_limiter(), base_dir=self.work_dir,
+                                        trace_configs=trace_configs)
+        results = await fetcher.fetch_conference_data()
+        return self.count_result_rows(results)
+
+    async def run_pdfs(self, trace_configs: List[aiohttp.TraceConfig], concurrency: int) -> int:
+        """ConferencePdfDownloader: transcript downloads with `concurrency` workers, counted as files"""
+        # Fresh directory per level, otherwise the first run leaves nothing for the others to download
+        pdf_dir = self.work_dir / f'pdfs_x{concurrency}'
+        pdf_dir.mkdir(exist_ok=True)
+        shutil.copy(self.work_dir / 'assembly_bills_conference_api_results.json', pdf_dir)
+        downloader = ConferencePdfDownloader(self.create_rate_limiter(), base_dir=pdf_dir,
+                                             trace_configs=trace_configs, concurrency=concurrency,
+                                             per_host_limit=concurrency, write_threads=self.pdf_write_threads)
+        await downloader.download_conference_pdfs()
+        return sum(1 for _ in downloader.downloads_dir.rglob('*.pdf'))
+
+    def count_result_rows(self, results: Dict[str, Any]) -> int:
+        """Rows returned across the per-bill api_response envelopes"""
+        return sum(len(result['api_response'][1].get('row', []))
+                   for result in results['results'] if result.get('status') == 'success')
+
+    async def run(self) -> List[Dict[str, Any]]:
+        """Run the fetchers in pipeline order, each one consuming the previous one's output"""
+        reports = [
+            await self.measure('AssemblyDataFetcher', self.run_assembly),
+            await self.measure('BillsFilterAndVoteFetcher', self.run_votes),
+            await self.measure('BillsFilterAndVoteFetcher bulk', self.run_votes_bulk),
+            await self.measure('ConferenceDataFetcher', self.run_conferences)
+        ]
+        for concurrency in self.pdf_concurrency:
+            reports.append(await self.measure(
+                f'ConferencePdfDownloader x{concurrency}',
+                lambda trace_configs, concurrency=concurrency: self.run_pdfs(trace_configs, concurrency)
+            ))
+        return reports
+
+    def print_report(self, reports: List[Dict[str, Any]]) -> None:
+        """Print the per-fetcher throughput table"""
+        print('\n=== Fetcher Benchmark ===')
+        print(f"{'Fetcher':<30}  {'Rows':>8}  {'Requests':>8}  {'Errors':>6}  {'Seconds':>8}  "
+              f"{'Rows/s':>9}  {'Req/s':>7}  {'p50 ms':>7}  {'p99 ms':>7}")
+        for report in reports:
+            print(f"{report['fetcher']:<30}  {report['rows']:>8}  {report['requests']:>8}  {report['errors']:>6}  "
+                  f"{report['seconds']:>8.2f}  {report['rows_per_second']:>9.1f}  "
+                  f"{report['requests_per_second']:>7.1f}  {report['p50_ms']:>7.1f}  {report['p99_ms']:>7.1f}")
+
+
+def main():
+    """Main function to run the fetcher benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark the fetchers end to end against a local mock Open API')
+    parser.add_argument('--base-url', default=None,
+                       help='Benchmark an already running server instead of starting the built-in mock')
+    parser.add_argument('--port', type=int, default=8765,
+                       help='Port for the built-in mock server (default: 8765)')
+    parser.add_argument('--requests-per-second', type=float, default=200.0,
+                       help='Rate limit given to every fetcher (default: 200)')
+    parser.add_argument('--max-retries', type=int, default=5,
+                       help='Attempts per page before a job is marked as failed (default: 5)')
+    parser.add_argument('--work-dir', type=Path, default=None,
+                       help='Directory for fetcher output (default: a temporary directory, removed afterwards)')
+    parser.add_argument('--report', type=Path, default=None,
+                       help='Also write the results as JSON to this file')
+    parser.add_argument('--pdf-concurrency', default='1,5,20',
+                       help='Comma separated PDF download worker counts, each measured separately (default: 1,5,20)')
+    parser.add_argument('--pdf-write-threads', type=int, default=4,
+                       help='Disk writer threads of the PDF downloader; 0 writes on the event loop (default: 4)')
+    parser.add_argument('--verbose', action='store_true',
+                       help='Show the fetchers\' own output')
+    add_mock_server_arguments(parser)
+
+    args = parser.parse_args()
+
+    async def run():
+        server = None
+        runner = None
+        if args.base_url:
+            os.environ['OPEN_API_BASE_URL'] = args.base_url
+        else:
+            server = create_server_from_args(args)
+            runner = await server.start(port=args.port)
+            os.environ['OPEN_API_BASE_URL'] = f'http://127.0.0.1:{args.port}/portal/openapi'
+            # The mock ignores the key, but the fetchers refuse to start without one
+            os.environ.setdefault('API_KEY', 'mock')
+
+        work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix='fetcher_benchmark_'))
+        work_dir.mkdir(parents=True, exist_ok=True)
+        print(f"Benchmarking against {os.environ['OPEN_API_BASE_URL']} (output in {work_dir})")
+
+        try:
+            pdf_concurrency = [int(level) for level in args.pdf_concurrency.split(',') if level.strip()]
+            benchmark = FetcherBenchmark(work_dir, args.requests_per_second, args.max_retries, args.verbose,
+                                         pdf_concurrency, args.pdf_write_threads)
+            reports = await benchmark.run()
+        finally:
+            if runner:
+                await runner.cleanup()
+            if not args.work_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        if server:
+            server.print_stats()
+        benchmark.print_report(reports)
+
+        if args.report:
+            write_json(args.report, {'settings': {key: str(value) for key, value in vars(args).items()},
+                                     'fetchers': reports}, compact=False)
+            print(f'Report saved to: {args.report}')
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
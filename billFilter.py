@@ -0,0 +1,149 @@
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
+from ndjsonStore import iter_dataset_rows
+from billFingerprints import get_fingerprint_entry
+
+DEFAULT_PROC_RESULTS = ['원안가결', '수정가결']
+DEFAULT_MIN_AGE = 17
+
+
+def parse_date(value: str) -> str:
+    """Validate a YYYY-MM-DD date argument, kept as a string since PROC_DT/PROPOSE_DT compare as text"""
+    if not re.fullmatch(r'\d{4}-\d{2}-\d{2}', value):
+        raise argparse.ArgumentTypeError(f'Expected a YYYY-MM-DD date, got {value!r}')
+    return value
+
+
+def get_file_term(path: Path) -> Optional[int]:
+    """Term encoded in an assembly_bills_age_<n> file name, or None"""
+    match = re.match(r'assembly_bills_age_(\d+)', path.name)
+    return int(match.group(1)) if match else None
+
+
+class BillFilterCriteria:
+    """Which bill rows are kept for the vote and conference fetchers
+
+    Date ranges are inclusive and compare the YYYY-MM-DD prefix of PROC_DT/PROPOSE_DT; a bill without
+    the date is dropped once a range on it is set.
+    """
+
+    def __init__(self, proc_results: Optional[List[str]] = None, min_age: Optional[int] = DEFAULT_MIN_AGE,
+                 max_age: Optional[int] = None, proc_date_from: Optional[str] = None,
+                 proc_date_to: Optional[str] = None, propose_date_from: Optional[str] = None,
+                 propose_date_to: Optional[str] = None):
+        self.proc_results = list(dict.fromkeys(proc_results or DEFAULT_PROC_RESULTS))
+        self.min_age = min_age
+        self.max_age = max_age
+        self.date_ranges = [(field, start, end) for field, start, end in [
+            ('PROC_DT', proc_date_from, proc_date_to),
+            ('PROPOSE_DT', propose_date_from, propose_date_to)
+        ] if start or end]
+
+    def includes_term(self, term: Optional[int]) -> bool:
+        """Whether rows of a term can match at all, so whole files outside the AGE range are skipped"""
+        if term is None:
+            return True
+        return (self.min_age is None or term >= self.min_age) and (self.max_age is None or term <= self.max_age)
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        """Whether a bill row passes every criterion"""
+        if row.get('PROC_RESULT') not in self.proc_results:
+            return False
+
+        age = int(row.get('AGE') or 0)
+        if (self.min_age is not None and age < self.min_age) or (self.max_age is not None and age > self.max_age):
+            return False
+
+        for field, start, end in self.date_ranges:
+            date = (row.get(field) or '')[:10]
+            if not date or (start and date < start) or (end and date > end):
+                return False
+        return True
+
+    def describe(self) -> str:
+        """Human readable summary stored as filter_criteria in the output file"""
+        parts = ['PROC_RESULT = ' + ' OR '.join(f"'{result}'" for result in self.proc_results)]
+        if self.min_age is not None:
+            parts.append(f'AGE >= {self.min_age}')
+        if self.max_age is not None:
+            parts.append(f'AGE <= {self.max_age}')
+        for field, start, end in self.date_ranges:
+            parts.append(f"{field} {start or '...'} ~ {end or '...'}")
+        return ', '.join(parts)
+
+
+def filter_bills_file(path: Path, criteria: BillFilterCriteria,
+                      with_fingerprints: bool = False) -> Dict[str, Any]:
+    """Stream one bills file and return its matching (BILL_ID, AGE) pairs
+
+    Runs in a worker process. With with_fingerprints every row's fingerprint entry is returned too, so
+    hashing happens in parallel and only the small entries travel back to the parent process.
+    """
+    matches = []
+    fingerprints = {}
+    rows = 0
+    for row in iter_dataset_rows(path):
+        rows += 1
+        if with_fingerprints:
+            fingerprints[row['BILL_ID']] = get_fingerprint_entry(row)
+        if criteria.matches(row):
+            matches.append({'BILL_ID': row['BILL_ID'], 'AGE': row['AGE']})
+    return {'rows': rows, 'matches': matches, 'fingerprints': fingerprints}
+
+
+def filter_bills_files(paths: List[Path], criteria: BillFilterCriteria, workers: int,
+                       with_fingerprints: bool = False) -> Iterator[Tuple[Path, Union[Dict[str, Any], Exception]]]:
+    """Filter files across a process pool, yielding (path, result or exception) in the order of paths"""
+    workers = min(workers, len(paths))
+    if workers <= 1:
+        for path in paths:
+            try:
+                yield path, filter_bills_file(path, criteria, with_fingerprints)
+            except Exception as error:
+                yield path, error
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(filter_bills_file, path, criteria, with_fingerprints) for path in paths]
+        for path, future in zip(paths, futures):
+            try:
+                yield path, future.result()
+            except Exception as error:
+                yield path, error
+
+
+def add_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the bill filter command line options"""
+    parser.add_argument('--proc-results', default=','.join(DEFAULT_PROC_RESULTS),
+                       help=f"Comma separated PROC_RESULT values to keep (default: {','.join(DEFAULT_PROC_RESULTS)})")
+    parser.add_argument('--min-age', type=int, default=DEFAULT_MIN_AGE,
+                       help=f'Lowest AGE (term) to keep (default: {DEFAULT_MIN_AGE})')
+    parser.add_argument('--max-age', type=int, default=None,
+                       help='Highest AGE (term) to keep (default: no limit)')
+    parser.add_argument('--proc-date-from', type=parse_date, default=None,
+                       help='Keep bills with PROC_DT on or after this YYYY-MM-DD date')
+    parser.add_argument('--proc-date-to', type=parse_date, default=None,
+                       help='Keep bills with PROC_DT on or before this YYYY-MM-DD date')
+    parser.add_argument('--propose-date-from', type=parse_date, default=None,
+                       help='Keep bills with PROPOSE_DT on or after this YYYY-MM-DD date')
+    parser.add_argument('--propose-date-to', type=parse_date, default=None,
+                       help='Keep bills with PROPOSE_DT on or before this YYYY-MM-DD date')
+    parser.add_argument('--filter-workers', type=int, default=os.cpu_count() or 1,
+                       help='Processes used to filter the bill files in parallel (default: CPU count)')
+
+
+def create_criteria_from_args(args: argparse.Namespace) -> BillFilterCriteria:
+    """Build BillFilterCriteria from parsed command line options"""
+    return BillFilterCriteria(
+        proc_results=[result.strip() for result in args.proc_results.split(',') if result.strip()],
+        min_age=args.min_age,
+        max_age=args.max_age,
+        proc_date_from=args.proc_date_from,
+        proc_date_to=args.proc_date_to,
+        propose_date_from=args.propose_date_from,
+        propose_date_to=args.propose_date_to
+    )
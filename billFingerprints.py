@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Iterable
+
+from responseCache import CURRENT_TERM
+from jsonBackend import read_json, write_json
+
+# Assembly terms still in session; only these are re-pulled in incremental mode
+OPEN_TERMS = [CURRENT_TERM]
+
+CHANGED_BILLS_FILENAME = 'assembly_filtered_bills_changed.json'
+# Per-bill fetchers that consume the changed bills; a bill stays pending for each until that one fetched it
+CHANGED_BILL_STAGES = ['vote', 'conference']
+
+
+def fingerprint_row(row: Dict[str, Any]) -> str:
+    """Stable hash of a bill row"""
+    # Stays on stdlib json so hashes match fingerprints saved by earlier runs
+    return hashlib.sha1(json.dumps(row, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def get_fingerprint_entry(row: Dict[str, Any]) -> List[Any]:
+    """[hash, PROC_RESULT, PROC_DT] entry stored per bill; computed wherever the row is read"""
+    return [fingerprint_row(row), row.get('PROC_RESULT'), row.get('PROC_DT')]
+
+
+class BillFingerprintStore:
+    """Per-BILL_ID row hashes from the previous run, used to detect bills whose outcome changed"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.previous = self.load()
+        self.current: Dict[str, List[Any]] = {}
+        self.changed_rows = 0
+
+    def load(self) -> Dict[str, List[Any]]:
+        """Load fingerprints saved by the previous run"""
+        try:
+            return read_json(self.path).get('bills', {})
+        except:
+            print('No previous bill fingerprints found, every bill counts as changed')
+            return {}
+
+    def update(self, row: Dict[str, Any]) -> bool:
+        """Record a row's fingerprint; True if the bill is new or its PROC_RESULT/PROC_DT changed"""
+        return self.update_entry(row['BILL_ID'], get_fingerprint_entry(row))
+
+    def update_entry(self, bill_id: str, entry: List[Any]) -> bool:
+        """Record a precomputed fingerprint entry; True if the bill is new or its PROC_RESULT/PROC_DT changed"""
+        self.current[bill_id] = entry
+
+        previous = self.previous.get(bill_id)
+        if previous is None:
+            self.changed_rows += 1
+            return True
+        if previous[0] != entry[0]:
+            self.changed_rows += 1
+        return previous[1:] != entry[1:]
+
+    def save(self) -> None:
+        """Atomically write this run's fingerprints, keeping bills not seen in this run"""
+        bills = {**self.previous, **self.current}
+        temp_path = self.path.with_suffix('.tmp')
+        write_json(temp_path, {'saved_date': datetime.now().isoformat(), 'bills': bills}, compact=True)
+        os.replace(temp_path, self.path)
+        print(f'Saved fingerprints for {len(bills)} bills ({self.changed_rows} rows new or changed)')
+
+
+def read_changed_bills(base_dir: Path) -> Dict[str, Any]:
+    """The pending changed bills file, {} if there is none
+
+    A file written before per-stage tracking has no 'pending' map; its bills count as pending everywhere.
+    """
+    try:
+        changed_data = read_json(base_dir / CHANGED_BILLS_FILENAME)
+    except FileNotFoundError:
+        return {}
+    if 'pending' not in changed_data:
+        bill_ids = [bill['BILL_ID'] for bill in changed_data.get('data', [])]
+        changed_data['pending'] = {stage: bill_ids for stage in CHANGED_BILL_STAGES}
+    return changed_data
+
+
+def write_changed_bills(base_dir: Path, bills: Dict[str, Dict[str, Any]], pending: Dict[str, List[str]],
+                        filter_criteria: str) -> None:
+    """Atomically write the changed bills still pending for at least one stage"""
+    pending_ids = set().union(*pending.values()) if pending else set()
+    data = [bill for bill_id, bill in bills.items() if bill_id in pending_ids]
+    path = base_dir / CHANGED_BILLS_FILENAME
+    temp_path = path.with_suffix('.tmp')
+    write_json(temp_path, {
+        'total_count': len(data),
+        'filtered_date': datetime.now().isoformat(),
+        'filter_criteria': filter_criteria,
+        'pending': {stage: sorted(set(bill_ids) & pending_ids) for stage, bill_ids in pending.items()},
+        'data': data
+    })
+    os.replace(temp_path, path)
+
+
+def add_changed_bills(base_dir: Path, changed_bills: List[Dict[str, Any]], filter_criteria: str) -> int:
+    """Add a filter run's changed bills to the pending ones instead of replacing them; returns the pending count
+
+    Bills of earlier runs that a fetcher has not finished yet stay pending, so a failed fetch or a second
+    filter run never loses them.
+    """
+    changed_data = read_changed_bills(base_dir)
+    bills = {bill['BILL_ID']: bill for bill in changed_data.get('data', [])}
+    # The latest row of a bill replaces the older one
+    bills.update((bill['BILL_ID'], bill) for bill in changed_bills)
+    new_ids = [bill['BILL_ID'] for bill in changed_bills]
+    pending = {stage: sorted(set(changed_data.get('pending', {}).get(stage, [])) | set(new_ids))
+               for stage in CHANGED_BILL_STAGES}
+    write_changed_bills(base_dir, bills, pending, filter_criteria)
+    return len(set().union(*pending.values()))
+
+
+def clear_changed_bills(base_dir: Path, stage: str, bill_ids: Iterable[str]) -> None:
+    """Mark changed bills as fetched by a stage; bills no stage still needs are dropped"""
+    changed_data = read_changed_bills(base_dir)
+    if not changed_data:
+        return
+    bill_ids = set(bill_ids)
+    pending = {name: [bill_id for bill_id in ids if not (name == stage and bill_id in bill_ids)]
+               for name, ids in changed_data['pending'].items()}
+    bills = {bill['BILL_ID']: bill for bill in changed_data.get('data', [])}
+    write_changed_bills(base_dir, bills, pending, changed_data.get('filter_criteria', ''))
+    print(f'{len(pending.get(stage, []))} changed bills still pending for the {stage} fetcher')
+
+
+def load_changed_bills(base_dir: Path, stage: str) -> Dict[str, Any]:
+    """Load the changed bills still pending for a stage, flagged by incremental filter runs"""
+    try:
+        changed_data = read_changed_bills(base_dir)
+    except Exception as error:
+        raise Exception(f'Could not load changed bills file: {error}')
+    if not changed_data:
+        raise Exception('No changed bills file found (run the filter with --incremental first)')
+    pending_ids = set(changed_data['pending'].get(stage, []))
+    return {**changed_data, 'data': [bill for bill in changed_data.get('data', []) if bill['BILL_ID'] in pending_ids]}
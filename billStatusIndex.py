@@ -0,0 +1,109 @@
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+RESULT_STATUSES = ['success', 'no_data', 'error', 'not_cached']
+# Calls that never reached the API (offline cache misses) are made again on every run
+ALWAYS_RETRIED_STATUSES = ['not_cached']
+
+
+def parse_retry_statuses(value: str) -> List[str]:
+    """Parse a comma separated --retry-status value such as 'error,no_data'"""
+    statuses = [status.strip() for status in value.split(',') if status.strip()]
+    unknown = [status for status in statuses if status not in RESULT_STATUSES]
+    if unknown:
+        raise ValueError(f'Unknown status {", ".join(unknown)} (expected {", ".join(RESULT_STATUSES)})')
+    return statuses
+
+
+class BillStatusIndex:
+    """Persistent (BILL_ID, AGE) -> status index of per-bill API calls, backed by SQLite
+
+    Every status is loaded into a dict on open, so deciding whether a bill still needs a call is O(1).
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(str(db_path))
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS bill_status (
+                bill_id TEXT NOT NULL,
+                age TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                updated TEXT NOT NULL,
+                PRIMARY KEY (bill_id, age)
+            )
+        ''')
+        self.connection.commit()
+        self.statuses: Dict[Tuple[str, str], str] = {
+            (bill_id, age): status
+            for bill_id, age, status in self.connection.execute('SELECT bill_id, age, status FROM bill_status')
+        }
+
+    def get_key(self, bill_id: str, age: Any) -> Tuple[str, str]:
+        """Index key; AGE is stored as text since the API returns it as both str and int"""
+        return str(bill_id), str(age)
+
+    def get_status(self, bill_id: str, age: Any) -> Optional[str]:
+        """Last recorded status of a bill, or None if it was never called"""
+        return self.statuses.get(self.get_key(bill_id, age))
+
+    def needs_call(self, bill_id: str, age: Any, retry_statuses: Iterable[str] = ()) -> bool:
+        """Whether a bill has no recorded result, was not cached, or its status is selected for retry"""
+        status = self.get_status(bill_id, age)
+        return status is None or status in ALWAYS_RETRIED_STATUSES or status in retry_statuses
+
+    def record(self, bill_id: str, age: Any, status: str, error: Optional[str] = None,
+               commit: bool = True) -> None:
+        """Insert or update a bill's status"""
+        key = self.get_key(bill_id, age)
+        self.connection.execute('''
+            INSERT INTO bill_status (bill_id, age, status, error, updated) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (bill_id, age) DO UPDATE SET
+                status = excluded.status, error = excluded.error, updated = excluded.updated
+        ''', (*key, status, error, datetime.now().isoformat()))
+        if commit:
+            self.connection.commit()
+        self.statuses[key] = status
+
+    def record_results(self, results: Iterable[Dict[str, Any]]) -> None:
+        """Record the status of each API result dict in one transaction"""
+        for result in results:
+            self.record(result['BILL_ID'], result['AGE'], result.get('status', 'error'),
+                        result.get('error'), commit=False)
+        self.connection.commit()
+
+    def remove_bills(self, bill_ids: Iterable[str]) -> None:
+        """Forget every term of the given bills so they are called again"""
+        bill_ids = set(bill_ids)
+        self.connection.executemany('DELETE FROM bill_status WHERE bill_id = ?', ((bill_id,) for bill_id in bill_ids))
+        self.connection.commit()
+        self.statuses = {key: status for key, status in self.statuses.items() if key[0] not in bill_ids}
+
+    def reconcile(self, results: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        """Make the index match the saved results; returns (stale statuses dropped, statuses recorded)
+
+        A status without a saved result (e.g. the results file was deleted or replaced) would skip that
+        bill forever, so it is dropped; results the index does not know yet are recorded.
+        """
+        latest = {self.get_key(result['BILL_ID'], result['AGE']): result for result in results}
+        stale = [key for key in self.statuses if key not in latest]
+        self.connection.executemany('DELETE FROM bill_status WHERE bill_id = ? AND age = ?', stale)
+        for key in stale:
+            del self.statuses[key]
+
+        missing = [result for key, result in latest.items()
+                   if self.statuses.get(key) != result.get('status', 'error')]
+        self.record_results(missing)
+        return len(stale), len(missing)
+
+    def __len__(self) -> int:
+        return len(self.statuses)
+
+    def close(self) -> None:
+        """Close the database connection"""
+        self.connection.close()
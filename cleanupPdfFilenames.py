@@ -1,13 +1,20 @@
-import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 import argparse
+from jsonBackend import write_json, add_json_arguments, set_compact_output
+from pdfInventory import PdfInventory, DEFAULT_SCAN_WORKERS
+from resultJournal import ResultJournal
 
 class PdfFilenameCleanup:
-    def __init__(self):
-        self.base_dir = Path(__file__).parent
+    def __init__(self, base_dir: Optional[Path] = None):
+        self.base_dir = base_dir or Path(__file__).parent
         self.downloads_dir = self.base_dir / 'pdf_downloads'
+        # The rename threads share one journal file
+        self.journal_lock = threading.Lock()
 
     def test_rename(self, original_filename: str) -> str:
         """Test function to rename a single PDF file"""
@@ -58,32 +65,77 @@ class PdfFilenameCleanup:
         base_name = filename[:cut_index]
         return base_name + '.pdf'
 
-    def find_all_pdf_files(self, dir_path: Path) -> List[Dict[str, Any]]:
-        """Recursively find all PDF files in a directory"""
-        pdf_files = []
-        
-        def search_directory(current_path: Path, relative_path: str = ''):
+    def get_journal_path(self) -> Path:
+        """New rename journal for an actual run"""
+        return self.base_dir / f'pdf_rename_journal_{datetime.now().strftime("%Y%m%d_%H%M%S")}.ndjson'
+
+    def append_journal(self, journal: ResultJournal, directory: str, original: str, new: str) -> None:
+        """Record a rename before it happens; called from the rename threads"""
+        with self.journal_lock:
+            journal.append({'directory': directory, 'original': original, 'new': new})
+
+    def rename_directory(self, directory: str, filenames: List[str], dry_run: bool,
+                         journal: Optional[ResultJournal]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Rename the PDFs of one directory; returns (message, result) per file
+
+        Each directory is handled by a single thread, so the listing's names stand in for exists() checks.
+        """
+        directory_path = self.downloads_dir / directory
+        names = set(filenames)
+        outcomes = []
+        for filename in filenames:
+            relative_path = os.path.join(directory, filename)
             try:
-                for item in current_path.iterdir():
-                    if item.is_dir():
-                        # Recursively search subdirectories
-                        rel_path = str(Path(relative_path) / item.name) if relative_path else item.name
-                        search_directory(item, rel_path)
-                    elif item.is_file() and item.suffix.lower() == '.pdf':
-                        rel_path = str(Path(relative_path) / item.name) if relative_path else item.name
-                        pdf_files.append({
-                            'full_path': item,
-                            'relative_path': rel_path,
-                            'filename': item.name,
-                            'directory': item.parent
-                        })
+                new_filename = self.generate_new_filename(filename)
+                
+                if new_filename == filename:
+                    outcomes.append((f'⏭️  Skipping (no change needed): {relative_path}', {
+                        'original': relative_path,
+                        'new': relative_path,
+                        'status': 'skipped',
+                        'reason': 'No 6th underscore found or no change needed'
+                    }))
+                    continue
+                
+                new_relative = os.path.join(directory, new_filename)
+                
+                # Check if target file already exists (or an earlier file of this run was renamed to it)
+                if new_filename in names:
+                    outcomes.append((f'⚠️  Warning: Target file already exists, skipping: {new_filename}', {
+                        'original': relative_path,
+                        'new': new_relative,
+                        'status': 'skipped',
+                        'reason': 'Target file already exists'
+                    }))
+                    continue
+                
+                if not dry_run:
+                    # Journaled first, so an interrupted run can still be undone
+                    self.append_journal(journal, directory, filename, new_filename)
+                    os.rename(directory_path / filename, directory_path / new_filename)
+                    message = f'✅ Renamed: {relative_path} → {new_relative}'
+                else:
+                    message = f'🔍 Would rename: {relative_path} → {new_relative}'
+                names.discard(filename)
+                names.add(new_filename)
+                
+                outcomes.append((message, {
+                    'original': relative_path,
+                    'new': new_relative,
+                    'status': 'would_rename' if dry_run else 'renamed',
+                    'reason': 'Successfully processed'
+                }))
+                
             except Exception as error:
-                print(f'Error reading directory {current_path}: {error}')
-        
-        search_directory(dir_path)
-        return pdf_files
+                outcomes.append((f'❌ Error processing {relative_path}: {error}', {
+                    'original': relative_path,
+                    'new': None,
+                    'status': 'error',
+                    'reason': str(error)
+                }))
+        return outcomes
 
-    def rename_all_pdf_files(self, dry_run: bool = True) -> Dict[str, Any]:
+    def rename_all_pdf_files(self, dry_run: bool = True, workers: int = DEFAULT_SCAN_WORKERS) -> Dict[str, Any]:
         """Rename all PDF files in the pdf_downloads folder"""
         try:
             print('Starting PDF file renaming process...')
@@ -96,84 +148,48 @@ class PdfFilenameCleanup:
             
             print(f'Searching for PDF files in: {self.downloads_dir}')
             
-            # Find all PDF files
-            pdf_files = self.find_all_pdf_files(self.downloads_dir)
-            print(f'Found {len(pdf_files)} PDF files to process')
+            # Find all PDF files with one listing per directory
+            inventory = PdfInventory.scan(self.downloads_dir, workers, stat_files=False)
+            for scan_error in inventory.errors:
+                print(f'Error reading directory {scan_error}')
+            total_files = len(inventory)
+            print(f'Found {total_files} PDF files to process')
             
-            if not pdf_files:
+            if not total_files:
                 print('No PDF files found to rename')
                 return {'message': 'No PDF files found'}
             
-            renamed_count = 0
-            skipped_count = 0
-            error_count = 0
+            journal = None if dry_run else ResultJournal(self.get_journal_path())
+            counts = {'renamed': 0, 'would_rename': 0, 'skipped': 0, 'error': 0}
             results = []
             
-            for file_info in pdf_files:
-                try:
-                    new_filename = self.generate_new_filename(file_info['filename'])
-                    
-                    if new_filename == file_info['filename']:
-                        print(f'⏭️  Skipping (no change needed): {file_info["relative_path"]}')
-                        skipped_count += 1
-                        results.append({
-                            'original': file_info['relative_path'],
-                            'new': file_info['relative_path'],
-                            'status': 'skipped',
-                            'reason': 'No 6th underscore found or no change needed'
-                        })
-                        continue
-                    
-                    new_full_path = file_info['directory'] / new_filename
-                    
-                    # Check if target file already exists
-                    if new_full_path.exists():
-                        print(f'⚠️  Warning: Target file already exists, skipping: {new_filename}')
-                        skipped_count += 1
-                        new_relative = str(Path(file_info['relative_path']).parent / new_filename)
-                        results.append({
-                            'original': file_info['relative_path'],
-                            'new': new_relative,
-                            'status': 'skipped',
-                            'reason': 'Target file already exists'
-                        })
-                        continue
-                    
-                    if not dry_run:
-                        # Actually rename the file
-                        file_info['full_path'].rename(new_full_path)
-                        new_relative = str(Path(file_info['relative_path']).parent / new_filename)
-                        print(f'✅ Renamed: {file_info["relative_path"]} → {new_relative}')
-                    else:
-                        new_relative = str(Path(file_info['relative_path']).parent / new_filename)
-                        print(f'🔍 Would rename: {file_info["relative_path"]} → {new_relative}')
-                    
-                    renamed_count += 1
-                    results.append({
-                        'original': file_info['relative_path'],
-                        'new': new_relative,
-                        'status': 'would_rename' if dry_run else 'renamed',
-                        'reason': 'Successfully processed'
-                    })
-                    
-                except Exception as error:
-                    print(f'❌ Error processing {file_info["relative_path"]}: {error}')
-                    error_count += 1
-                    results.append({
-                        'original': file_info['relative_path'],
-                        'new': None,
-                        'status': 'error',
-                        'reason': str(error)
-                    })
+            try:
+                # One task per directory: files of a directory never race on the same target name
+                directories = sorted(directory for directory, files in inventory.directories.items() if files)
+                with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                    for outcomes in executor.map(
+                            lambda directory: self.rename_directory(
+                                directory, list(inventory.directories[directory]), dry_run, journal),
+                            directories):
+                        for message, result in outcomes:
+                            print(message)
+                            counts[result['status']] += 1
+                            results.append(result)
+            finally:
+                if journal:
+                    journal.close()
+            
+            renamed_count = counts['would_rename'] if dry_run else counts['renamed']
             
             # Save results to file
             results_data = {
                 'summary': {
-                    'total_files': len(pdf_files),
+                    'total_files': total_files,
                     'renamed_count': renamed_count,
-                    'skipped_count': skipped_count,
-                    'error_count': error_count,
+                    'skipped_count': counts['skipped'],
+                    'error_count': counts['error'],
                     'dry_run': dry_run,
+                    'journal': journal.path.name if journal and journal.appended else None,
                     'processed_date': datetime.now().isoformat()
                 },
                 'results': results
@@ -183,15 +199,16 @@ class PdfFilenameCleanup:
             mode_str = 'dryrun' if dry_run else 'actual'
             results_path = self.base_dir / f'pdf_rename_results_{mode_str}_{date_str}.json'
             
-            with open(results_path, 'w', encoding='utf-8') as f:
-                json.dump(results_data, f, ensure_ascii=False, indent=2)
+            write_json(results_path, results_data)
             
             print('\n=== Summary ===')
-            print(f'Total files processed: {len(pdf_files)}')
+            print(f'Total files processed: {total_files}')
             print(f'{"Would be renamed" if dry_run else "Renamed"}: {renamed_count}')
-            print(f'Skipped: {skipped_count}')
-            print(f'Errors: {error_count}')
+            print(f'Skipped: {counts["skipped"]}')
+            print(f'Errors: {counts["error"]}')
             print(f'Results saved to: {results_path}')
+            if journal and journal.appended:
+                print(f'Rename journal saved to: {journal.path} (reverse with --undo {journal.path.name})')
             
             if dry_run:
                 print('\n💡 This was a dry run. To actually rename files, use --actual flag')
@@ -202,6 +219,79 @@ class PdfFilenameCleanup:
             print(f'Error in rename_all_pdf_files: {error}')
             raise error
 
+    def undo_directory(self, directory: str, entries: List[Dict[str, Any]],
+                       names: Set[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Reverse the journaled renames of one directory, latest first"""
+        directory_path = self.downloads_dir / directory
+        outcomes = []
+        for entry in reversed(entries):
+            original = os.path.join(directory, entry['original'])
+            new = os.path.join(directory, entry['new'])
+            result = {'original': new, 'new': original}
+            try:
+                if entry['new'] not in names:
+                    # The run was interrupted before this rename, or the file was moved since
+                    outcomes.append((f'⏭️  Skipping (not found): {new}',
+                                     {**result, 'status': 'skipped', 'reason': 'Renamed file not found'}))
+                    continue
+                if entry['original'] in names:
+                    outcomes.append((f'⚠️  Warning: Original name is taken, skipping: {original}',
+                                     {**result, 'status': 'skipped', 'reason': 'Original file already exists'}))
+                    continue
+                os.rename(directory_path / entry['new'], directory_path / entry['original'])
+                names.discard(entry['new'])
+                names.add(entry['original'])
+                outcomes.append((f'↩️  Restored: {new} → {original}',
+                                 {**result, 'status': 'restored', 'reason': 'Successfully processed'}))
+            except Exception as error:
+                outcomes.append((f'❌ Error restoring {new}: {error}',
+                                 {**result, 'status': 'error', 'reason': str(error)}))
+        return outcomes
+
+    def undo_renames(self, journal_path: Path, workers: int = DEFAULT_SCAN_WORKERS) -> Dict[str, Any]:
+        """Reverse an actual run from its rename journal"""
+        if not journal_path.is_absolute() and not journal_path.exists():
+            journal_path = self.base_dir / journal_path
+        print(f'Undoing renames from: {journal_path}')
+        
+        entries_by_directory: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in ResultJournal(journal_path).iter_results():
+            entries_by_directory.setdefault(entry['directory'], []).append(entry)
+        print(f'Found {sum(len(entries) for entries in entries_by_directory.values())} journaled renames')
+        
+        inventory = PdfInventory.scan(self.downloads_dir, workers, stat_files=False)
+        counts = {'restored': 0, 'skipped': 0, 'error': 0}
+        results = []
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for outcomes in executor.map(
+                    lambda directory: self.undo_directory(
+                        directory, entries_by_directory[directory], set(inventory.directories.get(directory, {}))),
+                    sorted(entries_by_directory)):
+                for message, result in outcomes:
+                    print(message)
+                    counts[result['status']] += 1
+                    results.append(result)
+        
+        results_data = {
+            'summary': {
+                'journal': journal_path.name,
+                'restored_count': counts['restored'],
+                'skipped_count': counts['skipped'],
+                'error_count': counts['error'],
+                'processed_date': datetime.now().isoformat()
+            },
+            'results': results
+        }
+        results_path = self.base_dir / f'pdf_rename_results_undo_{datetime.now().strftime("%Y-%m-%d")}.json'
+        write_json(results_path, results_data)
+        
+        print('\n=== Undo Summary ===')
+        print(f'Restored: {counts["restored"]}')
+        print(f'Skipped: {counts["skipped"]}')
+        print(f'Errors: {counts["error"]}')
+        print(f'Results saved to: {results_path}')
+        return results_data
+
 def main():
     """Main function with command line argument parsing"""
     parser = argparse.ArgumentParser(description='Clean up PDF filenames by removing text after 6th underscore')
@@ -209,8 +299,14 @@ def main():
                        help='Test mode - test sample filename transformations')
     parser.add_argument('--actual', action='store_true', 
                        help='Perform actual renaming (default is dry run)')
+    parser.add_argument('--undo', type=Path, default=None, metavar='JOURNAL',
+                       help='Reverse an actual run from its pdf_rename_journal_*.ndjson file')
+    parser.add_argument('--workers', type=int, default=DEFAULT_SCAN_WORKERS,
+                       help=f'Threads listing and renaming, one directory at a time each (default: {DEFAULT_SCAN_WORKERS})')
+    add_json_arguments(parser)
     
     args = parser.parse_args()
+    set_compact_output(args.compact_json)
     
     cleanup = PdfFilenameCleanup()
     
@@ -226,10 +322,13 @@ def main():
             cleanup.test_rename(filename)
             print('---\n')
     
+    elif args.undo:
+        cleanup.undo_renames(args.undo, args.workers)
+    
     else:
         # Perform renaming (dry run by default, actual if --actual flag is used)
         dry_run = not args.actual
-        results = cleanup.rename_all_pdf_files(dry_run)
+        results = cleanup.rename_all_pdf_files(dry_run, args.workers)
         
         if not args.actual:
             print('\nDry run completed! Use --actual flag to perform actual renaming.')
@@ -1,13 +1,17 @@
-import json
 import re
+import argparse
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from jsonBackend import read_json, write_json
+from pdfTrackingStore import open_tracking_store, TRACKING_DB_FILENAME, TRACKING_JSON_FILENAME
+from pdfInventory import PdfInventory, DEFAULT_SCAN_WORKERS, print_orphans
 
 class PdfTracker:
-    def __init__(self):
-        self.base_dir = Path(__file__).parent
+    def __init__(self, base_dir: Optional[Path] = None, scan_workers: int = DEFAULT_SCAN_WORKERS):
+        self.base_dir = base_dir or Path(__file__).parent
         self.downloads_dir = self.base_dir / 'pdf_downloads'
+        self.scan_workers = scan_workers
 
     def sanitize_filename(self, text: str) -> str:
         """Sanitize text for use in filename"""
@@ -17,15 +21,22 @@ class PdfTracker:
         sanitized = re.sub(r'[<>:"/\\|?*]', '_', str(text))
         return sanitized.strip() or '_'
 
-    def track_conference_pdfs(self) -> None:
+    def track_conference_pdfs(self, export_json: bool = False, orphans_output: Optional[Path] = None) -> None:
         """Create PDF tracking list without downloading"""
+        tracking = open_tracking_store(self.base_dir)
         try:
             print('Starting PDF tracking process...')
             
+            # One listing of pdf_downloads/ up front instead of a stat() per conference row
+            inventory = PdfInventory.scan(self.downloads_dir, self.scan_workers)
+            print(f'Found {len(inventory)} PDF files in {len(inventory.directories)} directories '
+                  f'({inventory.total_size() / 1024 / 1024:.1f} MB)')
+            for scan_error in inventory.errors:
+                print(f'  ✗ Error listing {scan_error}')
+            
             # Read the conference API results file
             file_path = self.base_dir / 'assembly_bills_conference_api_results.json'
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = read_json(file_path)
             
             if 'results' not in data or not isinstance(data['results'], list):
                 raise Exception('No results array found in the file')
@@ -51,6 +62,7 @@ class PdfTracker:
             total_tracked = 0
             total_skipped = 0
             pdf_tracking_data = []
+            referenced_files = set()
             
             for result in valid_results:
                 try:
@@ -93,18 +105,20 @@ class PdfTracker:
                             full_file_path = bill_dir / filename
                             
                             # Check if file already exists
-                            file_exists = full_file_path.exists()
+                            file_exists = inventory.contains(bill_id, filename)
+                            referenced_files.add((bill_id, filename))
                             if file_exists:
                                 print(f'  ✓ File already exists: {filename}')
                             else:
                                 print(f'  ○ File to be downloaded: {filename}')
                             
-                            # Track this PDF
+                            # Track this PDF; the download fields (sha256, store_path, link_type) are kept
                             pdf_tracking_data.append({
                                 'bill_id': bill_id,
                                 'bill_name': row.get('BILL_NM'),
                                 'conference_kind': row.get('CONF_KND'),
-                                'conference_id': row.get('CONF_ID'),
+                                # Sanitized like the downloader's, since it is part of the tracking key
+                                'conference_id': conf_id,
                                 'eraco': row.get('ERACO'),
                                 'session': row.get('SESS'),
                                 'degree': row.get('DGR'),
@@ -125,37 +139,48 @@ class PdfTracker:
                 except Exception as result_error:
                     print(f'Error processing result: {result_error}')
             
-            # Save tracking data to JSON file
-            tracking_data = {
-                'summary': {
-                    'total_pdfs_tracked': total_tracked,
-                    'total_existing_files': sum(1 for p in pdf_tracking_data if p['file_exists']),
-                    'total_to_download': sum(1 for p in pdf_tracking_data if not p['file_exists']),
-                    'total_skipped': total_skipped,
-                    'generated_date': datetime.now().isoformat()
-                },
-                'pdfs': pdf_tracking_data
-            }
-            
-            tracking_file_path = self.base_dir / 'pdf_tracking_list.json'
-            with open(tracking_file_path, 'w', encoding='utf-8') as f:
-                json.dump(tracking_data, f, ensure_ascii=False, indent=2)
+            # Upsert into the tracking database in one transaction
+            tracking.upsert_many(pdf_tracking_data)
             
             print('\n=== PDF Tracking Summary ===')
             print(f'Total PDFs tracked: {total_tracked}')
-            print(f'Files already exist: {tracking_data["summary"]["total_existing_files"]}')
-            print(f'Files to download: {tracking_data["summary"]["total_to_download"]}')
+            print(f'Files already exist: {sum(1 for p in pdf_tracking_data if p["file_exists"])}')
+            print(f'Files to download: {sum(1 for p in pdf_tracking_data if not p["file_exists"])}')
             print(f'Total skipped: {total_skipped}')
-            print(f'Tracking data saved to: {tracking_file_path}')
+            orphans = inventory.find_orphans(referenced_files)
+            print_orphans(orphans)
+            print(f'Tracking data saved to: {self.base_dir / TRACKING_DB_FILENAME}')
+            
+            if orphans_output:
+                write_json(orphans_output, {
+                    'summary': {'total_orphans': len(orphans), 'generated_date': datetime.now().isoformat()},
+                    'orphans': [str(Path('pdf_downloads') / path) for path in orphans]
+                })
+                print(f'Orphaned files saved to: {orphans_output}')
+            
+            if export_json:
+                count = tracking.export_json(self.base_dir / TRACKING_JSON_FILENAME)
+                print(f'Exported {count} tracking entries to: {TRACKING_JSON_FILENAME}')
             
         except Exception as error:
             print(f'Error in track_conference_pdfs: {error}')
             raise error
+        finally:
+            tracking.close()
 
 def main():
     """Main function to run the PDF tracker"""
-    tracker = PdfTracker()
-    tracker.track_conference_pdfs()
+    parser = argparse.ArgumentParser(description='Track conference PDFs in the tracking database without downloading')
+    parser.add_argument('--export-json', action='store_true',
+                       help=f'Also export the tracking database to {TRACKING_JSON_FILENAME}')
+    parser.add_argument('--scan-workers', type=int, default=DEFAULT_SCAN_WORKERS,
+                       help=f'Threads listing the bill directories of pdf_downloads/ (default: {DEFAULT_SCAN_WORKERS})')
+    parser.add_argument('--orphans-output', type=Path, default=None,
+                       help='Write the files no conference row refers to into this JSON file')
+    args = parser.parse_args()
+    
+    tracker = PdfTracker(scan_workers=args.scan_workers)
+    tracker.track_conference_pdfs(args.export_json, args.orphans_output)
     print('PDF tracking process completed successfully!')
 
 if __name__ == "__main__":
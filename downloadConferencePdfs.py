@@ -1,41 +1,102 @@
 import asyncio
 import aiohttp
-import json
+import hashlib
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import argparse
+from urllib.parse import urlparse
+from rateLimiter import AdaptiveRateLimiter, BandwidthLimiter, is_throttle_status
+from workerPool import run_worker_pool
+from asyncFileWriter import AsyncFileWriter, run_blocking
+from jsonBackend import read_json, write_json, add_json_arguments, set_compact_output
+from pdfTrackingStore import PdfTrackingStore, open_tracking_store, TRACKING_DB_FILENAME, TRACKING_JSON_FILENAME
+from pdfInventory import PdfInventory, DEFAULT_SCAN_WORKERS, print_orphans
+from pdfStore import (ContentAddressedPdfStore, PDF_STORE_DIRNAME, CONFERENCE_INDEX_FILENAME,
+                      build_conference_index, get_conference_rows, check_pdf_file, has_pdf_magic, hash_into)
+
+
+class DownloadProgress:
+    """Live files/sec, MB/sec and ETA of a download run, printed at most once per interval"""
+
+    def __init__(self, total_files: int, interval: float = 10.0):
+        self.total_files = total_files
+        self.interval = interval
+        self.files = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self.reported = self.started
+        self.reported_bytes = 0
+
+    def add_bytes(self, amount: int) -> None:
+        """Count bytes as they are written, reporting if the interval has passed, so large transfers show progress"""
+        self.bytes += amount
+        self.report_if_due()
+
+    def file_done(self) -> None:
+        """Count a finished job and report if the interval has passed"""
+        self.files += 1
+        self.report_if_due()
+
+    def report_if_due(self) -> None:
+        """Report once the interval since the last report has passed"""
+        if time.monotonic() - self.reported >= self.interval:
+            self.report()
+
+    def report(self) -> None:
+        """Print the current rates and the estimated time left"""
+        now = time.monotonic()
+        since_report = max(now - self.reported, 1e-6)
+        current_mb_per_second = (self.bytes - self.reported_bytes) / since_report / 1024 / 1024
+        self.reported = now
+        self.reported_bytes = self.bytes
+        elapsed = max(now - self.started, 1e-6)
+        files_per_second = self.files / elapsed
+        remaining = self.total_files - self.files
+        eta = f'{remaining / files_per_second:.0f}s' if files_per_second > 0 else '?'
+        print(f'Progress: {self.files}/{self.total_files} PDFs, {files_per_second:.2f} files/s, '
+              f'{self.bytes / 1024 / 1024:.1f} MB received, {current_mb_per_second:.2f} MB/s now '
+              f'({self.bytes / elapsed / 1024 / 1024:.2f} MB/s average), ETA {eta}')
+
 
 class ConferencePdfDownloader:
-    def __init__(self):
-        self.base_dir = Path(__file__).parent
+    def __init__(self, rate_limiter: Optional[AdaptiveRateLimiter] = None, base_dir: Optional[Path] = None,
+                 trace_configs: Optional[List[aiohttp.TraceConfig]] = None, concurrency: int = 5,
+                 per_host_limit: int = 2, bandwidth_limiter: Optional[BandwidthLimiter] = None,
+                 progress_interval: float = 10.0, download_attempts: int = 3, write_threads: int = 4,
+                 write_buffer_size: int = 1024 * 1024, fsync_bytes: Optional[int] = None,
+                 scan_workers: int = DEFAULT_SCAN_WORKERS):
+        self.base_dir = base_dir or Path(__file__).parent
         self.downloads_dir = self.base_dir / 'pdf_downloads'
-
-    def load_tracking_data(self) -> List[Dict[str, Any]]:
-        """Load existing tracking data"""
-        try:
-            tracking_path = self.base_dir / 'pdf_tracking_list.json'
-            with open(tracking_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('pdfs', [])
-        except:
-            print('No existing tracking file found, starting fresh')
-            return []
-
-    def save_tracking_data(self, pdfs: List[Dict[str, Any]]) -> None:
-        """Save tracking data to JSON file"""
-        try:
-            tracking_path = self.base_dir / 'pdf_tracking_list.json'
-            data = {'pdfs': pdfs}
-            with open(tracking_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as error:
-            print(f'Warning: Failed to save tracking data: {error}')
+        self.store = ContentAddressedPdfStore(self.base_dir / PDF_STORE_DIRNAME)
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(requests_per_second=1.0)
+        self.trace_configs = trace_configs
+        self.concurrency = concurrency
+        self.per_host_limit = per_host_limit
+        self.bandwidth_limiter = bandwidth_limiter
+        self.progress_interval = progress_interval
+        self.download_attempts = download_attempts
+        self.write_threads = write_threads
+        self.write_buffer_size = write_buffer_size
+        self.fsync_bytes = fsync_bytes
+        self.scan_workers = scan_workers
+        # Disk work of the downloads runs here, off the event loop; None writes inline
+        self.write_executor: Optional[ThreadPoolExecutor] = None
+        self.host_slots: Dict[str, asyncio.Semaphore] = {}
+        self.progress: Optional[DownloadProgress] = None
+        self.tracking: Optional[PdfTrackingStore] = None
+        # Listing of pdf_downloads/ taken at the start of a run, for the legacy-file lookups
+        self.inventory: Optional[PdfInventory] = None
 
     def create_pdf_tracking_entry(self, bill_id: str, bill_name: str, conference_kind: str,
                                 conference_id: str, eraco: str, session: str, degree: str,
                                 conference_date: str, download_url: str, filename: str,
-                                full_path: str, relative_path: str, file_exists: bool) -> Dict[str, Any]:
+                                full_path: str, relative_path: str, file_exists: bool,
+                                sha256: Optional[str] = None, store_path: Optional[str] = None,
+                                link_type: Optional[str] = None) -> Dict[str, Any]:
         """Create a PDF tracking entry"""
         return {
             'bill_id': bill_id,
@@ -51,19 +112,17 @@ class ConferencePdfDownloader:
             'full_path': full_path,
             'relative_path': relative_path,
             'file_exists': file_exists,
+            'sha256': sha256,
+            'store_path': store_path,
+            'link_type': link_type,
             'tracked_date': datetime.now().isoformat()
         }
 
-    def is_pdf_already_tracked(self, tracking_list: List[Dict[str, Any]], bill_id: str,
-                             conference_id: str, bill_name: str, download_url: str) -> bool:
-        """Check if PDF is already tracked"""
-        return any(
-            entry.get('bill_id') == bill_id and
-            entry.get('conference_id') == conference_id and
-            entry.get('bill_name') == bill_name and
-            entry.get('download_url') == download_url
-            for entry in tracking_list
-        )
+    def get_pdf_filename(self, row: Dict[str, Any]) -> str:
+        """Per-bill filename built from the conference data fields"""
+        parts = [self.sanitize_filename(row.get(field, '_'))
+                 for field in ('CONF_KND', 'CONF_ID', 'ERACO', 'SESS', 'DGR', 'CONF_DT')]
+        return '_'.join(parts) + '.pdf'
 
     def sanitize_filename(self, text: str) -> str:
         """Sanitize text for use in filename"""
@@ -73,40 +132,338 @@ class ConferencePdfDownloader:
         sanitized = re.sub(r'[<>:"/\\|?*]', '_', str(text))
         return sanitized.strip() or '_'
 
-    async def download_pdf(self, session: aiohttp.ClientSession, url: str, file_path: Path) -> bool:
-        """Download a single PDF file"""
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
+    def get_file_size(self, path: Path) -> int:
+        """Size of a file, 0 if it does not exist"""
+        return path.stat().st_size if path.exists() else 0
+
+    def get_host_slot(self, url: str) -> asyncio.Semaphore:
+        """Semaphore capping the downloads in flight to the URL's host"""
+        host = urlparse(url).netloc
+        if host not in self.host_slots:
+            self.host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return self.host_slots[host]
+
+    async def fetch_into_part(self, session: aiohttp.ClientSession, url: str,
+                              temp_path: Path) -> Tuple[Optional[int], Any]:
+        """One GET into the .part file, resuming with a Range request if it already has bytes
+
+        Returns the full size announced by the server (None if unknown) and the SHA-256 of the part so far.
+        """
+        offset = await run_blocking(self.write_executor, self.get_file_size, temp_path)
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            # Raw bytes, so Content-Length and Range offsets count the bytes written to the part
+            'Accept-Encoding': 'identity'
+        }
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+        
+        async with self.get_host_slot(url):
+            await self.rate_limiter.acquire(url)
             
-            async with session.get(url, headers=headers, timeout=30) as response:
+            async with session.get(url, headers=headers) as response:
+                self.rate_limiter.record_response(url, response.status)
+                if response.status == 416:
+                    # The part is not a prefix of the current file; start over on the next attempt
+                    await run_blocking(self.write_executor, temp_path.unlink)
+                    raise Exception('Stale partial download discarded')
                 response.raise_for_status()
                 
-                # Save PDF file
-                with open(file_path, 'wb') as f:
-                    async for chunk in response.content.iter_chunked(8192):
-                        f.write(chunk)
+                if response.status == 206:
+                    content_range = re.fullmatch(r'bytes (\d+)-\d+/(\d+|\*)', response.headers.get('Content-Range', ''))
+                    if not content_range or int(content_range.group(1)) != offset:
+                        # Not the range that continues the part; drop it so the next attempt asks for the whole file
+                        if offset:
+                            await run_blocking(self.write_executor, temp_path.unlink)
+                        raise Exception(f'Unexpected Content-Range {response.headers.get("Content-Range")!r} '
+                                        f'for offset {offset}, partial download discarded')
+                    mode = 'ab'
+                    expected_size = int(content_range.group(2)) if content_range.group(2) != '*' else None
+                    digest = (await run_blocking(self.write_executor, hash_into, hashlib.sha256(), temp_path)
+                              if offset else hashlib.sha256())
+                elif response.status == 200:
+                    # No Range sent, or the server ignored it: the full body follows
+                    mode = 'wb'
+                    expected_size = response.content_length
+                    digest = hashlib.sha256()
+                else:
+                    raise Exception(f'Unexpected status {response.status}')
+                if response.headers.get('Content-Encoding', 'identity') != 'identity':
+                    # Encoded anyway: aiohttp decodes the body, so the announced size does not apply
+                    expected_size = None
                 
-                return True
+                # Hash while streaming so the content address is known once the last chunk is written
+                async with AsyncFileWriter(temp_path, mode, self.write_executor, self.write_buffer_size,
+                                           self.fsync_bytes) as f:
+                    # iter_any hands over every byte as it arrives, so a dropped connection loses nothing
+                    async for chunk in response.content.iter_any():
+                        await f.write(chunk)
+                        digest.update(chunk)
+                        if self.progress:
+                            self.progress.add_bytes(len(chunk))
+                        if self.bandwidth_limiter:
+                            await self.bandwidth_limiter.consume(len(chunk))
                 
+                return expected_size, digest
+
+    async def download_pdf(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        """Download a single PDF into the content-addressed store and return its SHA-256, or None on failure
+
+        Bytes land in a .part file named after the URL that only moves into the store once its size matches
+        Content-Length and it starts with %PDF. An interrupted transfer is resumed from where it stopped, in
+        this run or, since the .part file is kept, in the next one. A 429 or 5xx response is retried like a
+        dropped connection; any other error status gives up at once.
+        """
+        temp_path = self.store.new_temp_path(hashlib.sha1(url.encode('utf-8')).hexdigest())
+        for attempt in range(1, self.download_attempts + 1):
+            try:
+                expected_size, digest = await self.fetch_into_part(session, url, temp_path)
+            except aiohttp.ClientResponseError as error:
+                if not is_throttle_status(error.status):
+                    # Other 4xx (gone, forbidden) will not change on a retry
+                    print(f'Download error: {error}')
+                    return None
+                # The limiter has already backed off on this status, so the next attempt waits longer
+                print(f'Download throttled (attempt {attempt}/{self.download_attempts}): {error}')
+                continue
+            except Exception as error:
+                self.rate_limiter.record_error(url)
+                print(f'Download interrupted (attempt {attempt}/{self.download_attempts}): {error}')
+                continue
+            
+            size = await run_blocking(self.write_executor, self.get_file_size, temp_path)
+            if expected_size is None or size == expected_size:
+                break
+            if size > expected_size:
+                temp_path.unlink()
+            print(f'Download incomplete (attempt {attempt}/{self.download_attempts}): '
+                  f'{size} of {expected_size} bytes')
+        else:
+            return None
+        
+        if not await run_blocking(self.write_executor, has_pdf_magic, temp_path):
+            # An HTML error page or similar; never worth resuming
+            temp_path.unlink()
+            print(f'Download error: {url} is not a PDF')
+            return None
+        
+        await run_blocking(self.write_executor, self.store.add_temp_file, temp_path, digest.hexdigest())
+        return digest.hexdigest()
+
+    async def store_conference_pdf(self, session: aiohttp.ClientSession, conference: Dict[str, Any],
+                                   known_digest: Optional[str]) -> Tuple[Optional[str], str]:
+        """Make sure a conference PDF is in the store, downloading it only if no copy exists yet
+
+        Returns the digest (None on failure) and where it came from: stored, adopted or downloaded.
+        """
+        if await run_blocking(self.write_executor, self.store.contains, known_digest):
+            return known_digest, 'stored'
+        
+        # A per-bill copy from before the store existed is adopted instead of downloaded again
+        for bill_id, row in conference['bills'].items():
+            filename = self.get_pdf_filename(row)
+            if not self.inventory.contains(bill_id, filename):
+                continue
+            legacy_path = self.downloads_dir / bill_id / filename
+            if await run_blocking(self.write_executor, check_pdf_file, legacy_path) is None:
+                print(f'  ✓ Adopting existing file: {legacy_path.relative_to(self.base_dir)}')
+                return await run_blocking(self.write_executor, self.store.add_existing_file, legacy_path), 'adopted'
+        
+        return await self.download_pdf(session, conference['download_url']), 'downloaded'
+
+    def load_conference_digests(self) -> Dict[str, str]:
+        """DOWN_URL -> SHA-256 recorded in the conference index of a previous run"""
+        try:
+            conferences = read_json(self.base_dir / CONFERENCE_INDEX_FILENAME).get('conferences', [])
+        except Exception:
+            return {}
+        return {conference['download_url']: conference['sha256'] for conference in conferences
+                if conference.get('sha256') and conference.get('download_url')}
+
+    def save_conference_index(self, conference_index: Dict[str, Dict[str, Any]],
+                              digests: Dict[str, Optional[str]]) -> None:
+        """Save the DOWN_URL -> conference, stored file and bills index"""
+        try:
+            conferences = [{
+                'download_url': download_url,
+                'conference_id': conference['conference_id'],
+                'sha256': digests.get(download_url),
+                'store_path': (str(self.store.get_path(digests[download_url]).relative_to(self.base_dir))
+                               if digests.get(download_url) else None),
+                'bill_ids': list(conference['bills'])
+            } for download_url, conference in conference_index.items()]
+            write_json(self.base_dir / CONFERENCE_INDEX_FILENAME, {
+                'summary': {
+                    'unique_pdfs': len(conferences),
+                    'bill_links': sum(len(conference['bill_ids']) for conference in conferences),
+                    'indexed_date': datetime.now().isoformat()
+                },
+                'conferences': conferences
+            })
         except Exception as error:
-            print(f'Download error: {error}')
-            return False
+            print(f'Warning: Failed to save conference index: {error}')
+
+    def build_download_jobs(self, conference_index: Dict[str, Dict[str, Any]],
+                            known_digests: Dict[str, str]) -> Tuple[List[Dict[str, Any]], int]:
+        """One job per PDF that some bill still lacks, plus the number of bill copies already downloaded"""
+        jobs = []
+        skipped = 0
+        for download_url, conference in conference_index.items():
+            # Bills whose copy of this PDF is not downloaded yet; planned and failed entries are retried
+            pending = {
+                bill_id: row for bill_id, row in conference['bills'].items()
+                if not self.tracking.is_downloaded(bill_id, self.sanitize_filename(row.get('CONF_ID', '_')),
+                                                   download_url)
+            }
+            skipped += len(conference['bills']) - len(pending)
+            if pending:
+                jobs.append({'conference': conference, 'pending': pending,
+                             'known_digest': known_digests.get(download_url)})
+        return jobs, skipped
+
+    async def process_conference(self, session: aiohttp.ClientSession,
+                                 job: Dict[str, Any]) -> Tuple[Optional[str], str, Dict[str, Any]]:
+        """Worker of a download job: store the PDF, then link it into the bill directories off the event loop"""
+        digest, source = await self.store_conference_pdf(session, job['conference'], job['known_digest'])
+        placements = await run_blocking(self.write_executor, self.place_conference_pdf, job, digest) if digest else {}
+        return digest, source, placements
+
+    def place_conference_pdf(self, job: Dict[str, Any], digest: str) -> Dict[str, Any]:
+        """Link a stored PDF into each pending bill directory; bill_id -> (link type, file digest) or the error
+
+        Blocking (hashing and copying whole files), so it runs on the write executor.
+        """
+        placements: Dict[str, Any] = {}
+        for bill_id, row in job['pending'].items():
+            try:
+                # One stored file, exposed in every bill directory that lists the meeting
+                placements[bill_id] = self.store.link_into(digest, self.downloads_dir / bill_id / self.get_pdf_filename(row))
+            except Exception as link_error:
+                placements[bill_id] = link_error
+        return placements
+
+    def link_conference_pdf(self, job: Dict[str, Any], digest: Optional[str],
+                            placements: Dict[str, Any]) -> Tuple[int, int]:
+        """Track the bill copies placed by place_conference_pdf; returns (links, errors)"""
+        download_url = job['conference']['download_url']
+        linked = 0
+        errors = 0
+        for bill_id, row in job['pending'].items():
+            filename = self.get_pdf_filename(row)
+            bill_path = self.downloads_dir / bill_id / filename
+            relative_path = Path('pdf_downloads') / bill_id / filename
+            link_type = None
+            file_digest = digest
+            
+            if digest:
+                try:
+                    placement = placements.get(bill_id)
+                    if isinstance(placement, Exception):
+                        raise placement
+                    link_type, file_digest = placement
+                    linked += 1
+                    if link_type == 'existing':
+                        print(f'  ⚠️ Kept a different existing file, not linked to the store: {relative_path}')
+                    else:
+                        print(f'  ✓ Linked ({link_type}): {relative_path}')
+                except Exception as link_error:
+                    print(f'  ✗ Error linking {relative_path}: {link_error}')
+                    errors += 1
+            
+            file_exists = link_type is not None
+            # A kept file is tracked with its own hash, so --audit checks it against what is really on disk
+            in_store = file_exists and link_type != 'existing'
+            
+            # Upsert the tracking entry (failed downloads too, so they show up as DOWNLOAD_FAILED)
+            tracking_entry = self.create_pdf_tracking_entry(
+                bill_id,
+                row.get('BILL_NM', '_'),
+                self.sanitize_filename(row.get('CONF_KND', '_')),
+                self.sanitize_filename(row.get('CONF_ID', '_')),
+                self.sanitize_filename(row.get('ERACO', '_')),
+                self.sanitize_filename(row.get('SESS', '_')),
+                self.sanitize_filename(row.get('DGR', '_')),
+                self.sanitize_filename(row.get('CONF_DT', '_')),
+                download_url,
+                filename if file_exists else 'DOWNLOAD_FAILED',
+                str(bill_path) if file_exists else 'DOWNLOAD_FAILED',
+                str(relative_path) if file_exists else 'DOWNLOAD_FAILED',
+                file_exists,
+                file_digest,
+                str(self.store.get_path(digest).relative_to(self.base_dir)) if digest and in_store else None,
+                link_type
+            )
+            
+            self.tracking.upsert(tracking_entry)
+        return linked, errors
+
+    def audit_downloads(self, workers: int = 8) -> int:
+        """Check every PDF in pdf_downloads/ and the store in parallel, deleting broken ones so they are downloaded again
+
+        Tracked files are also checked against their recorded SHA-256. Tracking entries of broken files are
+        marked as not downloaded, which re-queues them; returns how many entries were re-queued.
+        """
+        print('Auditing downloaded PDFs...')
+        self.tracking = open_tracking_store(self.base_dir)
+        try:
+            return self.audit_tracked_files(workers)
+        finally:
+            self.tracking.close()
+            self.tracking = None
+
+    def audit_tracked_files(self, workers: int) -> int:
+        """Body of audit_downloads, run with the tracking store open"""
+        tracking = [entry for entry in self.tracking.iter_entries() if entry['file_exists']]
+        expected: Dict[Path, Optional[str]] = {}
+        for entry in tracking:
+            expected[self.base_dir / entry['relative_path']] = entry.get('sha256')
+        inventory = PdfInventory.scan(self.downloads_dir, self.scan_workers, stat_files=False)
+        for directory, filename, _ in inventory.iter_files():
+            expected.setdefault(inventory.get_path(directory, filename), None)
+        for path in self.store.root.glob('*/*.pdf'):
+            # A stored file is named after its own digest
+            expected[path] = path.stem
+        
+        paths = list(expected)
+        # Disk-bound (and hashing releases the GIL), so threads keep a network mount busy
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            reasons = list(executor.map(lambda path: check_pdf_file(path, expected[path]), paths))
+        broken = {path: reason for path, reason in zip(paths, reasons) if reason}
+        
+        for path, reason in broken.items():
+            print(f'  ✗ {path.relative_to(self.base_dir)}: {reason}')
+            if path.exists() or path.is_symlink():
+                path.unlink()
+        
+        broken_names = {str(path.relative_to(self.base_dir)) for path in broken}
+        requeued = [entry for entry in tracking
+                    if entry['relative_path'] in broken_names or entry.get('store_path') in broken_names]
+        self.tracking.upsert_many({**entry, 'file_exists': False, 'link_type': None} for entry in requeued)
+        
+        print(f'Audited {len(paths)} files: {len(broken)} broken, {len(requeued)} tracking entries re-queued')
+        return len(requeued)
 
-    async def download_conference_pdfs(self) -> None:
-        """Main method to download conference PDFs"""
+    async def download_conference_pdfs(self, export_json: bool = False) -> None:
+        """Main method to download conference PDFs, each unique PDF once, with concurrent workers"""
+        self.tracking = open_tracking_store(self.base_dir)
+        try:
+            await self.download_untracked_pdfs()
+            if export_json:
+                count = self.tracking.export_json(self.base_dir / TRACKING_JSON_FILENAME)
+                print(f'Exported {count} tracking entries to: {TRACKING_JSON_FILENAME}')
+        finally:
+            self.tracking.close()
+            self.tracking = None
+
+    async def download_untracked_pdfs(self) -> None:
+        """Body of download_conference_pdfs, run with the tracking store open"""
         try:
             print('Starting PDF download process...')
-            
-            # Load existing tracking data
-            existing_tracking = self.load_tracking_data()
-            print(f'Found {len(existing_tracking)} existing tracking entries')
+            print(f'Found {len(self.tracking)} existing tracking entries')
             
             # Read the conference API results file
             file_path = self.base_dir / 'assembly_bills_conference_api_results.json'
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = read_json(file_path)
             
             if 'results' not in data or not isinstance(data['results'], list):
                 raise Exception('No results array found in the file')
@@ -114,164 +471,91 @@ class ConferencePdfDownloader:
             print(f'Found {len(data["results"])} total results')
             
             # Filter results that have api_response with data
-            valid_results = []
-            for result in data['results']:
-                try:
-                    if (result.get('api_response') and 
-                        isinstance(result['api_response'], list) and 
-                        len(result['api_response']) >= 2 and
-                        result['api_response'][1] and
-                        'row' in result['api_response'][1] and
-                        isinstance(result['api_response'][1]['row'], list)):
-                        valid_results.append(result)
-                except:
-                    continue
-            
+            valid_results = [result for result in data['results'] if get_conference_rows(result)]
             print(f'Found {len(valid_results)} results with valid API responses')
             
+            # The same meeting is listed under many bills; group the rows by DOWN_URL
+            conference_index = build_conference_index(valid_results)
+            bill_links = sum(len(conference['bills']) for conference in conference_index.values())
+            print(f'Found {len(conference_index)} unique PDFs linked from {bill_links} bill conferences')
+            
             # Create downloads directory
             self.downloads_dir.mkdir(exist_ok=True)
             
-            total_downloaded = 0
-            total_skipped = 0
-            total_errors = 0
-            new_tracking_entries = existing_tracking.copy()
+            # Names only: existing copies are validated when adopted, so sizes are not needed here
+            self.inventory = PdfInventory.scan(self.downloads_dir, self.scan_workers, stat_files=False)
+            print(f'Found {len(self.inventory)} PDF files in {self.downloads_dir}')
+            print_orphans(self.inventory.find_orphans(
+                (bill_id, self.get_pdf_filename(row))
+                for conference in conference_index.values() for bill_id, row in conference['bills'].items()
+            ))
+            
+            known_digests = self.tracking.get_known_digests()
+            for download_url, digest in self.load_conference_digests().items():
+                # The index still knows stored PDFs whose tracking entries were re-queued
+                known_digests.setdefault(download_url, digest)
+            digests = {download_url: known_digests.get(download_url) for download_url in conference_index}
             
-            connector = aiohttp.TCPConnector(limit=5)
-            timeout = aiohttp.ClientTimeout(total=30)
+            jobs, total_skipped = self.build_download_jobs(conference_index, known_digests)
+            stats = {'downloaded': 0, 'adopted': 0, 'linked': 0, 'errors': 0}
+            self.progress = DownloadProgress(len(jobs), self.progress_interval)
             
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                for result in valid_results:
-                    try:
-                        rows = result['api_response'][1]['row']
-                        
-                        if not rows:
-                            print('No conference data found for this result')
-                            total_skipped += 1
-                            continue
-                        
-                        # Get BILL_ID from the first row (all rows should have the same BILL_ID)
-                        bill_id = rows[0].get('BILL_ID')
-                        
-                        if not bill_id:
-                            print('No BILL_ID found in response')
-                            total_skipped += 1
-                            continue
-                        
-                        print(f'Processing BILL_ID: {bill_id}')
-                        
-                        # Create directory for this BILL_ID
-                        bill_dir = self.downloads_dir / bill_id
-                        bill_dir.mkdir(exist_ok=True)
-                        
-                        # Download PDFs for each row
-                        for i, row in enumerate(rows):
-                            if not row.get('DOWN_URL'):
-                                print(f'  No download URL for row {i + 1}')
-                                continue
-                            
-                            try:
-                                # Create filename from conference data fields
-                                conf_knd = self.sanitize_filename(row.get('CONF_KND', '_'))
-                                conf_id = self.sanitize_filename(row.get('CONF_ID', '_'))
-                                eraco = self.sanitize_filename(row.get('ERACO', '_'))
-                                sess = self.sanitize_filename(row.get('SESS', '_'))
-                                dgr = self.sanitize_filename(row.get('DGR', '_'))
-                                conf_dt = self.sanitize_filename(row.get('CONF_DT', '_'))
-                                
-                                filename = f'{conf_knd}_{conf_id}_{eraco}_{sess}_{dgr}_{conf_dt}.pdf'
-                                file_path = bill_dir / filename
-                                relative_path = Path('pdf_downloads') / bill_id / filename
-                                
-                                # Check if this PDF is already tracked
-                                if self.is_pdf_already_tracked(new_tracking_entries, bill_id, 
-                                                             conf_id, row.get('BILL_NM', ''), row['DOWN_URL']):
-                                    print(f'  ○ Already tracked: {filename}')
-                                    total_skipped += 1
-                                    continue
-                                
-                                # Check if file already exists on filesystem
-                                file_exists = file_path.exists()
-                                if file_exists:
-                                    print(f'  ✓ File already exists: {filename}')
-                                    total_skipped += 1
-                                else:
-                                    print(f'  Downloading: {filename}')
-                                    
-                                    # Download PDF
-                                    success = await self.download_pdf(session, row['DOWN_URL'], file_path)
-                                    
-                                    if success:
-                                        print(f'  ✓ Downloaded: {filename}')
-                                        total_downloaded += 1
-                                        file_exists = True
-                                        
-                                        # Add small delay between downloads
-                                        await asyncio.sleep(1)
-                                    else:
-                                        print(f'  ✗ Download failed: {filename}')
-                                        total_errors += 1
-                                
-                                # Add to tracking list (even if file already existed)
-                                tracking_entry = self.create_pdf_tracking_entry(
-                                    bill_id,
-                                    row.get('BILL_NM', '_'),
-                                    conf_knd,
-                                    conf_id,
-                                    eraco,
-                                    sess,
-                                    dgr,
-                                    conf_dt,
-                                    row['DOWN_URL'],
-                                    filename if file_exists else 'DOWNLOAD_FAILED',
-                                    str(file_path) if file_exists else 'DOWNLOAD_FAILED',
-                                    str(relative_path) if file_exists else 'DOWNLOAD_FAILED',
-                                    file_exists
-                                )
-                                
-                                new_tracking_entries.append(tracking_entry)
-                                
-                                # Save tracking data periodically (every 10 downloads)
-                                if len(new_tracking_entries) % 10 == 0:
-                                    self.save_tracking_data(new_tracking_entries)
-                                
-                            except Exception as download_error:
-                                print(f'  ✗ Error downloading {row["DOWN_URL"]}: {download_error}')
-                                total_errors += 1
-                                
-                                # Still add to tracking list even if download failed
-                                tracking_entry = self.create_pdf_tracking_entry(
-                                    bill_id,
-                                    row.get('BILL_NM', '_'),
-                                    row.get('CONF_KND', '_'),
-                                    row.get('CONF_ID', '_'),
-                                    row.get('ERACO', '_'),
-                                    row.get('SESS', '_'),
-                                    row.get('DGR', '_'),
-                                    row.get('CONF_DT', '_'),
-                                    row['DOWN_URL'],
-                                    'DOWNLOAD_FAILED',
-                                    'DOWNLOAD_FAILED',
-                                    'DOWNLOAD_FAILED',
-                                    False
-                                )
-                                
-                                new_tracking_entries.append(tracking_entry)
-                        
-                    except Exception as result_error:
-                        print(f'Error processing result: {result_error}')
-                        total_errors += 1
+            def handle_result(job: Dict[str, Any], result: Any) -> None:
+                # Runs on the event loop as each worker finishes, so the tracking store has a single writer
+                download_url = job['conference']['download_url']
+                digest, source, placements = (None, None, {}) if isinstance(result, Exception) else result
+                if isinstance(result, Exception):
+                    print(f'  ✗ Error downloading {download_url}: {result}')
+                
+                digests[download_url] = digest
+                if digest and source in ('downloaded', 'adopted'):
+                    stats[source] += 1
+                if not digest:
+                    print(f'  ✗ Download failed: {download_url}')
+                    stats['errors'] += 1
+                
+                linked, errors = self.link_conference_pdf(job, digest, placements)
+                stats['linked'] += linked
+                stats['errors'] += errors
+                self.progress.file_done()
             
-            # Save final tracking data
-            self.save_tracking_data(new_tracking_entries)
+            if jobs:
+                print(f'Processing {len(jobs)} PDFs for {sum(len(job["pending"]) for job in jobs)} bills '
+                      f'({self.concurrency} workers, {self.per_host_limit} per host)')
+                connector = aiohttp.TCPConnector(limit=self.concurrency)
+                # No total timeout: a large transcript under a bandwidth cap can take minutes
+                timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=30)
+                
+                self.write_executor = ThreadPoolExecutor(max_workers=self.write_threads) if self.write_threads else None
+                try:
+                    async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                                     trace_configs=self.trace_configs) as session:
+                        await run_worker_pool(
+                            jobs,
+                            lambda job: self.process_conference(session, job),
+                            handle_result,
+                            self.concurrency
+                        )
+                finally:
+                    if self.write_executor:
+                        self.write_executor.shutdown()
+                    self.write_executor = None
+                self.progress.report()
+            
+            # Tracking entries are already upserted; only the conference index is written at the end
+            self.save_conference_index(conference_index, digests)
             
             print('\n=== Download Summary ===')
-            print(f'Total PDFs downloaded: {total_downloaded}')
+            print(f'Unique PDFs downloaded: {stats["downloaded"]}')
+            print(f'Existing files adopted: {stats["adopted"]}')
+            print(f'Bill links created: {stats["linked"]}')
+            print(f'Downloads avoided by sharing: {stats["linked"] - stats["downloaded"] - stats["adopted"]}')
             print(f'Total skipped: {total_skipped}')
-            print(f'Total errors: {total_errors}')
-            print(f'Total tracked entries: {len(new_tracking_entries)}')
-            print(f'Downloads saved to: {self.downloads_dir}')
-            print(f'Tracking data saved to: pdf_tracking_list.json')
+            print(f'Total errors: {stats["errors"]}')
+            print(f'Total tracked entries: {len(self.tracking)}')
+            print(f'Downloads saved to: {self.store.root} (linked into {self.downloads_dir})')
+            print(f'Tracking data saved to: {TRACKING_DB_FILENAME}')
+            print(f'Conference index saved to: {CONFERENCE_INDEX_FILENAME}')
             
         except Exception as error:
             print(f'Error in download_conference_pdfs: {error}')
@@ -279,12 +563,55 @@ class ConferencePdfDownloader:
 
 def main():
     """Main function to run the PDF downloader"""
+    parser = argparse.ArgumentParser(description='Download conference PDF transcripts')
+    parser.add_argument('--requests-per-second', type=float, default=1.0,
+                       help='Maximum downloads started per second per host (default: 1)')
+    parser.add_argument('--concurrency', type=int, default=5,
+                       help='Number of download workers (default: 5)')
+    parser.add_argument('--per-host-limit', type=int, default=2,
+                       help='Maximum downloads in flight to one host (default: 2)')
+    parser.add_argument('--max-mbps', type=float, default=None,
+                       help='Global download bandwidth cap in MB/s (default: no cap)')
+    parser.add_argument('--progress-interval', type=float, default=10.0,
+                       help='Seconds between progress reports (default: 10)')
+    parser.add_argument('--download-attempts', type=int, default=3,
+                       help='Attempts per PDF, each resuming the partial file (default: 3)')
+    parser.add_argument('--write-threads', type=int, default=4,
+                       help='Threads doing the disk writes of downloads; 0 writes on the event loop (default: 4)')
+    parser.add_argument('--write-buffer-kb', type=int, default=1024,
+                       help='Bytes collected per download before each disk write, in KB (default: 1024)')
+    parser.add_argument('--fsync-mb', type=float, default=None,
+                       help='Force downloads to disk every N MB and before they enter the store (default: no fsync)')
+    parser.add_argument('--audit', action='store_true',
+                       help='Check existing PDFs first and re-download corrupt, short or failed ones')
+    parser.add_argument('--audit-workers', type=int, default=8,
+                       help='Threads used to check files in audit mode (default: 8)')
+    parser.add_argument('--scan-workers', type=int, default=DEFAULT_SCAN_WORKERS,
+                       help=f'Threads listing the bill directories of pdf_downloads/ (default: {DEFAULT_SCAN_WORKERS})')
+    parser.add_argument('--export-json', action='store_true',
+                       help=f'Also export the tracking database to {TRACKING_JSON_FILENAME} when done')
+    add_json_arguments(parser)
+    
+    args = parser.parse_args()
+    set_compact_output(args.compact_json)
+    
     async def run():
-        downloader = ConferencePdfDownloader()
-        await downloader.download_conference_pdfs()
+        bandwidth_limiter = BandwidthLimiter(args.max_mbps * 1024 * 1024) if args.max_mbps else None
+        downloader = ConferencePdfDownloader(AdaptiveRateLimiter(args.requests_per_second),
+                                             concurrency=args.concurrency, per_host_limit=args.per_host_limit,
+                                             bandwidth_limiter=bandwidth_limiter,
+                                             progress_interval=args.progress_interval,
+                                             download_attempts=args.download_attempts,
+                                             write_threads=args.write_threads,
+                                             write_buffer_size=args.write_buffer_kb * 1024,
+                                             fsync_bytes=int(args.fsync_mb * 1024 * 1024) if args.fsync_mb else None,
+                                             scan_workers=args.scan_workers)
+        if args.audit:
+            downloader.audit_downloads(args.audit_workers)
+        await downloader.download_conference_pdfs(args.export_json)
         print('PDF download process completed successfully!')
     
     asyncio.run(run())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
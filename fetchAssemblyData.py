@@ -1,228 +1,302 @@
 import requests
-import json
 import asyncio
 import aiohttp
 import time
 import os
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional
+import argparse
 from dotenv import load_dotenv
+from rateLimiter import AdaptiveRateLimiter
+from retryPolicy import RetryPolicy
+from fetchCheckpoint import FetchCheckpoint
+from ndjsonStore import NdjsonWriter, get_ndjson_path
+from responseCache import ResponseCache, add_cache_arguments, create_cache_from_args
+from billFingerprints import OPEN_TERMS
+from openApiPaginator import OpenApiPaginator, get_endpoint_url
+from jsonBackend import write_json, add_json_arguments, set_compact_output
 
 load_dotenv()
 
 class AssemblyDataFetcher:
-    def __init__(self):
+    def __init__(self, max_concurrent_pages: int = 5, max_concurrent_jobs: int = 4,
+                 connection_limit: int = 10, rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None, resume: bool = False,
+                 output_format: str = 'json', compression: str = 'none',
+                 response_cache: Optional[ResponseCache] = None, incremental: bool = False,
+                 base_dir: Optional[Path] = None, trace_configs: Optional[List[aiohttp.TraceConfig]] = None):
         self.api_key = os.getenv('API_KEY')
         if not self.api_key:
             raise ValueError('API_KEY is not set in environment variables. Please check your .env file.')
         self.page_size = 1000
-        self.base_dir = Path(__file__).parent
+        self.max_concurrent_pages = max_concurrent_pages
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.connection_limit = connection_limit
+        # Incremental mode only re-pulls the terms still in session; closed terms keep their files
+        self.terms = OPEN_TERMS if incremental else range(10, 23)  # 10-22대
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.response_cache = response_cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.resume = resume
+        self.output_format = output_format
+        self.compression = compression
+        self.base_dir = base_dir or Path(__file__).parent
+        self.trace_configs = trace_configs
+        self.checkpoint = FetchCheckpoint(self.base_dir / 'fetch_checkpoint')
+        self.paginator = OpenApiPaginator(self.api_key, self.rate_limiter, self.retry_policy, self.response_cache,
+                                          self.page_size, self.max_concurrent_pages)
         
         self.apis = [
             {
                 'name': 'ALLNAMEMBER',
-                'url': 'https://open.assembly.go.kr/portal/openapi/ALLNAMEMBER',
+                'url': get_endpoint_url('ALLNAMEMBER'),
                 'filename': 'assembly_members_integrated.json'
             },
             {
                 'name': 'nprlapfmaufmqytet',
-                'url': 'https://open.assembly.go.kr/portal/openapi/nprlapfmaufmqytet',
+                'url': get_endpoint_url('nprlapfmaufmqytet'),
                 'filename': 'assembly_members_history_daesu_{DAESU}.json',
                 'is_daesu_iteration': True
             },
             {
                 'name': 'nwvrqwxyaytdsfvhu',
-                'url': 'https://open.assembly.go.kr/portal/openapi/nwvrqwxyaytdsfvhu',
+                'url': get_endpoint_url('nwvrqwxyaytdsfvhu'),
                 'filename': 'assembly_members_profile.json'
             },
             {
                 'name': 'nzmimeepazxkubdpn',
-                'url': 'https://open.assembly.go.kr/portal/openapi/nzmimeepazxkubdpn',
+                'url': get_endpoint_url('nzmimeepazxkubdpn'),
                 'filename': 'assembly_bills_age_{AGE}.json',
                 'is_age_iteration': True
             }
         ]
 
-    async def fetch_api_data(self, session: aiohttp.ClientSession, api: Dict[str, Any], 
-                           extra_params: str = '') -> Dict[str, Any]:
-        """Fetch data from a single API endpoint with pagination"""
-        print(f"Starting data collection for {api['name']}...")
+    async def fetch_endpoint_data(self, session: aiohttp.ClientSession, api: Dict[str, Any],
+                                  params: Dict[str, Any], label: str,
+                                  on_page: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> Dict[str, Any]:
+        """Fetch every page of an endpoint for the given term params, resuming from its checkpoint"""
+        print(f"Starting data collection for {label}...")
         
         all_data = []
-        p_index = api.get('start_index', 1)
-        has_more_data = True
-
-        while has_more_data:
-            try:
-                url = f"{api['url']}?KEY={self.api_key}&Type=json&pIndex={p_index}&pSize={self.page_size}{extra_params}"
-                print(f"Fetching {api['name']} - Page {p_index}...")
-                
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    
-                    # Extract the actual data array from the response
-                    data_key = next(iter(data.keys()))
-                    items = data.get(data_key, [None, {}])[1].get('row', []) if len(data.get(data_key, [])) > 1 else []
-                    
-                    if not items:
-                        has_more_data = False
-                        print(f"No more data for {api['name']} at page {p_index}")
-                    else:
-                        all_data.extend(items)
-                        print(f"Collected {len(items)} items from {api['name']} page {p_index}")
-                        p_index += 1
-                    
-                    # Add delay to avoid overwhelming the server
-                    await asyncio.sleep(0.1)
-                    
-            except Exception as error:
-                print(f"Error fetching {api['name']} page {p_index}: {error}")
-                has_more_data = False
-
-        return {
-            'api': api['name'],
-            'total_items': len(all_data),
-            'data': all_data
-        }
-
-    async def fetch_daesu_data(self, session: aiohttp.ClientSession, api: Dict[str, Any], 
-                             daesu: int) -> Dict[str, Any]:
-        """Fetch data for a specific DAESU (assembly term)"""
-        print(f"Starting data collection for {api['name']} DAESU {daesu}...")
+        on_page = on_page or all_data.extend
+        total_items = 0
         
-        all_data = []
-        p_index = 1
-        has_more_data = True
-
-        while has_more_data:
-            try:
-                url = f"{api['url']}?KEY={self.api_key}&Type=json&pIndex={p_index}&pSize={self.page_size}&DAESU={daesu}"
-                print(f"Fetching {api['name']} DAESU {daesu} - Page {p_index}...")
-                
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    
-                    # Extract the actual data array from the response
-                    data_key = next(iter(data.keys()))
-                    items = data.get(data_key, [None, {}])[1].get('row', []) if len(data.get(data_key, [])) > 1 else []
-                    
-                    if not items:
-                        has_more_data = False
-                        print(f"No more data for {api['name']} DAESU {daesu} at page {p_index}")
-                    else:
-                        all_data.extend(items)
-                        print(f"Collected {len(items)} items from {api['name']} DAESU {daesu} page {p_index}")
-                        p_index += 1
-                    
-                    # Add delay to avoid overwhelming the server
-                    await asyncio.sleep(0.1)
-                    
-            except Exception as error:
-                print(f"Error fetching {api['name']} DAESU {daesu} page {p_index}: {error}")
-                has_more_data = False
-
-        return {
-            'api': api['name'],
-            'daesu': daesu,
-            'total_items': len(all_data),
-            'data': all_data
-        }
-
-    async def fetch_age_data(self, session: aiohttp.ClientSession, api: Dict[str, Any], 
-                           age: int) -> Dict[str, Any]:
-        """Fetch data for a specific AGE (assembly term)"""
-        print(f"Starting data collection for {api['name']} AGE {age}...")
+        if self.checkpoint.is_completed(label):
+            self.checkpoint.clear(label)
         
-        all_data = []
-        p_index = api.get('start_index', 1)
-        has_more_data = True
-
-        while has_more_data:
-            try:
-                url = f"{api['url']}?KEY={self.api_key}&Type=json&pIndex={p_index}&pSize={self.page_size}&AGE={age}"
-                print(f"Fetching {api['name']} AGE {age} - Page {p_index}...")
-                
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    
-                    # Extract the actual data array from the response
-                    data_key = next(iter(data.keys()))
-                    items = data.get(data_key, [None, {}])[1].get('row', []) if len(data.get(data_key, [])) > 1 else []
-                    
-                    if not items:
-                        has_more_data = False
-                        print(f"No more data for {api['name']} AGE {age} at page {p_index}")
-                    else:
-                        all_data.extend(items)
-                        print(f"Collected {len(items)} items from {api['name']} AGE {age} page {p_index}")
-                        p_index += 1
-                    
-                    # Add delay to avoid overwhelming the server
-                    await asyncio.sleep(0.1)
-                    
-            except Exception as error:
-                print(f"Error fetching {api['name']} AGE {age} page {p_index}: {error}")
-                has_more_data = False
+        restored_page = None
+        for p_index, rows in self.checkpoint.iter_pages(label):
+            on_page(rows)
+            total_items += len(rows)
+            restored_page = p_index
+        
+        if restored_page is not None:
+            print(f"Resuming {label} after page {restored_page} ({total_items} items restored)")
+            pages = self.paginator.iter_pages(session, api['url'], params, label, start_page=restored_page + 1,
+                                              total_count=self.checkpoint.get(label)['total_count'])
+        else:
+            pages = self.paginator.iter_pages(session, api['url'], params, label)
+        
+        async for page in pages:
+            print(f"Collected {len(page['rows'])} items from {label} page {page['page']}")
+            self.checkpoint.record_page(label, page['page'], page['rows'], page['total_count'])
+            on_page(page['rows'])
+            total_items += len(page['rows'])
 
-        return {
+        # Term params are kept as lowercase metadata keys ('daesu', 'age') for the loaders
+        result = {
             'api': api['name'],
-            'age': age,
-            'total_items': len(all_data),
-            'data': all_data
+            **{key.lower(): value for key, value in params.items()},
+            'total_items': total_items
         }
+        if on_page == all_data.extend:
+            result['data'] = all_data
+        return result
 
-    def save_to_file(self, result: Dict[str, Any], filename: str) -> None:
+    def save_to_file(self, result: Dict[str, Any], filename: str) -> bool:
         """Save result data to JSON file"""
         try:
-            file_path = self.base_dir / filename
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
+            write_json(self.base_dir / filename, result)
             print(f"Saved {result['total_items']} items to {filename}")
+            return True
         except Exception as error:
             print(f"Error saving to {filename}: {error}")
+            return False
+
+    def get_output_path(self, job: Dict[str, Any]) -> Path:
+        """Output file of a job in the configured format"""
+        if self.output_format == 'json':
+            return self.base_dir / job['filename']
+        return get_ndjson_path(self.base_dir, job['filename'], self.compression)
+
+    async def fetch_to_file(self, session: aiohttp.ClientSession, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Fetch a job and write its output in the configured format"""
+        if self.output_format == 'json':
+            result = await self.fetch_endpoint_data(session, job['api'], job['params'], job['label'])
+            if not self.save_to_file(result, job['filename']):
+                raise Exception(f"could not save {job['filename']}")
+            return result
+        
+        # Stream each page straight to disk so memory stays flat regardless of term size
+        writer = NdjsonWriter(self.get_output_path(job), self.compression)
+        try:
+            result = await self.fetch_endpoint_data(session, job['api'], job['params'], job['label'],
+                                                    writer.write_rows)
+            writer.commit(result)
+        except BaseException:
+            writer.abort()
+            raise
+        print(f"Saved {result['total_items']} items to {writer.path.name}")
+        return result
 
-    async def run(self) -> None:
+    def build_jobs(self) -> List[Dict[str, Any]]:
+        """Expand the API list into one job per (api, term)"""
+        jobs = []
+        for api in self.apis:
+            if api.get('is_daesu_iteration'):
+                # Handle DAESU iteration for member history API
+                for daesu in self.terms:
+                    jobs.append({
+                        'api': api,
+                        'label': f"{api['name']} DAESU {daesu}",
+                        'filename': api['filename'].replace('{DAESU}', str(daesu)),
+                        'params': {'DAESU': daesu}
+                    })
+            elif api.get('is_age_iteration'):
+                # Handle AGE iteration for bills API
+                for age in self.terms:
+                    jobs.append({
+                        'api': api,
+                        'label': f"{api['name']} AGE {age}",
+                        'filename': api['filename'].replace('{AGE}', str(age)),
+                        'params': {'AGE': age}
+                    })
+            else:
+                jobs.append({
+                    'api': api,
+                    'label': api['name'],
+                    'filename': api['filename'],
+                    'params': {}
+                })
+        return jobs
+
+    async def run_job(self, session: aiohttp.ClientSession, job: Dict[str, Any],
+                      semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Run a single (api, term) job and save its file as soon as it finishes"""
+        if self.resume and self.checkpoint.is_completed(job['label']) and self.get_output_path(job).exists():
+            print(f"Skipping {job['label']}: already completed in a previous run")
+            return {
+                'label': job['label'],
+                'filename': job['filename'],
+                'status': 'skipped',
+                'total_items': 0,
+                'elapsed': 0.0
+            }
+        
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await self.fetch_to_file(session, job)
+                self.checkpoint.mark_completed(job['label'])
+                print(f"Completed {job['label']}: {result['total_items']} total items\n")
+                status = 'success'
+                total_items = result['total_items']
+            except Exception as error:
+                print(f"Failed to process {job['label']}: {error}")
+                status = 'error'
+                total_items = 0
+            
+            return {
+                'label': job['label'],
+                'filename': job['filename'],
+                'status': status,
+                'total_items': total_items,
+                'elapsed': time.perf_counter() - started
+            }
+
+    def print_timing_table(self, timings: List[Dict[str, Any]], total_elapsed: float) -> None:
+        """Print a per-job timing table"""
+        label_width = max([len(t['label']) for t in timings] + [len('Job')])
+        
+        print('\n=== Fetch Timing Summary ===')
+        print(f"{'Job':<{label_width}}  {'Status':<7}  {'Items':>8}  {'Seconds':>8}")
+        for timing in sorted(timings, key=lambda t: t['elapsed'], reverse=True):
+            print(f"{timing['label']:<{label_width}}  {timing['status']:<7}  "
+                  f"{timing['total_items']:>8}  {timing['elapsed']:>8.2f}")
+        print(f"Total wall-clock time: {total_elapsed:.2f}s for {len(timings)} jobs")
+
+    async def run(self) -> List[Dict[str, Any]]:
         """Main execution method"""
         print('Starting API data aggregation...')
         
-        connector = aiohttp.TCPConnector(limit=10)
+        if not self.resume:
+            self.checkpoint.reset()
+        
+        jobs = self.build_jobs()
+        print(f'Scheduling {len(jobs)} jobs (max {self.max_concurrent_jobs} concurrent)')
+        
+        connector = aiohttp.TCPConnector(limit=self.connection_limit)
         timeout = aiohttp.ClientTimeout(total=30)
+        semaphore = asyncio.Semaphore(self.max_concurrent_jobs)
+        started = time.perf_counter()
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         trace_configs=self.trace_configs) as session:
+            timings = await asyncio.gather(*(self.run_job(session, job, semaphore) for job in jobs))
+        
+        self.print_timing_table(timings, time.perf_counter() - started)
+        if self.response_cache:
+            self.response_cache.print_stats()
+        
+        failed = [t for t in timings if t['status'] == 'error']
+        if failed:
+            print(f'{len(failed)} jobs failed: {", ".join(t["label"] for t in failed)}')
+            print('Re-run with --resume to continue them from their last saved page')
+        else:
+            print('All APIs processed successfully!')
         
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            for api in self.apis:
-                try:
-                    if api.get('is_daesu_iteration'):
-                        # Handle DAESU iteration for member history API
-                        for daesu in range(10, 23):  # 10-22대
-                            result = await self.fetch_daesu_data(session, api, daesu)
-                            filename = api['filename'].replace('{DAESU}', str(daesu))
-                            self.save_to_file(result, filename)
-                            print(f"Completed {api['name']} DAESU {daesu}: {result['total_items']} total items\n")
-                    
-                    elif api.get('is_age_iteration'):
-                        # Handle AGE iteration for bills API
-                        for age in range(10, 23):  # 10-22대
-                            result = await self.fetch_age_data(session, api, age)
-                            filename = api['filename'].replace('{AGE}', str(age))
-                            self.save_to_file(result, filename)
-                            print(f"Completed {api['name']} AGE {age}: {result['total_items']} total items\n")
-                    
-                    else:
-                        result = await self.fetch_api_data(session, api)
-                        self.save_to_file(result, api['filename'])
-                        print(f"Completed {api['name']}: {result['total_items']} total items\n")
-                        
-                except Exception as error:
-                    print(f"Failed to process {api['name']}: {error}")
-        
-        print('All APIs processed successfully!')
+        return timings
 
 def main():
     """Main function to run the assembly data fetcher"""
-    fetcher = AssemblyDataFetcher()
+    parser = argparse.ArgumentParser(description='Fetch assembly member and bill data from the Open API')
+    parser.add_argument('--max-concurrent-pages', type=int, default=5,
+                       help='Maximum number of pages fetched concurrently per endpoint (default: 5)')
+    
+    parser.add_argument('--max-concurrent-jobs', type=int, default=4,
+                       help='Maximum number of (api, term) jobs run concurrently (default: 4)')
+    parser.add_argument('--connection-limit', type=int, default=10,
+                       help='Maximum number of open connections in the shared session (default: 10)')
+    
+    parser.add_argument('--requests-per-second', type=float, default=5.0,
+                       help='Maximum Open API requests per second per host (default: 5)')
+    parser.add_argument('--max-retries', type=int, default=5,
+                       help='Attempts per page before a job is marked as failed (default: 5)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Skip jobs completed in the previous run and resume failed ones from their checkpoint')
+    parser.add_argument('--output-format', choices=['json', 'ndjson'], default='json',
+                       help='json writes one indented file per job; ndjson streams each page to disk (default: json)')
+    parser.add_argument('--compression', choices=['none', 'gzip', 'zstd'], default='none',
+                       help='Compression for ndjson output (default: none)')
+    
+    parser.add_argument('--incremental', action='store_true',
+                       help='Only re-pull the open assembly term(s) for DAESU/AGE endpoints')
+    add_cache_arguments(parser)
+    add_json_arguments(parser)
+    
+    args = parser.parse_args()
+    set_compact_output(args.compact_json)
+    
+    fetcher = AssemblyDataFetcher(max_concurrent_pages=args.max_concurrent_pages,
+                                  max_concurrent_jobs=args.max_concurrent_jobs,
+                                  connection_limit=args.connection_limit,
+                                  rate_limiter=AdaptiveRateLimiter(args.requests_per_second),
+                                  retry_policy=RetryPolicy(max_attempts=args.max_retries),
+                                  resume=args.resume,
+                                  output_format=args.output_format,
+                                  compression=args.compression,
+                                  response_cache=create_cache_from_args(args, Path(__file__).parent),
+                                  incremental=args.incremental)
     asyncio.run(fetcher.run())
 
 if __name__ == "__main__":
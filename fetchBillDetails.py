@@ -0,0 +1,146 @@
+import asyncio
+import aiohttp
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+import argparse
+from dotenv import load_dotenv
+from rateLimiter import AdaptiveRateLimiter
+from responseCache import ResponseCache, add_cache_arguments, create_cache_from_args
+from jsonBackend import add_json_arguments, set_compact_output
+from billStatusIndex import parse_retry_statuses
+from workerPool import run_worker_pool
+from filterBillsAndFetchVotes import BillsFilterAndVoteFetcher
+from fetchConferenceData import ConferenceDataFetcher
+from perBillRun import PerBillRun
+
+load_dotenv()
+
+BILL_ENDPOINTS = ['votes', 'conferences']
+
+
+class BillDetailsFetcher:
+    """One pass over the filtered bills calling every selected per-bill endpoint
+
+    Vote (nojepdqqaweusdfbi) and conference (VCONFBILLCONFLIST) requests share one session, connection
+    pool, rate limiter and response cache. Each endpoint keeps its own journal, status index and output
+    file, so the results are the same as running filterBillsAndFetchVotes.py and fetchConferenceData.py.
+    """
+
+    def __init__(self, endpoints: List[str], rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 response_cache: Optional[ResponseCache] = None, base_dir: Optional[Path] = None,
+                 trace_configs: Optional[List[aiohttp.TraceConfig]] = None, concurrency: int = 10,
+                 vote_output_format: str = 'json'):
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.trace_configs = trace_configs
+        self.concurrency = concurrency
+        self.vote_fetcher = BillsFilterAndVoteFetcher(self.rate_limiter, response_cache, base_dir,
+                                                      concurrency=concurrency, output_format=vote_output_format)
+        self.conference_fetcher = ConferenceDataFetcher(self.rate_limiter, response_cache, base_dir,
+                                                        concurrency=concurrency)
+        # Endpoint name -> (fetcher owning its run and output file, per-bill call)
+        available = {
+            'votes': (self.vote_fetcher, self.vote_fetcher.call_vote_api),
+            'conferences': (self.conference_fetcher, self.conference_fetcher.call_conference_api)
+        }
+        self.endpoints = {name: available[name] for name in endpoints}
+
+    async def fetch_bill_details(self, incremental: bool = False,
+                                 retry_statuses: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Call every selected endpoint for each bill that still needs it; returns compiled results per endpoint"""
+        try:
+            print('Loading filtered bills data...')
+            if incremental:
+                # Each endpoint has its own changed bills still pending
+                bills_by_endpoint = {name: fetcher.load_bills(incremental) for name, (fetcher, _) in self.endpoints.items()}
+            else:
+                # The bill list is loaded once and shared by every endpoint
+                bills = self.vote_fetcher.load_bills()
+                bills_by_endpoint = {name: bills for name in self.endpoints}
+
+            runs: Dict[str, PerBillRun] = {}
+            try:
+                # Started one at a time so a failure to open a later run still releases the earlier ones
+                for name, (fetcher, _) in self.endpoints.items():
+                    runs[name] = fetcher.start_run(bills_by_endpoint[name], incremental, retry_statuses)
+
+                # Bills in filtered order, each with the endpoints it still needs
+                pending: Dict[str, Dict[str, Any]] = {}
+                for name, run in runs.items():
+                    for bill in run.bills_to_process:
+                        pending.setdefault(bill['BILL_ID'], {'bill': bill, 'endpoints': []})['endpoints'].append(name)
+
+                async def fetch_bill(session: aiohttp.ClientSession, item: Dict[str, Any]) -> List[Any]:
+                    # The endpoints of one bill are requested together over the shared connections
+                    calls = [self.endpoints[name][1](session, item['bill'], incremental) for name in item['endpoints']]
+                    return await asyncio.gather(*calls, return_exceptions=True)
+
+                def handle_results(item: Dict[str, Any], results: Any) -> None:
+                    if isinstance(results, Exception):
+                        results = [results] * len(item['endpoints'])
+                    for name, result in zip(item['endpoints'], results):
+                        runs[name].handle_result(item['bill'], result)
+
+                if pending:
+                    print(f'Fetching {", ".join(self.endpoints)} for {len(pending)} bills '
+                          f'({self.concurrency} concurrent)')
+                    # Room for every endpoint of each in-flight bill, reused across both APIs via keep-alive
+                    connector = aiohttp.TCPConnector(limit=self.concurrency * len(self.endpoints))
+                    timeout = aiohttp.ClientTimeout(total=30)
+                    async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                                     trace_configs=self.trace_configs) as session:
+                        await run_worker_pool(pending.values(), lambda item: fetch_bill(session, item),
+                                              handle_results, self.concurrency)
+            except BaseException:
+                # The journals are kept for the next run; only the files of the runs started so far are released
+                for run in runs.values():
+                    run.finish(saved=False)
+                raise
+
+            return {name: self.endpoints[name][0].finish_run(run) for name, run in runs.items()}
+
+        except Exception as error:
+            print(f'Error in fetch_bill_details: {error}')
+            raise error
+
+
+def main():
+    """Main function to fetch votes and conferences in a single pass over the bills"""
+    parser = argparse.ArgumentParser(description='Fetch vote and conference data for passed bills in one pass')
+    parser.add_argument('--endpoints', default=','.join(BILL_ENDPOINTS),
+                       help=f'Comma separated endpoints to fetch: {", ".join(BILL_ENDPOINTS)} (default: both)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Only refresh bills flagged as changed by filterBillsAndFetchVotes.py --incremental')
+    parser.add_argument('--requests-per-second', type=float, default=5.0,
+                       help='Maximum Open API requests per second per host, shared by all endpoints (default: 5)')
+    parser.add_argument('--concurrency', type=int, default=10,
+                       help='Maximum number of bills queried concurrently (default: 10)')
+    parser.add_argument('--retry-status', type=parse_retry_statuses, default=[],
+                       help='Comma separated statuses to re-query, e.g. error,no_data (default: none)')
+    parser.add_argument('--vote-output-format', choices=['json', 'store', 'both'], default='json',
+                       help='Vote results output, as --output-format of filterBillsAndFetchVotes.py (default: json)')
+
+    add_cache_arguments(parser)
+    add_json_arguments(parser)
+
+    args = parser.parse_args()
+    set_compact_output(args.compact_json)
+
+    endpoints = [endpoint.strip() for endpoint in args.endpoints.split(',') if endpoint.strip()]
+    unknown = [endpoint for endpoint in endpoints if endpoint not in BILL_ENDPOINTS]
+    if unknown or not endpoints:
+        parser.error(f'Unknown endpoint {", ".join(unknown)} (expected {", ".join(BILL_ENDPOINTS)})')
+
+    async def run():
+        fetcher = BillDetailsFetcher(endpoints, AdaptiveRateLimiter(args.requests_per_second),
+                                     create_cache_from_args(args, Path(__file__).parent),
+                                     concurrency=args.concurrency, vote_output_format=args.vote_output_format)
+        results = await fetcher.fetch_bill_details(args.incremental, args.retry_status)
+        print('\nAll processing completed successfully!')
+        for name, compiled_data in results.items():
+            print(f'{name}: {compiled_data["summary"]["total_bills_processed"]} bills processed, '
+                  f'{compiled_data["summary"]["successful_calls"]} successful API calls')
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
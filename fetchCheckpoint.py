@@ -0,0 +1,116 @@
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from jsonBackend import loads, dumps_bytes, read_json, write_json
+
+
+class FetchCheckpoint:
+    """Per-(api, term) pagination checkpoint with the rows of every saved page"""
+
+    def __init__(self, checkpoint_dir: Path):
+        self.checkpoint_dir = checkpoint_dir
+        self.state_path = checkpoint_dir / 'checkpoint.json'
+        self.state = self.load_state()
+
+    def load_state(self) -> Dict[str, Any]:
+        """Load the checkpoint state file"""
+        try:
+            return read_json(self.state_path)
+        except:
+            return {}
+
+    def save_state(self) -> None:
+        """Atomically rewrite the checkpoint state file"""
+        self.checkpoint_dir.mkdir(exist_ok=True)
+        temp_path = self.state_path.with_suffix('.json.tmp')
+        write_json(temp_path, self.state, compact=True)
+        os.replace(temp_path, self.state_path)
+
+    def get_pages_path(self, key: str) -> Path:
+        """Path of the NDJSON file holding the saved pages of a job"""
+        return self.checkpoint_dir / f"{re.sub(r'[^0-9A-Za-z]+', '_', key)}.partial.ndjson"
+
+    def get(self, key: str) -> Dict[str, Any]:
+        """Checkpoint entry for a job"""
+        return self.state.get(key, {'last_page': 0, 'total_count': None, 'completed': False})
+
+    def is_completed(self, key: str) -> bool:
+        """Whether the job finished in a previous run"""
+        return self.get(key).get('completed', False)
+
+    def iter_pages(self, key: str) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """Yield (pIndex, rows) for every saved page up to the last good pIndex, in page order"""
+        entry = self.get(key)
+        last_page = entry['last_page']
+        pages_path = self.get_pages_path(key)
+        if not last_page or not pages_path.exists():
+            return
+
+        # Pages are recorded in pIndex order, so the file can be replayed line by line
+        expected_page = entry.get('first_page', 1)
+        good_offset = 0
+        with open(pages_path, 'rb') as f:
+            for line in f:
+                if expected_page > last_page:
+                    break
+                try:
+                    saved = loads(line)
+                except ValueError:
+                    # A crash mid-write can leave a truncated last line
+                    break
+                if saved['page'] != expected_page:
+                    break
+                good_offset += len(line)
+                yield saved['page'], saved['rows']
+                expected_page += 1
+
+        # Drop anything after the last page we could replay so new pages append cleanly
+        entry['last_page'] = expected_page - 1
+        with open(pages_path, 'r+b') as f:
+            f.truncate(good_offset)
+
+    def record_page(self, key: str, page: int, rows: List[Dict[str, Any]],
+                    total_count: Optional[int] = None) -> None:
+        """Persist a page's rows (in pIndex order) and advance the last good pIndex"""
+        self.checkpoint_dir.mkdir(exist_ok=True)
+        with open(self.get_pages_path(key), 'ab') as f:
+            f.write(dumps_bytes({'page': page, 'rows': rows}) + b'\n')
+
+        entry = self.state.setdefault(key, self.get(key))
+        entry['completed'] = False
+        if total_count is not None:
+            entry['total_count'] = total_count
+        # The first recorded page anchors the range replayed on resume
+        entry.setdefault('first_page', page)
+        entry['last_page'] = page
+        entry['updated'] = datetime.now().isoformat()
+        self.save_state()
+
+    def mark_completed(self, key: str) -> None:
+        """Mark a job as finished and drop its saved pages"""
+        entry = self.state.setdefault(key, self.get(key))
+        entry['completed'] = True
+        entry['updated'] = datetime.now().isoformat()
+        self.save_state()
+
+        pages_path = self.get_pages_path(key)
+        if pages_path.exists():
+            pages_path.unlink()
+
+    def clear(self, key: str) -> None:
+        """Forget a single job's checkpoint and saved pages"""
+        self.state.pop(key, None)
+        pages_path = self.get_pages_path(key)
+        if pages_path.exists():
+            pages_path.unlink()
+        self.save_state()
+
+    def reset(self) -> None:
+        """Forget every checkpoint and saved page"""
+        self.state = {}
+        if self.checkpoint_dir.exists():
+            for path in self.checkpoint_dir.glob('*.partial.ndjson'):
+                path.unlink()
+        self.save_state()
@@ -1,62 +1,96 @@
 import asyncio
 import aiohttp
-import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import argparse
 from dotenv import load_dotenv
+from rateLimiter import AdaptiveRateLimiter
+from responseCache import ResponseCache, OfflineCacheMiss, add_cache_arguments, create_cache_from_args
+from openApiPaginator import OpenApiPaginator, get_endpoint_url
+from billFingerprints import clear_changed_bills, load_changed_bills
+from jsonBackend import read_json, write_json, add_json_arguments, set_compact_output
+from workerPool import run_worker_pool
+from resultJournal import CONFERENCE_RESULTS_JOURNAL
+from perBillRun import PerBillRun
 
 load_dotenv()
 
 class ConferenceDataFetcher:
-    def __init__(self):
-        self.base_dir = Path(__file__).parent
+    def __init__(self, rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 response_cache: Optional[ResponseCache] = None, base_dir: Optional[Path] = None,
+                 trace_configs: Optional[List[aiohttp.TraceConfig]] = None, concurrency: int = 10):
+        self.base_dir = base_dir or Path(__file__).parent
         self.api_key = os.getenv('API_KEY')
         if not self.api_key:
             raise ValueError('API_KEY is not set in environment variables. Please check your .env file.')
-        self.base_url = 'https://open.assembly.go.kr/portal/openapi/VCONFBILLCONFLIST'
+        self.base_url = get_endpoint_url('VCONFBILLCONFLIST')
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.response_cache = response_cache
+        self.trace_configs = trace_configs
+        self.concurrency = concurrency
+        self.paginator = OpenApiPaginator(self.api_key, self.rate_limiter, response_cache=self.response_cache)
 
     def load_filtered_bills(self) -> Dict[str, Any]:
         """Load filtered bills data from JSON file"""
         try:
-            filtered_path = self.base_dir / 'assembly_filtered_bills_passed.json'
-            with open(filtered_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return read_json(self.base_dir / 'assembly_filtered_bills_passed.json')
         except Exception as error:
             raise Exception(f'Could not load filtered bills file: {error}')
 
-    async def call_conference_api(self, session: aiohttp.ClientSession, bill: Dict[str, Any]) -> Dict[str, Any]:
+    def load_existing_results(self) -> List[Dict[str, Any]]:
+        """Load results from the previous conference run"""
+        # Only a missing file means a fresh start; an unreadable one must not be overwritten
+        try:
+            existing_path = self.base_dir / 'assembly_bills_conference_api_results.json'
+            return read_json(existing_path).get('results', [])
+        except FileNotFoundError:
+            print('No existing conference results found, starting fresh')
+            return []
+
+    async def call_conference_api(self, session: aiohttp.ClientSession, bill: Dict[str, Any],
+                                  refresh: bool = False) -> Dict[str, Any]:
         """Call conference API for a single bill"""
         try:
-            url = f'{self.base_url}?KEY={self.api_key}&Type=json&pIndex=1&pSize=1000&BILL_ID={bill["BILL_ID"]}'
-            
             print(f'Calling CONFERENCE API for BILL_ID: {bill["BILL_ID"]}')
             
-            async with session.get(url, timeout=30) as response:
-                response.raise_for_status()
-                data = await response.json()
+            # Every page is merged so bills with more than page_size rows are not truncated
+            params = {'BILL_ID': bill['BILL_ID']}
+            api_response = await self.paginator.fetch_envelope(session, self.base_url, params,
+                                                               f'BILL_ID {bill["BILL_ID"]}', refresh)
+            
+            if api_response:
+                print(f'✓ Success for BILL_ID: {bill["BILL_ID"]}')
+                
+                return {
+                    'BILL_ID': bill['BILL_ID'],
+                    'AGE': bill['AGE'],
+                    'api_response': api_response,
+                    'status': 'success',
+                    'timestamp': datetime.now().isoformat()
+                }
+            else:
+                print(f'- No data for BILL_ID: {bill["BILL_ID"]}')
+                return {
+                    'BILL_ID': bill['BILL_ID'],
+                    'AGE': bill['AGE'],
+                    'api_response': None,
+                    'status': 'no_data',
+                    'timestamp': datetime.now().isoformat()
+                }
                 
-                if data and 'VCONFBILLCONFLIST' in data:
-                    print(f'✓ Success for BILL_ID: {bill["BILL_ID"]}')
-                    
-                    return {
-                        'BILL_ID': bill['BILL_ID'],
-                        'AGE': bill['AGE'],
-                        'api_response': data['VCONFBILLCONFLIST'],
-                        'status': 'success',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                else:
-                    print(f'- No data for BILL_ID: {bill["BILL_ID"]}')
-                    return {
-                        'BILL_ID': bill['BILL_ID'],
-                        'AGE': bill['AGE'],
-                        'api_response': None,
-                        'status': 'no_data',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    
+        except OfflineCacheMiss as error:
+            # Not an API failure: the bill is called again once a run can reach the API
+            print(f'- Not cached for BILL_ID: {bill["BILL_ID"]}')
+            return {
+                'BILL_ID': bill['BILL_ID'],
+                'AGE': bill['AGE'],
+                'api_response': None,
+                'status': 'not_cached',
+                'error': str(error),
+                'timestamp': datetime.now().isoformat()
+            }
         except Exception as error:
             print(f'✗ Error for BILL_ID {bill["BILL_ID"]}: {error}')
             return {
@@ -68,95 +102,90 @@ class ConferenceDataFetcher:
                 'timestamp': datetime.now().isoformat()
             }
 
-    async def fetch_conference_data(self) -> Dict[str, Any]:
-        """Load filtered bills and call conference API"""
+    def load_bills(self, incremental: bool = False) -> List[Dict[str, Any]]:
+        """Load the filtered bills, or in incremental mode the changed ones"""
+        filtered_data = load_changed_bills(self.base_dir, 'conference') if incremental else self.load_filtered_bills()
+        
+        if 'data' not in filtered_data or not isinstance(filtered_data['data'], list):
+            raise Exception('No data array found in filtered bills file')
+        
+        print(f'Found {len(filtered_data["data"])} bills to process')
+        return filtered_data['data']
+
+    def start_run(self, bills: List[Dict[str, Any]], incremental: bool = False,
+                  retry_statuses: Optional[List[str]] = None) -> PerBillRun:
+        """Open the conference journal and status index and pick the bills that still need a call"""
+        # Results of earlier runs are kept, so a restart only calls the bills that are still missing
+        run = PerBillRun('conference', self.load_existing_results(), self.base_dir / CONFERENCE_RESULTS_JOURNAL,
+                         self.base_dir / 'conference_status_index.sqlite')
+        run.select_bills(bills, incremental, retry_statuses or [])
+        return run
+
+    def finish_run(self, run: PerBillRun) -> Dict[str, Any]:
+        """Compile and save the run's results, then drop its journal"""
+        compiled_data = run.compile()
+        if not run.has_work():
+            run.finish(saved=False)
+            print('All bills already have conference results. No new calls needed.')
+            return compiled_data
+        
+        # Save compiled results; the journal is only dropped once they are safely on disk
+        saved = self.save_results(compiled_data)
+        run.finish(saved)
+        if saved and run.incremental:
+            clear_changed_bills(self.base_dir, run.label, run.fetched_bill_ids)
+        
+        if self.response_cache:
+            self.response_cache.print_stats()
+        
+        print(f'\nAPI calls completed!')
+        print(f'Total processed: {compiled_data["summary"]["total_bills_processed"]}')
+        print(f'Successful: {compiled_data["summary"]["successful_calls"]}')
+        print(f'Failed: {compiled_data["summary"]["failed_calls"]}')
+        print(f'No data: {compiled_data["summary"]["no_data_calls"]}')
+        print(f'Not cached (offline): {compiled_data["summary"]["not_cached_calls"]}')
+        
+        return compiled_data
+
+    async def fetch_conference_data(self, incremental: bool = False, retry_failed: bool = False) -> Dict[str, Any]:
+        """Load filtered bills and call conference API for bills without a result yet"""
         try:
             print('Loading filtered bills data...')
+            # Skip bills that already have a result; failed ones only with --retry-failed
+            run = self.start_run(self.load_bills(incremental), incremental, ['error'] if retry_failed else [])
             
-            filtered_data = self.load_filtered_bills()
-            
-            if 'data' not in filtered_data or not isinstance(filtered_data['data'], list):
-                raise Exception('No data array found in filtered bills file')
-            
-            print(f'Found {len(filtered_data["data"])} bills to process')
-            
-            api_results = []
-            
-            # Process bills in batches to avoid overwhelming the API
-            batch_size = 10
-            connector = aiohttp.TCPConnector(limit=batch_size)
-            timeout = aiohttp.ClientTimeout(total=30)
-            
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                for i in range(0, len(filtered_data['data']), batch_size):
-                    batch = filtered_data['data'][i:i + batch_size]
-                    
-                    print(f'Processing batch {i // batch_size + 1}/{(len(filtered_data["data"]) + batch_size - 1) // batch_size}')
-                    
-                    # Process batch concurrently
-                    batch_tasks = [self.call_conference_api(session, bill) for bill in batch]
-                    batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-                    
-                    # Handle results and exceptions
-                    for result in batch_results:
-                        if isinstance(result, Exception):
-                            print(f'Batch processing error: {result}')
-                        else:
-                            api_results.append(result)
-                    
-                    # Add delay between batches to be respectful to the API
-                    if i + batch_size < len(filtered_data['data']):
-                        print('Waiting 2 seconds before next batch...')
-                        await asyncio.sleep(2)
-            
-            # Compile results
-            successful_results = [r for r in api_results if r.get('status') == 'success']
-            failed_results = [r for r in api_results if r.get('status') == 'error']
-            no_data_results = [r for r in api_results if r.get('status') == 'no_data']
-            
-            compiled_data = {
-                'summary': {
-                    'total_bills_processed': len(api_results),
-                    'successful_calls': len(successful_results),
-                    'failed_calls': len(failed_results),
-                    'no_data_calls': len(no_data_results),
-                    'processed_date': datetime.now().isoformat()
-                },
-                'results': api_results
-            }
-            
-            # Save compiled results
-            self.save_results(compiled_data)
-            
-            print(f'\nAPI calls completed!')
-            print(f'Total processed: {len(api_results)}')
-            print(f'Successful: {len(successful_results)}')
-            print(f'Failed: {len(failed_results)}')
-            print(f'No data: {len(no_data_results)}')
-            
-            return compiled_data
+            try:
+                if run.bills_to_process:
+                    # Keep `concurrency` calls in flight; each finished call immediately frees its slot
+                    print(f'Fetching conferences for {len(run.bills_to_process)} bills ({self.concurrency} concurrent)')
+                    connector = aiohttp.TCPConnector(limit=self.concurrency)
+                    timeout = aiohttp.ClientTimeout(total=30)
+                    async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                                     trace_configs=self.trace_configs) as session:
+                        await run_worker_pool(run.bills_to_process,
+                                              lambda bill: self.call_conference_api(session, bill, incremental),
+                                              run.handle_result, self.concurrency)
+            except BaseException:
+                # The journal is kept for the next run; only the files are released
+                run.finish(saved=False)
+                raise
+            
+            return self.finish_run(run)
             
         except Exception as error:
             print(f'Error in fetch_conference_data: {error}')
             raise error
 
-    def save_results(self, compiled_data: Dict[str, Any]) -> None:
-        """Save compiled results to file"""
+    def save_results(self, compiled_data: Dict[str, Any]) -> bool:
+        """Save compiled results to file; True if the main file was written"""
         print('Saving compiled results...')
         output_path = self.base_dir / 'assembly_bills_conference_api_results.json'
         
         try:
-            json_string = json.dumps(compiled_data, ensure_ascii=False, indent=2)
-            print(f'JSON string length: {len(json_string)} characters')
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(json_string)
+            file_size = write_json(output_path, compiled_data)
             print(f'Results saved successfully to: {output_path}')
-            
-            # Verify file was created
-            if output_path.exists():
-                file_size = output_path.stat().st_size
-                print(f'File size: {file_size} bytes')
+            print(f'File size: {file_size} bytes')
+            return True
             
         except Exception as write_error:
             print(f'Error saving results file: {write_error}')
@@ -169,17 +198,36 @@ class ConferenceDataFetcher:
                     chunk = results[i:i + chunk_size]
                     chunk_path = self.base_dir / f'assembly_bills_conf_chunk_{i // chunk_size + 1}.json'
                     chunk_data = {'chunk_number': i // chunk_size + 1, 'data': chunk}
-                    with open(chunk_path, 'w', encoding='utf-8') as f:
-                        json.dump(chunk_data, f, ensure_ascii=False, indent=2)
+                    write_json(chunk_path, chunk_data)
                     print(f'Chunk {i // chunk_size + 1} saved to: {chunk_path}')
             except Exception as chunk_error:
                 print(f'Even chunk saving failed: {chunk_error}')
+            
+            return False
 
 def main():
     """Main function to run the conference data fetcher"""
+    parser = argparse.ArgumentParser(description='Fetch conference data for passed bills')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Only refresh bills flagged as changed by filterBillsAndFetchVotes.py --incremental')
+    parser.add_argument('--requests-per-second', type=float, default=5.0,
+                       help='Maximum Open API requests per second per host (default: 5)')
+    parser.add_argument('--concurrency', type=int, default=10,
+                       help='Maximum number of bills queried concurrently (default: 10)')
+    parser.add_argument('--retry-failed', action='store_true',
+                       help='Re-query bills whose previous conference call failed')
+    
+    add_cache_arguments(parser)
+    add_json_arguments(parser)
+    
+    args = parser.parse_args()
+    set_compact_output(args.compact_json)
+    
     async def run():
-        fetcher = ConferenceDataFetcher()
-        results = await fetcher.fetch_conference_data()
+        fetcher = ConferenceDataFetcher(AdaptiveRateLimiter(args.requests_per_second),
+                                        create_cache_from_args(args, Path(__file__).parent),
+                                        concurrency=args.concurrency)
+        results = await fetcher.fetch_conference_data(args.incremental, args.retry_failed)
         print(f'\nProcessing completed successfully!')
         print(f'Final Summary: {results["summary"]["total_bills_processed"]} bills processed, {results["summary"]["successful_calls"]} successful API calls')
     
@@ -1,72 +1,89 @@
 import asyncio
 import aiohttp
-import json
-import time
 import os
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import argparse
 from dotenv import load_dotenv
+from rateLimiter import AdaptiveRateLimiter
+from responseCache import ResponseCache, OfflineCacheMiss, add_cache_arguments, create_cache_from_args
+from openApiPaginator import OpenApiPaginator, get_endpoint_url
+from ndjsonStore import get_dataset_paths
+from billFilter import (BillFilterCriteria, filter_bills_files, get_file_term, add_filter_arguments,
+                        create_criteria_from_args)
+from billFingerprints import BillFingerprintStore, CHANGED_BILLS_FILENAME, add_changed_bills, clear_changed_bills, load_changed_bills
+from jsonBackend import read_json, write_json, add_json_arguments, set_compact_output
+from billStatusIndex import parse_retry_statuses
+from workerPool import run_worker_pool
+from resultJournal import VOTE_RESULTS_JOURNAL
+from perBillRun import PerBillRun
+from voteStore import VOTE_STORE_FILENAME, write_vote_store, load_compiled_results
 
 load_dotenv()
 
+# per-bill: one query per BILL_ID; bulk: page through every vote of a term and split the rows locally
+VOTE_FETCH_MODES = ['per-bill', 'bulk']
+
 class BillsFilterAndVoteFetcher:
-    def __init__(self):
-        self.base_dir = Path(__file__).parent
+    def __init__(self, rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 response_cache: Optional[ResponseCache] = None, base_dir: Optional[Path] = None,
+                 trace_configs: Optional[List[aiohttp.TraceConfig]] = None, concurrency: int = 10,
+                 fetch_mode: str = 'per-bill', filter_criteria: Optional[BillFilterCriteria] = None,
+                 filter_workers: int = os.cpu_count() or 1, output_format: str = 'json'):
+        self.base_dir = base_dir or Path(__file__).parent
         self.api_key = os.getenv('API_KEY')
         if not self.api_key:
             raise ValueError('API_KEY is not set in environment variables. Please check your .env file.')
-        self.base_url = 'https://open.assembly.go.kr/portal/openapi/nojepdqqaweusdfbi'
+        self.base_url = get_endpoint_url('nojepdqqaweusdfbi')
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.response_cache = response_cache
+        self.trace_configs = trace_configs
+        self.concurrency = concurrency
+        self.fetch_mode = fetch_mode
+        self.filter_criteria = filter_criteria or BillFilterCriteria()
+        self.filter_workers = filter_workers
+        self.output_format = output_format
+        self.paginator = OpenApiPaginator(self.api_key, self.rate_limiter, response_cache=self.response_cache)
 
-    def process_bills_data(self) -> List[Dict[str, Any]]:
+    def process_bills_data(self, incremental: bool = False) -> List[Dict[str, Any]]:
         """Process assembly bills data and filter passed bills"""
         try:
             print('Starting to process assembly bills data...')
             
-            # Get all files in the current directory
-            files = [f for f in self.base_dir.iterdir() if f.is_file()]
+            # In incremental mode, compare every row with the previous run's fingerprints
+            fingerprints = BillFingerprintStore(self.base_dir / 'bill_fingerprints.json') if incremental else None
+            changed_results = []
+            
+            # Get assembly_bills_age_* files, either legacy JSON or streamed NDJSON
+            bills_files = get_dataset_paths(self.base_dir, 'assembly_bills_age')
             
-            # Filter files that start with 'assembly_bills_age' and end with '.json'
-            bills_files = [f for f in files if f.name.startswith('assembly_bills_age') and f.name.endswith('.json')]
+            # Terms outside the AGE range cannot match, so their files are not read at all
+            criteria = self.filter_criteria
+            skipped_files = [path for path in bills_files if not criteria.includes_term(get_file_term(path))]
+            bills_files = [path for path in bills_files if criteria.includes_term(get_file_term(path))]
             
-            print(f'Found {len(bills_files)} assembly bills files to process.')
+            print(f'Found {len(bills_files)} assembly bills files to process '
+                  f'({len(skipped_files)} outside the AGE range skipped).')
+            print(f'Filter criteria: {criteria.describe()}')
             
             filtered_results = []
             
-            for file_path in bills_files:
-                print(f'Processing file: {file_path.name}')
+            # Each worker streams its file row by row and sends back only the matching BILL_ID/AGE pairs
+            for file_path, result in filter_bills_files(bills_files, criteria, self.filter_workers,
+                                                        with_fingerprints=fingerprints is not None):
+                if isinstance(result, Exception):
+                    print(f'Error processing file {file_path.name}: {result}')
+                    continue
+                
+                if fingerprints:
+                    changed_bill_ids = {bill_id for bill_id, entry in result['fingerprints'].items()
+                                        if fingerprints.update_entry(bill_id, entry)}
+                    changed_results.extend(bill for bill in result['matches'] if bill['BILL_ID'] in changed_bill_ids)
                 
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        json_data = json.load(f)
-                    
-                    if 'data' not in json_data or not isinstance(json_data['data'], list):
-                        print(f'Skipping {file_path.name} - no data array found')
-                        continue
-                    
-                    # Filter data where PROC_RESULT is '원안가결' or '수정가결'
-                    filtered = [
-                        item for item in json_data['data']
-                        if (item.get('PROC_RESULT') in ['원안가결', '수정가결'] and 
-                            int(item.get('AGE', 0)) >= 17)
-                    ]
-                    
-                    # Extract BILL_ID and AGE
-                    extracted = [
-                        {
-                            'BILL_ID': item['BILL_ID'],
-                            'AGE': item['AGE']
-                        }
-                        for item in filtered
-                    ]
-                    
-                    filtered_results.extend(extracted)
-                    
-                    print(f'Found {len(filtered)} matching records in {file_path.name}')
-                    
-                except Exception as error:
-                    print(f'Error processing file {file_path.name}: {error}')
+                filtered_results.extend(result['matches'])
+                
+                print(f'Found {len(result["matches"])} matching records in {file_path.name} ({result["rows"]} rows)')
             
             # Remove duplicates based on BILL_ID
             unique_results = []
@@ -84,15 +101,25 @@ class BillsFilterAndVoteFetcher:
             output_data = {
                 'total_count': len(unique_results),
                 'filtered_date': datetime.now().isoformat(),
-                'filter_criteria': "PROC_RESULT = '원안가결' OR '수정가결'",
+                'filter_criteria': criteria.describe(),
                 'data': unique_results
             }
             
             output_path = self.base_dir / 'assembly_filtered_bills_passed.json'
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, ensure_ascii=False, indent=2)
+            write_json(output_path, output_data)
             
             print(f'Results saved to: {output_path}')
+            
+            if fingerprints:
+                # Only bills whose PROC_RESULT/PROC_DT changed are sent on to the vote and conference fetchers.
+                # They are added to the bills still pending from earlier runs, each cleared once its fetchers
+                # are done, so saving the fingerprints now cannot lose a change whose fetch has not happened yet
+                pending_count = add_changed_bills(self.base_dir, changed_results,
+                                                  f'{criteria.describe()}, new or changed PROC_RESULT/PROC_DT')
+                fingerprints.save()
+                print(f'{len(changed_results)} passed bills changed since the last run, '
+                      f'{pending_count} pending in: {self.base_dir / CHANGED_BILLS_FILENAME}')
+            
             print('Processing completed successfully!')
             
             return unique_results
@@ -107,59 +134,66 @@ class BillsFilterAndVoteFetcher:
             # Try main filtered file first
             filtered_path = self.base_dir / 'assembly_filtered_bills_passed.json'
             if filtered_path.exists():
-                with open(filtered_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return read_json(filtered_path)
             
             # Fallback to alternative filename
-            filtered_path = self.base_dir / 'assembly_filtered_passed_bills.json'
-            with open(filtered_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return read_json(self.base_dir / 'assembly_filtered_passed_bills.json')
                 
         except Exception as error:
             raise Exception(f'Could not load filtered bills file: {error}')
 
     def load_existing_results(self) -> List[Dict[str, Any]]:
         """Load existing API results to avoid duplicates"""
-        try:
-            existing_path = self.base_dir / 'assembly_bills_api_results.json'
-            with open(existing_path, 'r', encoding='utf-8') as f:
-                existing_data = json.load(f)
-                return existing_data.get('results', [])
-        except:
+        # Only a missing file means a fresh start; an unreadable one must not be overwritten
+        loaded = load_compiled_results(self.base_dir)
+        if loaded is None:
             print('No existing API results found, starting fresh')
             return []
+        compiled_data, _ = loaded
+        return compiled_data.get('results', [])
 
-    async def call_vote_api(self, session: aiohttp.ClientSession, bill: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_vote_api(self, session: aiohttp.ClientSession, bill: Dict[str, Any],
+                            refresh: bool = False) -> Dict[str, Any]:
         """Call API for a single bill to get vote data"""
         try:
-            url = f'{self.base_url}?KEY={self.api_key}&Type=json&pIndex=1&pSize=1000&BILL_ID={bill["BILL_ID"]}&AGE={bill["AGE"]}'
-            
             print(f'Calling API for BILL_ID: {bill["BILL_ID"]}, AGE: {bill["AGE"]}')
             
-            async with session.get(url, timeout=30) as response:
-                response.raise_for_status()
-                data = await response.json()
+            # Every page is merged so bills with more than page_size rows are not truncated
+            params = {'BILL_ID': bill['BILL_ID'], 'AGE': bill['AGE']}
+            api_response = await self.paginator.fetch_envelope(session, self.base_url, params,
+                                                               f'BILL_ID {bill["BILL_ID"]}', refresh)
+            
+            if api_response:
+                print(f'✓ Success for BILL_ID: {bill["BILL_ID"]}')
                 
-                if data and 'nojepdqqaweusdfbi' in data:
-                    print(f'✓ Success for BILL_ID: {bill["BILL_ID"]}')
-                    
-                    return {
-                        'BILL_ID': bill['BILL_ID'],
-                        'AGE': bill['AGE'],
-                        'api_response': data['nojepdqqaweusdfbi'],
-                        'status': 'success',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                else:
-                    print(f'- No data for BILL_ID: {bill["BILL_ID"]}')
-                    return {
-                        'BILL_ID': bill['BILL_ID'],
-                        'AGE': bill['AGE'],
-                        'api_response': None,
-                        'status': 'no_data',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    
+                return {
+                    'BILL_ID': bill['BILL_ID'],
+                    'AGE': bill['AGE'],
+                    'api_response': api_response,
+                    'status': 'success',
+                    'timestamp': datetime.now().isoformat()
+                }
+            else:
+                print(f'- No data for BILL_ID: {bill["BILL_ID"]}')
+                return {
+                    'BILL_ID': bill['BILL_ID'],
+                    'AGE': bill['AGE'],
+                    'api_response': None,
+                    'status': 'no_data',
+                    'timestamp': datetime.now().isoformat()
+                }
+                
+        except OfflineCacheMiss as error:
+            # Not an API failure: the bill is called again once a run can reach the API
+            print(f'- Not cached for BILL_ID: {bill["BILL_ID"]}')
+            return {
+                'BILL_ID': bill['BILL_ID'],
+                'AGE': bill['AGE'],
+                'api_response': None,
+                'status': 'not_cached',
+                'error': str(error),
+                'timestamp': datetime.now().isoformat()
+            }
         except Exception as error:
             print(f'✗ Error for BILL_ID {bill["BILL_ID"]}: {error}')
             return {
@@ -171,168 +205,179 @@ class BillsFilterAndVoteFetcher:
                 'timestamp': datetime.now().isoformat()
             }
 
-    async def fetch_vote_data(self) -> Dict[str, Any]:
+    async def fetch_term_votes(self, session: aiohttp.ClientSession, age: str, bills: List[Dict[str, Any]],
+                               refresh: bool = False) -> List[Dict[str, Any]]:
+        """Page through every vote of one term and split the rows into per-bill results"""
+        rows_by_bill: Dict[str, List[Dict[str, Any]]] = {bill['BILL_ID']: [] for bill in bills}
+        term_head = None
+        
+        try:
+            print(f'Calling API for all votes of AGE {age} ({len(bills)} bills wanted)')
+            async for page in self.paginator.iter_pages(session, self.base_url, {'AGE': age},
+                                                        f'AGE {age} votes', refresh=refresh):
+                term_head = term_head or page['head']
+                for row in page['rows']:
+                    # Votes of bills outside the filtered list are dropped as the pages stream in
+                    bill_rows = rows_by_bill.get(row.get('BILL_ID'))
+                    if bill_rows is not None:
+                        bill_rows.append(row)
+        except Exception as error:
+            print(f'✗ Error for AGE {age}: {error}')
+            return [{
+                'BILL_ID': bill['BILL_ID'],
+                'AGE': bill['AGE'],
+                'api_response': None,
+                'status': 'not_cached' if isinstance(error, OfflineCacheMiss) else 'error',
+                'error': str(error),
+                'timestamp': datetime.now().isoformat()
+            } for bill in bills]
+        
+        results = []
+        for bill in bills:
+            rows = rows_by_bill[bill['BILL_ID']]
+            results.append({
+                'BILL_ID': bill['BILL_ID'],
+                'AGE': bill['AGE'],
+                # Same [head, {'row': [...]}] envelope a per-bill query returns
+                'api_response': [self.build_bill_head(term_head, len(rows)), {'row': rows}] if rows else None,
+                'status': 'success' if rows else 'no_data',
+                'timestamp': datetime.now().isoformat()
+            })
+        
+        print(f'✓ AGE {age}: {sum(1 for r in results if r["status"] == "success")}/{len(bills)} bills have votes')
+        return results
+
+    def build_bill_head(self, term_head: Dict[str, Any], row_count: int) -> Dict[str, Any]:
+        """Per-bill copy of a term-wide head block with list_total_count set to the bill's row count"""
+        return {'head': [{'list_total_count': row_count} if 'list_total_count' in entry else entry
+                         for entry in term_head.get('head', [])]}
+
+    def load_bills(self, incremental: bool = False) -> List[Dict[str, Any]]:
+        """Load the filtered bills, or in incremental mode the changed ones"""
+        filtered_data = load_changed_bills(self.base_dir, 'vote') if incremental else self.load_filtered_bills()
+        
+        if 'data' not in filtered_data or not isinstance(filtered_data['data'], list):
+            raise Exception('No data array found in filtered bills file')
+        
+        print(f'Found {len(filtered_data["data"])} bills to process')
+        return filtered_data['data']
+
+    def start_run(self, bills: List[Dict[str, Any]], incremental: bool = False,
+                  retry_statuses: Optional[List[str]] = None) -> PerBillRun:
+        """Open the vote journal and status index and pick the bills that still need a call"""
+        # Check for existing API results to avoid duplicates
+        run = PerBillRun('vote', self.load_existing_results(), self.base_dir / VOTE_RESULTS_JOURNAL,
+                         self.base_dir / 'vote_status_index.sqlite')
+        run.select_bills(bills, incremental, retry_statuses or [])
+        return run
+
+    async def fetch_bills(self, session: aiohttp.ClientSession, run: PerBillRun, refresh: bool = False) -> None:
+        """Call the API for every bill the run still needs, per bill or per term depending on fetch_mode"""
+        if self.fetch_mode == 'bulk':
+            bills_by_age: Dict[str, List[Dict[str, Any]]] = {}
+            for bill in run.bills_to_process:
+                bills_by_age.setdefault(str(bill['AGE']), []).append(bill)
+            
+            def handle_term_results(term: Any, results: Any) -> None:
+                if isinstance(results, Exception):
+                    print(f'Processing error for AGE {term[0]}: {results}')
+                    return
+                for result in results:
+                    run.handle_result(result, result)
+            
+            print(f'Fetching votes for {len(run.bills_to_process)} bills with {len(bills_by_age)} term-wide queries')
+            await run_worker_pool(bills_by_age.items(),
+                                  lambda term: self.fetch_term_votes(session, term[0], term[1], refresh),
+                                  handle_term_results, self.concurrency)
+        else:
+            # Keep `concurrency` calls in flight; each finished call immediately frees its slot
+            print(f'Fetching votes for {len(run.bills_to_process)} bills ({self.concurrency} concurrent)')
+            await run_worker_pool(run.bills_to_process,
+                                  lambda bill: self.call_vote_api(session, bill, refresh),
+                                  run.handle_result, self.concurrency)
+
+    def finish_run(self, run: PerBillRun) -> Dict[str, Any]:
+        """Compile and save the run's results, then drop its journal"""
+        compiled_data = run.compile()
+        if not run.has_work():
+            run.finish(saved=False)
+            print('All bills already have API results. No new calls needed.')
+            return compiled_data
+        
+        # Save compiled results; the journal is only dropped once they are safely on disk
+        saved = self.save_results(compiled_data)
+        run.finish(saved)
+        if saved and run.incremental:
+            clear_changed_bills(self.base_dir, run.label, run.fetched_bill_ids)
+        
+        if self.response_cache:
+            self.response_cache.print_stats()
+        
+        print(f'\nAPI calls completed!')
+        print(f'Total processed: {compiled_data["summary"]["total_bills_processed"]}')
+        print(f'Successful: {compiled_data["summary"]["successful_calls"]}')
+        print(f'Failed: {compiled_data["summary"]["failed_calls"]}')
+        print(f'No data: {compiled_data["summary"]["no_data_calls"]}')
+        print(f'Not cached (offline): {compiled_data["summary"]["not_cached_calls"]}')
+        
+        return compiled_data
+
+    async def fetch_vote_data(self, incremental: bool = False,
+                              retry_statuses: Optional[List[str]] = None) -> Dict[str, Any]:
         """Load filtered bills and call API for vote data"""
         try:
             print('Loading filtered bills data...')
+            run = self.start_run(self.load_bills(incremental), incremental, retry_statuses)
             
-            filtered_data = self.load_filtered_bills()
-            
-            if 'data' not in filtered_data or not isinstance(filtered_data['data'], list):
-                raise Exception('No data array found in filtered bills file')
-            
-            print(f'Found {len(filtered_data["data"])} bills to process')
-            
-            # Check for existing API results to avoid duplicates
-            existing_results = self.load_existing_results()
-            print(f'Found {len(existing_results)} existing API results')
-            
-            # Filter out bills that already have API results
-            bills_to_process = []
-            for bill in filtered_data['data']:
-                exists = any(
-                    result.get('BILL_ID') == bill['BILL_ID'] and 
-                    result.get('AGE') == bill['AGE']
-                    for result in existing_results
-                )
-                if not exists:
-                    bills_to_process.append(bill)
-            
-            print(f'After removing duplicates: {len(bills_to_process)} bills need API calls')
-            
-            if not bills_to_process:
-                print('All bills already have API results. No new calls needed.')
-                return {
-                    'summary': {
-                        'total_bills_processed': len(existing_results),
-                        'successful_calls': sum(1 for r in existing_results if r.get('status') == 'success'),
-                        'failed_calls': sum(1 for r in existing_results if r.get('status') == 'error'),
-                        'no_data_calls': sum(1 for r in existing_results if r.get('status') == 'no_data'),
-                        'processed_date': datetime.now().isoformat(),
-                        'note': 'No new API calls made - all bills already processed'
-                    },
-                    'results': existing_results
-                }
-            
-            api_results = existing_results.copy()  # Start with existing results
-            
-            # Process bills in batches
-            batch_size = 10
-            connector = aiohttp.TCPConnector(limit=batch_size)
-            timeout = aiohttp.ClientTimeout(total=30)
-            
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                for i in range(0, len(bills_to_process), batch_size):
-                    batch = bills_to_process[i:i + batch_size]
-                    
-                    print(f'Processing batch {i // batch_size + 1}/{(len(bills_to_process) + batch_size - 1) // batch_size} ({len(batch)} bills)')
-                    
-                    # Process batch concurrently
-                    batch_tasks = [self.call_vote_api(session, bill) for bill in batch]
-                    batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-                    
-                    # Handle results and exceptions
-                    for result in batch_results:
-                        if isinstance(result, Exception):
-                            print(f'Batch processing error: {result}')
-                        else:
-                            api_results.append(result)
-                    
-                    # Save intermediate results after each batch
-                    intermediate_data = {
-                        'summary': {
-                            'total_bills_processed': len(api_results),
-                            'successful_calls': sum(1 for r in api_results if r.get('status') == 'success'),
-                            'failed_calls': sum(1 for r in api_results if r.get('status') == 'error'),
-                            'no_data_calls': sum(1 for r in api_results if r.get('status') == 'no_data'),
-                            'processed_date': datetime.now().isoformat(),
-                            'batch_completed': i // batch_size + 1
-                        },
-                        'results': api_results
-                    }
-                    
-                    try:
-                        intermediate_path = self.base_dir / 'assembly_bills_api_results_temp.json'
-                        with open(intermediate_path, 'w', encoding='utf-8') as f:
-                            json.dump(intermediate_data, f, ensure_ascii=False, indent=2)
-                        print(f'Intermediate results saved ({len(api_results)} total results)')
-                    except Exception as intermediate_error:
-                        print(f'Warning: Failed to save intermediate results: {intermediate_error}')
-                    
-                    # Add delay between batches
-                    if i + batch_size < len(bills_to_process):
-                        print('Waiting 2 seconds before next batch...')
-                        await asyncio.sleep(2)
-            
-            # Remove duplicates from final results
-            unique_results = []
-            seen_bills = set()
-            
-            for result in api_results:
-                key = f"{result.get('BILL_ID')}_{result.get('AGE')}"
-                if key not in seen_bills:
-                    seen_bills.add(key)
-                    unique_results.append(result)
-                else:
-                    print(f'Duplicate found and removed: BILL_ID {result.get("BILL_ID")}, AGE {result.get("AGE")}')
-            
-            # Compile final results
-            compiled_data = {
-                'summary': {
-                    'total_bills_processed': len(unique_results),
-                    'successful_calls': sum(1 for r in unique_results if r.get('status') == 'success'),
-                    'failed_calls': sum(1 for r in unique_results if r.get('status') == 'error'),
-                    'no_data_calls': sum(1 for r in unique_results if r.get('status') == 'no_data'),
-                    'processed_date': datetime.now().isoformat(),
-                    'duplicates_removed': len(api_results) - len(unique_results)
-                },
-                'results': unique_results
-            }
-            
-            # Save compiled results
-            self.save_results(compiled_data)
-            
-            print(f'\nAPI calls completed!')
-            print(f'Total processed: {len(unique_results)}')
-            print(f'Successful: {compiled_data["summary"]["successful_calls"]}')
-            print(f'Failed: {compiled_data["summary"]["failed_calls"]}')
-            print(f'No data: {compiled_data["summary"]["no_data_calls"]}')
-            
-            return compiled_data
+            try:
+                if run.bills_to_process:
+                    connector = aiohttp.TCPConnector(limit=self.concurrency)
+                    timeout = aiohttp.ClientTimeout(total=30)
+                    async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                                     trace_configs=self.trace_configs) as session:
+                        await self.fetch_bills(session, run, incremental)
+            except BaseException:
+                # The journal is kept for the next run; only the files are released
+                run.finish(saved=False)
+                raise
+            
+            return self.finish_run(run)
             
         except Exception as error:
             print(f'Error in fetch_vote_data: {error}')
             raise error
 
-    def save_results(self, compiled_data: Dict[str, Any]) -> None:
-        """Save compiled results to file with error handling"""
+    def save_results(self, compiled_data: Dict[str, Any]) -> bool:
+        """Save compiled results to file with error handling; True if the main file was written"""
         print('Saving compiled results...')
         output_path = self.base_dir / 'assembly_bills_api_results.json'
         
         try:
-            # Try to save the main file
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(compiled_data, f, ensure_ascii=False, indent=2)
-            print(f'Results saved successfully to: {output_path}')
-            
-            # Verify file was created
-            if output_path.exists():
-                file_size = output_path.stat().st_size
+            if self.output_format in ('json', 'both'):
+                # Try to save the main file
+                file_size = write_json(output_path, compiled_data)
+                print(f'Results saved successfully to: {output_path}')
                 print(f'File size: {file_size} bytes')
                 
                 # Try to read back the file to verify it's valid
-                with open(output_path, 'r', encoding='utf-8') as f:
-                    parsed = json.load(f)
+                parsed = read_json(output_path)
                 print(f'Verification: File contains {len(parsed.get("results", []))} results')
             
+            if self.output_format in ('store', 'both'):
+                # Dictionary-encoded copy; VoteDataLoader reads whichever file is newer
+                store_path = self.base_dir / VOTE_STORE_FILENAME
+                store_size = write_vote_store(store_path, compiled_data)
+                print(f'Vote store saved to: {store_path}')
+                print(f'Vote store size: {store_size} bytes')
+            return True
+            
         except Exception as write_error:
             print(f'Warning: Main file save failed: {write_error}')
             
             # Try saving just the summary as fallback
             try:
                 summary_path = self.base_dir / 'assembly_bills_summary_fallback.json'
-                with open(summary_path, 'w', encoding='utf-8') as f:
-                    json.dump(compiled_data['summary'], f, ensure_ascii=False, indent=2)
+                write_json(summary_path, compiled_data['summary'])
                 print(f'Summary saved to: {summary_path}')
                 
                 # Try saving results in chunks
@@ -342,21 +387,13 @@ class BillsFilterAndVoteFetcher:
                     chunk = results[i:i + chunk_size]
                     chunk_path = self.base_dir / f'assembly_bills_chunk_{i // chunk_size + 1}.json'
                     chunk_data = {'chunk_number': i // chunk_size + 1, 'data': chunk}
-                    with open(chunk_path, 'w', encoding='utf-8') as f:
-                        json.dump(chunk_data, f, ensure_ascii=False, indent=2)
+                    write_json(chunk_path, chunk_data)
                     print(f'Chunk {i // chunk_size + 1} saved to: {chunk_path}')
                 
             except Exception as fallback_error:
                 print(f'Warning: Even fallback saves failed: {fallback_error}')
-        
-        # Clean up temp file
-        try:
-            temp_path = self.base_dir / 'assembly_bills_api_results_temp.json'
-            if temp_path.exists():
-                temp_path.unlink()
-                print('Temporary file cleaned up')
-        except:
-            print('Note: Temp file cleanup skipped (file may not exist)')
+            
+            return False
 
 def main():
     """Main function with command line argument parsing"""
@@ -365,21 +402,42 @@ def main():
                        help='Run filtering only, skip API calls')
     parser.add_argument('--api-only', action='store_true', 
                        help='Run API calls only, skip filtering')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Fingerprint bills and only fetch votes for bills whose PROC_RESULT/PROC_DT changed')
+    parser.add_argument('--requests-per-second', type=float, default=5.0,
+                       help='Maximum Open API requests per second per host (default: 5)')
+    parser.add_argument('--concurrency', type=int, default=10,
+                       help='Maximum number of bills queried concurrently (default: 10)')
+    parser.add_argument('--fetch-mode', choices=VOTE_FETCH_MODES, default='per-bill',
+                       help='per-bill: one query per bill; bulk: page through each term and split votes by bill (default: per-bill)')
+    parser.add_argument('--output-format', choices=['json', 'store', 'both'], default='json',
+                       help=f'json: assembly_bills_api_results.json; store: compact {VOTE_STORE_FILENAME}; both (default: json)')
+    parser.add_argument('--retry-status', type=parse_retry_statuses, default=[],
+                       help='Comma separated statuses to re-query, e.g. error,no_data (default: none)')
+    
+    add_filter_arguments(parser)
+    add_cache_arguments(parser)
+    add_json_arguments(parser)
     
     args = parser.parse_args()
+    set_compact_output(args.compact_json)
     
-    fetcher = BillsFilterAndVoteFetcher()
+    fetcher = BillsFilterAndVoteFetcher(AdaptiveRateLimiter(args.requests_per_second),
+                                        create_cache_from_args(args, Path(__file__).parent),
+                                        concurrency=args.concurrency, fetch_mode=args.fetch_mode,
+                                        filter_criteria=create_criteria_from_args(args),
+                                        filter_workers=args.filter_workers, output_format=args.output_format)
     
     if args.filter_only:
         # Run filtering only
-        results = fetcher.process_bills_data()
+        results = fetcher.process_bills_data(args.incremental)
         print(f'\nSummary: Processed {len(results)} unique bills that were passed.')
         print('To call APIs for these bills, run without --filter-only flag')
     
     elif args.api_only:
         # Run API calls only
         async def run_api_only():
-            api_results = await fetcher.fetch_vote_data()
+            api_results = await fetcher.fetch_vote_data(args.incremental, args.retry_status)
             print(f'\nAll processing completed successfully!')
             print(f'Final Summary: {api_results["summary"]["total_bills_processed"]} bills processed, {api_results["summary"]["successful_calls"]} successful API calls')
         
@@ -389,11 +447,11 @@ def main():
         # Run both filtering and API calls by default
         async def run_both():
             print('Step 1: Filtering bills data...')
-            results = fetcher.process_bills_data()
+            results = fetcher.process_bills_data(args.incremental)
             print(f'\nFiltering completed: Processed {len(results)} unique bills that were passed.')
             print('\nStep 2: Starting API calls for filtered bills...\n')
             
-            api_results = await fetcher.fetch_vote_data()
+            api_results = await fetcher.fetch_vote_data(args.incremental, args.retry_status)
             print(f'\nAll processing completed successfully!')
             print(f'Final Summary: {api_results["summary"]["total_bills_processed"]} bills processed, {api_results["summary"]["successful_calls"]} successful API calls')
         
@@ -0,0 +1,81 @@
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if orjson is not None:
+    BACKEND = 'orjson'
+elif msgspec is not None:
+    BACKEND = 'msgspec'
+else:
+    BACKEND = 'json'
+
+# Final artifacts are indented unless --compact-json is given; intermediate files always pass compact=True
+_compact_output = False
+
+
+def set_compact_output(compact: bool) -> None:
+    """Make write_json default to compact (no-indent) output"""
+    global _compact_output
+    _compact_output = compact
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON document with the fastest available backend"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as error:
+            # Callers catch ValueError, like json.JSONDecodeError and orjson.JSONDecodeError
+            raise ValueError(str(error)) from error
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any, compact: bool = True) -> bytes:
+    """Serialize to UTF-8 JSON bytes (non-ASCII kept as is), indented by 2 unless compact"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS if compact else orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if msgspec is not None:
+        encoded = msgspec.json.encode(obj)
+        return encoded if compact else msgspec.json.format(encoded, indent=2)
+    if compact:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def dumps(obj: Any, compact: bool = True) -> str:
+    """Serialize to a JSON string"""
+    return dumps_bytes(obj, compact).decode('utf-8')
+
+
+def read_json(path: Path) -> Any:
+    """Read and parse a whole JSON file"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def write_json(path: Path, obj: Any, compact: Optional[bool] = None) -> int:
+    """Write a JSON file and return its size in bytes; compact=None follows --compact-json"""
+    data = dumps_bytes(obj, _compact_output if compact is None else compact)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def add_json_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the JSON output options"""
+    parser.add_argument('--compact-json', action='store_true',
+                       help=f'Write output files without indentation (JSON backend: {BACKEND})')
@@ -1,10 +1,10 @@
 import os
-import json
 import pyodbc
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 from dotenv import load_dotenv
+from ndjsonStore import get_dataset_paths, iter_dataset_rows, load_dataset_metadata
 
 class MainDataLoader:
     def __init__(self):
@@ -251,9 +251,9 @@ class MainDataLoader:
             except Exception as error:
                 print(f'Error inserting bill record: {error}')
 
-    def insert_members_history_data(self, cursor, data: List[Dict[str, Any]], metadata: Dict[str, Any]) -> None:
+    def insert_members_history_data(self, cursor, data: Iterable[Dict[str, Any]], metadata: Dict[str, Any]) -> None:
         """Insert members history data into database"""
-        print(f'Inserting {len(data)} members history records...')
+        print('Inserting members history records...')
         
         for item in data:
             try:
@@ -292,9 +292,9 @@ class MainDataLoader:
             except Exception as error:
                 print(f'Error inserting member history record: {error}')
 
-    def insert_members_history_daesu_data(self, cursor, data: List[Dict[str, Any]]) -> None:
+    def insert_members_history_daesu_data(self, cursor, data: Iterable[Dict[str, Any]]) -> None:
         """Insert members history daesu data into database"""
-        print(f'Inserting {len(data)} members history daesu records...')
+        print('Inserting members history daesu records...')
         
         for item in data:
             try:
@@ -324,9 +324,9 @@ class MainDataLoader:
             except Exception as error:
                 print(f'Error inserting member history daesu record: {error}')
 
-    def insert_members_integrated_data(self, cursor, data: List[Dict[str, Any]]) -> None:
+    def insert_members_integrated_data(self, cursor, data: Iterable[Dict[str, Any]]) -> None:
         """Insert integrated members data into database"""
-        print(f'Inserting {len(data)} integrated members records...')
+        print('Inserting integrated members records...')
         
         for item in data:
             try:
@@ -366,9 +366,9 @@ class MainDataLoader:
             except Exception as error:
                 print(f'Error inserting integrated member record: {error}')
 
-    def insert_members_profile_data(self, cursor, data: List[Dict[str, Any]]) -> None:
+    def insert_members_profile_data(self, cursor, data: Iterable[Dict[str, Any]]) -> None:
         """Insert profile data into database"""
-        print(f'Inserting {len(data)} profile records...')
+        print('Inserting profile records...')
         
         for item in data:
             try:
@@ -406,13 +406,12 @@ class MainDataLoader:
             except Exception as error:
                 print(f'Error inserting profile record: {error}')
 
-    def load_json_file(self, file_path: Path) -> Optional[Dict[str, Any]]:
-        """Load JSON file"""
+    def load_dataset_metadata(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        """Load the metadata of a dataset file, the header of a legacy JSON file or the sidecar of an NDJSON file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_dataset_metadata(file_path)
         except Exception as error:
-            print(f'Error reading file {file_path}: {error}')
+            print(f'Error reading metadata for {file_path}: {error}')
             return None
 
     def run(self) -> None:
@@ -425,37 +424,43 @@ class MainDataLoader:
             
             self.create_tables(cursor)
             
-            # Get all assembly JSON files
-            files = [f for f in self.base_dir.iterdir() if f.is_file()]
-            assembly_files = [f for f in files if f.name.startswith('assembly_') and f.name.endswith('.json')]
+            # Get all assembly dataset files (legacy JSON or streamed NDJSON)
+            assembly_files = get_dataset_paths(self.base_dir, 'assembly_')
             
-            print(f'Found {len(assembly_files)} assembly JSON files to process.')
+            print(f'Found {len(assembly_files)} assembly data files to process.')
             
             for file_path in assembly_files:
                 print(f'\nProcessing file: {file_path.name}')
-                json_data = self.load_json_file(file_path)
                 
-                if not json_data or 'data' not in json_data or not json_data['data']:
+                # Rows are streamed from either format; the metadata is read without the rows
+                json_data = self.load_dataset_metadata(file_path)
+                # A legacy JSON file counts its rows, an NDJSON sidecar records the total
+                row_count = json_data.get('data_items', json_data.get('total_items')) if json_data else None
+                
+                if not row_count:
                     print(f'Skipping {file_path.name} - no data found or empty data array.')
                     continue
                 
+                rows = iter_dataset_rows(file_path)
+                
                 metadata = {
                     'daesu': json_data.get('daesu'),
                     'age': json_data.get('age')
                 }
+                print(f'Records in file: {row_count}')
                 
                 # Determine table based on filename
                 if 'bills' in file_path.name:
                     # Skip bills data loading (commented out in original JS)
                     pass
                 elif 'members_history_daesu' in file_path.name:
-                    self.insert_members_history_daesu_data(cursor, json_data['data'])
+                    self.insert_members_history_daesu_data(cursor, rows)
                 elif 'history' in file_path.name:
-                    self.insert_members_history_data(cursor, json_data['data'], metadata)
+                    self.insert_members_history_data(cursor, rows, metadata)
                 elif 'integrated' in file_path.name:
-                    self.insert_members_integrated_data(cursor, json_data['data'])
+                    self.insert_members_integrated_data(cursor, rows)
                 elif 'profile' in file_path.name:
-                    self.insert_members_profile_data(cursor, json_data['data'])
+                    self.insert_members_profile_data(cursor, rows)
                 
                 print(f'Completed processing {file_path.name}')
                 connection.commit()  # Commit after each file
@@ -1,10 +1,12 @@
 import os
-import json
 import pyodbc
 from datetime import datetime
+from itertools import chain
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
+from resultJournal import ResultJournal, VOTE_RESULTS_JOURNAL, dedupe_results
+from voteStore import load_compiled_results
 
 class VoteDataLoader:
     def __init__(self):
@@ -131,23 +133,24 @@ class VoteDataLoader:
         try:
             print('Loading API results data...')
             
-            # Try to load main results file first
-            main_path = self.base_dir / 'assembly_bills_api_results.json'
-            if main_path.exists():
-                with open(main_path, 'r', encoding='utf-8') as f:
-                    api_data = json.load(f)
-                data_source = 'assembly_bills_api_results.json'
-                print('Loaded data from main results file')
+            # Compiled results (JSON file or compact vote store) first, then results journaled by a run that has not compiled yet
+            compiled = load_compiled_results(self.base_dir)
+            journal = ResultJournal(self.base_dir / VOTE_RESULTS_JOURNAL)
+            if compiled:
+                api_data, data_source = compiled
+                print(f'Loaded data from {data_source}')
+            elif journal.path.exists():
+                api_data = {'results': []}
+                data_source = VOTE_RESULTS_JOURNAL
             else:
-                # Fallback to temp file
-                temp_path = self.base_dir / 'assembly_bills_api_results_temp.json'
-                if temp_path.exists():
-                    with open(temp_path, 'r', encoding='utf-8') as f:
-                        api_data = json.load(f)
-                    data_source = 'assembly_bills_api_results_temp.json'
-                    print('Loaded data from temp results file')
-                else:
-                    raise Exception('Neither main nor temp API results file found')
+                raise Exception('Neither main results file nor result journal found')
+            
+            journal_results = journal.load_results()
+            if journal_results and isinstance(api_data.get('results'), list):
+                # Journaled results are newer, so they replace compiled ones for the same bill
+                api_data['results'], _ = dedupe_results(chain(api_data['results'], journal_results))
+                data_source += f' + {len(journal_results)} journaled results'
+                print(f'Merged {len(journal_results)} results from {VOTE_RESULTS_JOURNAL}')
             
             if 'results' not in api_data or not isinstance(api_data['results'], list):
                 raise Exception('No results array found in API data')
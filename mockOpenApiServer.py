@@ -0,0 +1,362 @@
+import asyncio
+import hashlib
+import random
+import re
+import argparse
+from typing import List, Dict, Any, Optional, Tuple
+from aiohttp import web
+
+TERMS = range(10, 23)  # 10-22대
+PASSED_RESULTS = ['원안가결', '수정가결']
+OTHER_RESULTS = ['대안반영폐기', '임기만료폐기', '철회', '부결']
+VOTE_RESULTS = ['찬성', '찬성', '찬성', '반대', '기권', '불참']
+PARTIES = ['더불어민주당', '국민의힘', '조국혁신당', '개혁신당', '진보당', '무소속']
+CONFERENCE_KINDS = ['본회의', '법제사법위원회', '행정안전위원회', '보건복지위원회']
+
+# How many bills share one conference, so the same PDF is linked from several bills
+BILLS_PER_CONFERENCE = 3
+
+
+def stable_int(*parts: Any) -> int:
+    """Deterministic integer derived from the given parts"""
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+class SyntheticAssemblyData:
+    """Deterministic synthetic rows for every mocked Open API endpoint
+
+    Rows are generated from their index on demand, so large scales do not need to fit in memory.
+    """
+
+    def __init__(self, scale: float = 1.0, conferences_per_bill: int = 2, pdf_kb: int = 64):
+        self.members_per_term = max(1, int(300 * scale))
+        self.bills_per_term = max(1, int(1000 * scale))
+        self.conferences_per_bill = conferences_per_bill
+        self.pdf_kb = pdf_kb
+        self.passed_indexes: Dict[int, List[int]] = {}
+
+    def get_bill_id(self, age: int, index: int) -> str:
+        """Synthetic BILL_ID encoding the term and bill index"""
+        return f'PRC_MOCK{age:02d}{index:06d}'
+
+    def parse_bill_id(self, bill_id: str) -> Optional[Tuple[int, int]]:
+        """(age, index) of a synthetic BILL_ID, or None if it is not one"""
+        if not bill_id.startswith('PRC_MOCK') or len(bill_id) != 16 or not bill_id[8:].isdigit():
+            return None
+        age, index = int(bill_id[8:10]), int(bill_id[10:])
+        if age not in TERMS or index >= self.bills_per_term:
+            return None
+        return age, index
+
+    def member_row(self, term: int, index: int) -> Dict[str, Any]:
+        """Member row shared by the member endpoints"""
+        seed = stable_int('member', term, index)
+        return {
+            'MONA_CD': f'MOCK{term:02d}{index:05d}',
+            'HG_NM': f'의원{term:02d}{index:05d}',
+            'HJ_NM': f'議員{index:05d}',
+            'ENG_NM': f'MEMBER {term:02d}{index:05d}',
+            'POLY_NM': PARTIES[seed % len(PARTIES)],
+            'ORIG_NM': f'선거구{seed % 253:03d}',
+            'ELECT_GBN_NM': '지역구' if seed % 6 else '비례대표',
+            'CMIT_NM': CONFERENCE_KINDS[seed % len(CONFERENCE_KINDS)],
+            'REELE_GBN_NM': ['초선', '재선', '3선', '4선'][seed % 4],
+            'SEX_GBN_NM': '남' if seed % 3 else '여',
+            'BTH_DATE': f'{1950 + seed % 40}-{1 + seed % 12:02d}-{1 + seed % 28:02d}',
+            'TEL_NO': f'02-784-{seed % 10000:04d}',
+            'E_MAIL': f'member{term:02d}{index:05d}@assembly.go.kr',
+            'UNITS': f'제{term}대'
+        }
+
+    def bill_row(self, age: int, index: int) -> Dict[str, Any]:
+        """Bill row of nzmimeepazxkubdpn"""
+        seed = stable_int('bill', age, index)
+        passed = seed % 5 < 2
+        results = PASSED_RESULTS if passed else OTHER_RESULTS
+        year = 1976 + (age - 10) * 4 + seed % 4
+        return {
+            'BILL_ID': self.get_bill_id(age, index),
+            'BILL_NO': f'{age}{index:05d}',
+            'BILL_NAME': f'합성법률안 {age}-{index}',
+            'COMMITTEE': CONFERENCE_KINDS[seed % len(CONFERENCE_KINDS)],
+            'PROPOSE_DT': f'{year}-{1 + seed % 12:02d}-{1 + seed % 28:02d}',
+            'PROC_RESULT': results[seed % len(results)],
+            'PROC_DT': f'{year + 1}-{1 + seed % 12:02d}-{1 + seed % 28:02d}',
+            'AGE': str(age),
+            'PROPOSER': f'의원{age:02d}{seed % self.members_per_term:05d}등 {10 + seed % 20}인',
+            'DETAIL_LINK': f'https://likms.assembly.go.kr/bill/billDetail.do?billId={self.get_bill_id(age, index)}'
+        }
+
+    def get_passed_indexes(self, age: int) -> List[int]:
+        """Indexes of the passed bills of a term, the ones that have plenary votes"""
+        if age not in self.passed_indexes:
+            self.passed_indexes[age] = [index for index in range(self.bills_per_term)
+                                        if self.bill_row(age, index)['PROC_RESULT'] in PASSED_RESULTS]
+        return self.passed_indexes[age]
+
+    def vote_row(self, age: int, index: int, member: int) -> Dict[str, Any]:
+        """Per-member vote row of nojepdqqaweusdfbi"""
+        seed = stable_int('vote', age, index, member)
+        bill = self.bill_row(age, index)
+        member_row = self.member_row(age, member)
+        return {
+            'HG_NM': member_row['HG_NM'],
+            'HJ_NM': member_row['HJ_NM'],
+            'POLY_NM': member_row['POLY_NM'],
+            'ORIG_NM': member_row['ORIG_NM'],
+            'MEMBER_NO': member_row['MONA_CD'],
+            'MONA_CD': member_row['MONA_CD'],
+            'RESULT_VOTE_MOD': VOTE_RESULTS[seed % len(VOTE_RESULTS)],
+            'BILL_ID': bill['BILL_ID'],
+            'BILL_NO': bill['BILL_NO'],
+            'BILL_NAME': bill['BILL_NAME'],
+            'VOTE_DATE': bill['PROC_DT'].replace('-', '') + ' 150000',
+            'AGE': age,
+            'SESSION_CD': 400 + seed % 20,
+            'CURRENTS_CD': 1 + seed % 10
+        }
+
+    def conference_row(self, age: int, index: int, number: int) -> Dict[str, Any]:
+        """Conference row of VCONFBILLCONFLIST; DOWN_URL is filled in by the server"""
+        conference_id = self.get_conference_id(age, index, number)
+        seed = stable_int('conference', conference_id)
+        bill = self.bill_row(age, index)
+        return {
+            'BILL_ID': bill['BILL_ID'],
+            'BILL_NM': bill['BILL_NAME'],
+            'CONF_KND': CONFERENCE_KINDS[seed % len(CONFERENCE_KINDS)],
+            'CONF_ID': conference_id,
+            'ERACO': f'제{age}대',
+            'SESS': f'제{300 + seed % 120}회',
+            'DGR': f'제{1 + seed % 20}차',
+            'CONF_DT': bill['PROC_DT'].replace('-', '.'),
+            'DOWN_URL': None
+        }
+
+    def get_conference_id(self, age: int, index: int, number: int) -> str:
+        """Conference id shared by BILLS_PER_CONFERENCE neighbouring bills"""
+        return f'{age:02d}{index // BILLS_PER_CONFERENCE:06d}{number:02d}'
+
+    def pdf_bytes(self, conference_id: str) -> bytes:
+        """Deterministic PDF-looking payload for a conference"""
+        header = f'%PDF-1.4\n% mock transcript {conference_id}\n'.encode('utf-8')
+        filler = hashlib.sha256(conference_id.encode('utf-8')).hexdigest().encode('ascii')
+        body_size = max(0, self.pdf_kb * 1024 - len(header) - len(b'\n%%EOF\n'))
+        return header + (filler * (body_size // len(filler) + 1))[:body_size] + b'\n%%EOF\n'
+
+    def get_rows(self, endpoint: str, params: Dict[str, str]) -> Optional[Tuple[int, Any]]:
+        """(total_count, row_factory(i)) for an endpoint query, or None for an unknown endpoint"""
+        if endpoint == 'ALLNAMEMBER':
+            per_term = self.members_per_term
+            return per_term * len(TERMS), lambda i: self.member_row(TERMS[i // per_term], i % per_term)
+
+        if endpoint in ('nprlapfmaufmqytet', 'nwvrqwxyaytdsfvhu'):
+            term = int(params.get('DAESU') or TERMS[-1])
+            if term not in TERMS:
+                return 0, None
+            return self.members_per_term, lambda i: {**self.member_row(term, i), 'DAESU': str(term)}
+
+        if endpoint == 'nzmimeepazxkubdpn':
+            age = int(params.get('AGE') or 0)
+            if age not in TERMS:
+                return 0, None
+            return self.bills_per_term, lambda i: self.bill_row(age, i)
+
+        if endpoint == 'nojepdqqaweusdfbi' and 'BILL_ID' not in params:
+            # Term-wide query: every vote of every passed bill, grouped by bill
+            age = int(params.get('AGE') or 0)
+            if age not in TERMS:
+                return 0, None
+            passed, per_bill = self.get_passed_indexes(age), self.members_per_term
+            return len(passed) * per_bill, lambda i: self.vote_row(age, passed[i // per_bill], i % per_bill)
+
+        if endpoint in ('nojepdqqaweusdfbi', 'VCONFBILLCONFLIST'):
+            bill = self.parse_bill_id(params.get('BILL_ID', ''))
+            if bill is None:
+                return 0, None
+            age, index = bill
+            if endpoint == 'nojepdqqaweusdfbi':
+                if 'AGE' in params and params['AGE'] != str(age):
+                    return 0, None
+                return self.members_per_term, lambda i: self.vote_row(age, index, i)
+            return self.conferences_per_bill, lambda i: self.conference_row(age, index, i)
+
+        return None
+
+
+class MockOpenApiServer:
+    """aiohttp stand-in for open.assembly.go.kr with injectable latency and errors"""
+
+    def __init__(self, data: SyntheticAssemblyData, latency_ms: float = 0.0, latency_jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, seed: Optional[int] = None,
+                 truncate_rate: float = 0.0):
+        self.data = data
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.truncate_rate = truncate_rate
+        self.random = random.Random(seed)
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def create_app(self) -> web.Application:
+        """Build the aiohttp application"""
+        app = web.Application()
+        app.router.add_get('/portal/openapi/{endpoint}', self.handle_open_api)
+        app.router.add_get('/pdf/{conference_id}.pdf', self.handle_pdf)
+        return app
+
+    def record(self, endpoint: str, key: str, amount: int = 1) -> None:
+        """Count a served request, row or error per endpoint"""
+        stats = self.stats.setdefault(endpoint, {'requests': 0, 'rows': 0, 'errors': 0, 'bytes': 0})
+        stats[key] += amount
+
+    async def simulate_network(self, endpoint: str) -> Optional[web.Response]:
+        """Sleep for the configured latency and maybe return an injected failure"""
+        self.record(endpoint, 'requests')
+        delay_ms = self.latency_ms + self.random.uniform(-self.latency_jitter_ms, self.latency_jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+        if self.random.random() < self.error_rate:
+            self.record(endpoint, 'errors')
+            return web.Response(status=503, text='Service Unavailable')
+        if self.random.random() < self.throttle_rate:
+            # The real API reports throttling with HTTP 200 and an ERROR-337 result code
+            self.record(endpoint, 'errors')
+            return web.json_response({'RESULT': {'CODE': 'ERROR-337', 'MESSAGE': '일일 트래픽 제한을 초과하였습니다.'}})
+        return None
+
+    async def handle_open_api(self, request: web.Request) -> web.Response:
+        """Serve one page of an Open API endpoint in the {API: [head, {row: [...]}]} envelope"""
+        endpoint = request.match_info['endpoint']
+        failure = await self.simulate_network(endpoint)
+        if failure is not None:
+            return failure
+
+        params = dict(request.query)
+        rows = self.data.get_rows(endpoint, params)
+        if rows is None:
+            return web.json_response({'RESULT': {'CODE': 'ERROR-310', 'MESSAGE': '해당하는 서비스를 찾을 수 없습니다.'}})
+
+        total_count, row_factory = rows
+        try:
+            p_index = max(1, int(params.get('pIndex', 1)))
+            p_size = min(1000, max(1, int(params.get('pSize', 100))))
+        except ValueError:
+            return web.json_response({'RESULT': {'CODE': 'ERROR-300', 'MESSAGE': '필수 값이 누락되어 있습니다.'}})
+
+        start = (p_index - 1) * p_size
+        page_rows = [row_factory(i) for i in range(start, min(start + p_size, total_count))]
+        if not page_rows:
+            return web.json_response({'RESULT': {'CODE': 'INFO-200', 'MESSAGE': '해당하는 데이터가 없습니다.'}})
+
+        if endpoint == 'VCONFBILLCONFLIST':
+            for row in page_rows:
+                row['DOWN_URL'] = f"{request.scheme}://{request.host}/pdf/{row['CONF_ID']}.pdf"
+
+        self.record(endpoint, 'rows', len(page_rows))
+        return web.json_response({endpoint: [
+            {'head': [{'list_total_count': total_count},
+                      {'RESULT': {'CODE': 'INFO-000', 'MESSAGE': '정상 처리되었습니다.'}}]},
+            {'row': page_rows}
+        ]})
+
+    async def handle_pdf(self, request: web.Request) -> web.StreamResponse:
+        """Serve a synthetic conference transcript PDF, honouring a 'bytes=N-' Range header"""
+        failure = await self.simulate_network('pdf')
+        if failure is not None:
+            return failure
+
+        body = self.data.pdf_bytes(request.match_info['conference_id'])
+        status = 200
+        headers = {'Accept-Ranges': 'bytes', 'Content-Type': 'application/pdf'}
+        match = re.fullmatch(r'bytes=(\d+)-', request.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1))
+            if start >= len(body):
+                return web.Response(status=416, headers={'Content-Range': f'bytes */{len(body)}'})
+            status = 206
+            headers['Content-Range'] = f'bytes {start}-{len(body) - 1}/{len(body)}'
+            body = body[start:]
+
+        self.record('pdf', 'rows')
+        if self.random.random() < self.truncate_rate:
+            # Announce the full length, send part of it and drop the connection
+            self.record('pdf', 'errors')
+            response = web.StreamResponse(status=status, headers=headers)
+            response.content_length = len(body)
+            await response.prepare(request)
+            cut = len(body) // 2
+            await response.write(body[:cut])
+            self.record('pdf', 'bytes', cut)
+            # Stall before dropping, like a transfer dying midway, so the client has read what was sent
+            await asyncio.sleep(0.05)
+            request.transport.close()
+            return response
+
+        self.record('pdf', 'bytes', len(body))
+        return web.Response(status=status, body=body, headers=headers)
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765) -> web.AppRunner:
+        """Start serving in the current event loop; call runner.cleanup() to stop"""
+        runner = web.AppRunner(self.create_app(), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+    def print_stats(self) -> None:
+        """Print per-endpoint request, row and error counts"""
+        print('\n=== Mock Server Stats ===')
+        for endpoint, stats in sorted(self.stats.items()):
+            print(f"{endpoint:<20}  {stats['requests']:>7} requests  {stats['rows']:>9} rows  {stats['errors']:>5} errors")
+
+
+def add_mock_server_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the synthetic data and fault injection options"""
+    parser.add_argument('--scale', type=float, default=0.1,
+                       help='Data scale; 1.0 is 300 members and 1000 bills per term (default: 0.1)')
+    parser.add_argument('--conferences-per-bill', type=int, default=2,
+                       help='VCONFBILLCONFLIST rows per bill (default: 2)')
+    parser.add_argument('--pdf-kb', type=int, default=64,
+                       help='Size of each synthetic PDF in KB (default: 64)')
+    parser.add_argument('--latency-ms', type=float, default=20.0,
+                       help='Added latency per request in milliseconds (default: 20)')
+    parser.add_argument('--latency-jitter-ms', type=float, default=10.0,
+                       help='Uniform jitter around --latency-ms (default: 10)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                       help='Fraction of requests answered with HTTP 503 (default: 0)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                       help='Fraction of requests answered with ERROR-337 (default: 0)')
+    parser.add_argument('--truncate-rate', type=float, default=0.0,
+                       help='Fraction of PDF downloads cut off halfway (default: 0)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Random seed for latency and fault injection')
+
+
+def create_server_from_args(args: argparse.Namespace) -> MockOpenApiServer:
+    """Build a MockOpenApiServer from parsed command line options"""
+    data = SyntheticAssemblyData(args.scale, args.conferences_per_bill, args.pdf_kb)
+    return MockOpenApiServer(data, args.latency_ms, args.latency_jitter_ms,
+                             args.error_rate, args.throttle_rate, args.seed, args.truncate_rate)
+
+
+def main():
+    """Main function to run the mock Open API server"""
+    parser = argparse.ArgumentParser(description='Serve synthetic Open API data and PDFs locally')
+    parser.add_argument('--host', default='127.0.0.1',
+                       help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765,
+                       help='Port to listen on (default: 8765)')
+    add_mock_server_arguments(parser)
+
+    args = parser.parse_args()
+    server = create_server_from_args(args)
+
+    print(f'Serving mock Open API on http://{args.host}:{args.port}/portal/openapi')
+    print(f'Point the fetchers at it with OPEN_API_BASE_URL=http://{args.host}:{args.port}/portal/openapi')
+    web.run_app(server.create_app(), host=args.host, port=args.port, access_log=None, print=None)
+
+if __name__ == "__main__":
+    main()
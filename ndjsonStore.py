@@ -0,0 +1,288 @@
+import gzip
+import io
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, IO
+from jsonBackend import loads, dumps_bytes, read_json, write_json
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+STREAM_CHUNK_SIZE = 64 * 1024
+NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+COMPRESSION_SUFFIXES = {
+    'none': '',
+    'gzip': '.gz',
+    'zstd': '.zst'
+}
+
+
+def get_compression(path: Path) -> str:
+    """Infer the compression of a dataset file from its suffix"""
+    if path.name.endswith('.gz'):
+        return 'gzip'
+    if path.name.endswith('.zst'):
+        return 'zstd'
+    return 'none'
+
+
+def get_ndjson_path(base_dir: Path, json_filename: str, compression: str = 'none') -> Path:
+    """Map a legacy '<name>.json' output filename to its NDJSON counterpart"""
+    stem = json_filename[:-len('.json')] if json_filename.endswith('.json') else json_filename
+    return base_dir / f'{stem}.ndjson{COMPRESSION_SUFFIXES[compression]}'
+
+
+def get_metadata_path(data_path: Path) -> Path:
+    """Sidecar metadata path for an NDJSON dataset file"""
+    name = data_path.name
+    for suffix in ('.gz', '.zst'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return data_path.with_name(name[:-len('.ndjson')] + '.meta.json')
+
+
+# Files next to the datasets that share their 'assembly_' prefix but are not datasets: metadata sidecars
+# and the result journals of the per-bill fetchers
+NON_DATASET_SUFFIXES = ('.meta.json', '.journal.ndjson')
+
+
+def is_dataset_file(path: Path) -> bool:
+    """Whether a file is a dataset (legacy JSON or NDJSON), not a sidecar or journal"""
+    name = path.name
+    if name.endswith(NON_DATASET_SUFFIXES):
+        return False
+    return name.endswith('.json') or any(name.endswith(f'.ndjson{suffix}') for suffix in COMPRESSION_SUFFIXES.values())
+
+
+def get_dataset_paths(base_dir: Path, prefix: str) -> List[Path]:
+    """List dataset files starting with prefix, preferring NDJSON over a legacy JSON file of the same name"""
+    datasets: Dict[str, Path] = {}
+    for path in sorted(base_dir.iterdir()):
+        if not path.is_file() or not path.name.startswith(prefix) or not is_dataset_file(path):
+            continue
+        stem = path.name.split('.')[0]
+        if stem in datasets and path.name.endswith('.json'):
+            continue
+        datasets[stem] = path
+    return list(datasets.values())
+
+
+def open_binary(path: Path, mode: str, compression: Optional[str] = None) -> IO[bytes]:
+    """Open a (possibly compressed) file in binary mode"""
+    compression = compression or get_compression(path)
+    if compression == 'gzip':
+        return gzip.open(path, mode)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ValueError('zstd compression requires the zstandard package (pip install zstandard)')
+        if 'r' in mode:
+            return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return zstandard.ZstdCompressor().stream_writer(open(path, mode), closefd=True)
+    return open(path, mode)
+
+
+def iter_ndjson(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield one record per line from a (possibly compressed) NDJSON file"""
+    with open_binary(path, 'rb') as raw:
+        for line in io.TextIOWrapper(raw, encoding='utf-8'):
+            if line.strip():
+                yield loads(line)
+
+
+class JsonArrayStream:
+    """Stdlib stand-in for ijson: yields the items of one top-level array field, decoding one value at a time
+
+    Only the current value and one read chunk are buffered, whatever the size of the document.
+    """
+
+    def __init__(self, file: IO[str], chunk_size: int = STREAM_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def read_more(self) -> bool:
+        """Append the next chunk, dropping what has been consumed; False at end of file"""
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or '' at end of file"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read_more():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        """Consume the next non-whitespace character, which must be one of chars"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f'Expected one of {chars!r} but found {char!r}')
+        self.pos += 1
+        return char
+
+    def decode_value(self) -> Any:
+        """Decode the next complete JSON value, reading more chunks until it fits in the buffer"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.read_more():
+                    continue
+                raise
+            # A number cut off by the chunk boundary ('12' of '12.5') decodes fine, so check it is followed
+            # by something other than number characters before trusting it
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and not self.eof:
+                rest = end
+                while rest < len(self.buffer) and self.buffer[rest] in NUMBER_CHARS:
+                    rest += 1
+                if rest == len(self.buffer) and self.read_more():
+                    continue
+            self.pos = end
+            return value
+
+    def iter_items(self, key: str) -> Iterator[Any]:
+        """Yield the items of the top-level array stored under key; nothing if there is no such array"""
+        self.expect('{')
+        if self.peek() == '}':
+            return
+        while True:
+            name = self.decode_value()
+            self.expect(':')
+            if name == key and self.peek() == '[':
+                self.pos += 1
+                if self.peek() == ']':
+                    return
+                while True:
+                    yield self.decode_value()
+                    if self.expect(',]') == ']':
+                        # The rest of the document is not needed
+                        return
+            # Other fields (api, age, totals) are small and skipped whole
+            self.decode_value()
+            if self.expect(',}') == '}':
+                return
+
+    def read_fields(self, skip_key: str) -> Dict[str, Any]:
+        """Decode the top-level fields except the array under skip_key, which is passed over one item at a time
+
+        The skipped items are counted into skip_key + '_items' instead of being kept.
+        """
+        fields: Dict[str, Any] = {}
+        self.expect('{')
+        if self.peek() == '}':
+            return fields
+        while True:
+            name = self.decode_value()
+            self.expect(':')
+            if name == skip_key and self.peek() == '[':
+                self.pos += 1
+                count = 0
+                if self.peek() == ']':
+                    self.pos += 1
+                else:
+                    while True:
+                        self.decode_value()
+                        count += 1
+                        if self.expect(',]') == ']':
+                            break
+                fields[f'{skip_key}_items'] = count
+            else:
+                fields[name] = self.decode_value()
+            if self.expect(',}') == '}':
+                return fields
+
+
+def iter_json_array(path: Path, key: str = 'data') -> Iterator[Any]:
+    """Stream the items of a top-level array field of a JSON file without loading the document"""
+    if ijson is not None:
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, f'{key}.item', use_float=True)
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from JsonArrayStream(f).iter_items(key)
+
+
+def iter_dataset_rows(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield the data rows of a dataset file one at a time, whether legacy JSON or NDJSON"""
+    if path.name.endswith('.json'):
+        rows = 0
+        for row in iter_json_array(path, 'data'):
+            rows += 1
+            yield row
+        if not rows:
+            print(f'Skipping {path.name} - no data rows found')
+    else:
+        yield from iter_ndjson(path)
+
+
+def load_dataset_metadata(path: Path) -> Dict[str, Any]:
+    """Load the api/term/total metadata of a dataset file
+
+    A legacy JSON file is streamed so its data rows are never held in memory; their count is returned as
+    'data_items'.
+    """
+    if path.name.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return JsonArrayStream(f).read_fields('data')
+
+    return read_json(get_metadata_path(path))
+
+
+class NdjsonWriter:
+    """Append rows to an NDJSON file as they arrive and publish it atomically on commit"""
+
+    def __init__(self, path: Path, compression: Optional[str] = None):
+        self.path = path
+        self.compression = compression or get_compression(path)
+        self.temp_path = path.with_name(path.name + '.tmp')
+        self.file = open_binary(self.temp_path, 'wb', self.compression)
+        self.total_items = 0
+
+    def write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """Append a page of rows"""
+        self.file.write(b''.join(dumps_bytes(row) + b'\n' for row in rows))
+        self.total_items += len(rows)
+
+    def commit(self, metadata: Dict[str, Any]) -> None:
+        """Close the file, move it into place and write the sidecar metadata"""
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+        sidecar = {
+            **metadata,
+            'total_items': self.total_items,
+            'format': 'ndjson',
+            'compression': self.compression,
+            'data_file': self.path.name,
+            'saved_date': datetime.now().isoformat()
+        }
+        write_json(get_metadata_path(self.path), sidecar, compact=False)
+
+    def abort(self) -> None:
+        """Close and discard an unfinished file"""
+        self.file.close()
+        if self.temp_path.exists():
+            self.temp_path.unlink()
@@ -0,0 +1,160 @@
+import asyncio
+import aiohttp
+import os
+from collections import deque
+from typing import List, Dict, Any, AsyncIterator, Optional
+from urllib.parse import urlencode
+
+from rateLimiter import AdaptiveRateLimiter, fetch_json, get_result_code
+from responseCache import ResponseCache
+from retryPolicy import RetryPolicy
+
+DEFAULT_OPEN_API_BASE_URL = 'https://open.assembly.go.kr/portal/openapi'
+
+
+def get_endpoint_url(name: str) -> str:
+    """Open API endpoint URL, honouring OPEN_API_BASE_URL (e.g. the local mock server)"""
+    base_url = os.getenv('OPEN_API_BASE_URL') or DEFAULT_OPEN_API_BASE_URL
+    return f"{base_url.rstrip('/')}/{name}"
+
+
+def extract_rows(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Extract the row array from an Open API response envelope"""
+    data_key = next(iter(data.keys()))
+    envelope = data.get(data_key)
+    # Empty results come back as {'RESULT': {'CODE': 'INFO-200', ...}} without a row block
+    if not isinstance(envelope, list) or len(envelope) < 2:
+        return []
+    return envelope[1].get('row', [])
+
+
+def extract_head(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Extract the head element ({'head': [...]}) from an Open API response envelope"""
+    envelope = data.get(next(iter(data.keys())))
+    if not isinstance(envelope, list) or not envelope:
+        return None
+    return envelope[0]
+
+
+def extract_total_count(data: Dict[str, Any]) -> Optional[int]:
+    """Extract list_total_count from the head block of an Open API response"""
+    try:
+        for entry in extract_head(data).get('head', []):
+            if 'list_total_count' in entry:
+                return int(entry['list_total_count'])
+    except Exception:
+        pass
+    return None
+
+
+class OpenApiPaginator:
+    """Async page iterator over the {API: [head, {row: [...]}]} envelope of open.assembly.go.kr
+
+    Every page request goes through the response cache, the rate limiter and the retry policy.
+    Once page 1 reports list_total_count, up to max_concurrent_pages pages are prefetched while
+    pages are still yielded in pIndex order.
+    """
+
+    def __init__(self, api_key: str, rate_limiter: AdaptiveRateLimiter,
+                 retry_policy: Optional[RetryPolicy] = None, response_cache: Optional[ResponseCache] = None,
+                 page_size: int = 1000, max_concurrent_pages: int = 5):
+        self.api_key = api_key
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.response_cache = response_cache
+        self.page_size = page_size
+        self.max_concurrent_pages = max_concurrent_pages
+
+    def build_url(self, base_url: str, params: Dict[str, Any], p_index: int) -> str:
+        """Build the request URL for one page"""
+        query = urlencode({'KEY': self.api_key, 'Type': 'json', 'pIndex': p_index,
+                           'pSize': self.page_size, **params})
+        return f'{base_url}?{query}'
+
+    async def fetch_page(self, session: aiohttp.ClientSession, base_url: str, params: Dict[str, Any],
+                         p_index: int, label: str, refresh: bool = False) -> Dict[str, Any]:
+        """Fetch a single page, retrying transient failures"""
+        url = self.build_url(base_url, params, p_index)
+
+        async def attempt() -> Dict[str, Any]:
+            print(f'Fetching {label} - Page {p_index}...')
+            data = await fetch_json(session, url, self.rate_limiter, self.response_cache, refresh)
+
+            # Error codes come back with HTTP 200, so surface them for the retry policy
+            result_code = get_result_code(data)
+            if result_code and result_code.startswith('ERROR-'):
+                raise Exception(f'Open API returned {result_code}')
+            return data
+
+        return await self.retry_policy.run(attempt, f'{label} page {p_index}')
+
+    async def iter_pages(self, session: aiohttp.ClientSession, base_url: str, params: Dict[str, Any],
+                         label: str, start_page: int = 1, total_count: Optional[int] = None,
+                         refresh: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Yield {'page', 'rows', 'total_count', 'head'} for each page in pIndex order
+
+        Pass total_count when resuming from start_page > 1 so the remaining pages can be prefetched.
+        """
+        next_page = start_page
+        head = None
+
+        if total_count is None:
+            data = await self.fetch_page(session, base_url, params, next_page, label, refresh)
+            rows = extract_rows(data)
+            if not rows:
+                print(f'No more data for {label} at page {next_page}')
+                return
+            total_count = extract_total_count(data)
+            head = extract_head(data)
+            yield {'page': next_page, 'rows': rows, 'total_count': total_count, 'head': head}
+            next_page += 1
+
+        if total_count is None:
+            # Without a total count we can only walk the pages one at a time
+            while True:
+                data = await self.fetch_page(session, base_url, params, next_page, label, refresh)
+                rows = extract_rows(data)
+                if not rows:
+                    print(f'No more data for {label} at page {next_page}')
+                    return
+                yield {'page': next_page, 'rows': rows, 'total_count': None, 'head': head}
+                next_page += 1
+
+        last_page = (total_count + self.page_size - 1) // self.page_size
+        page_numbers = iter(range(next_page, last_page + 1))
+        in_flight = deque()
+
+        def schedule_next() -> None:
+            p_index = next(page_numbers, None)
+            if p_index is not None:
+                task = asyncio.create_task(self.fetch_page(session, base_url, params, p_index, label, refresh))
+                in_flight.append((p_index, task))
+
+        try:
+            for _ in range(self.max_concurrent_pages):
+                schedule_next()
+
+            while in_flight:
+                p_index, task = in_flight.popleft()
+                data = await task
+                # Keep the prefetch window full while the caller handles this page
+                schedule_next()
+                yield {'page': p_index, 'rows': extract_rows(data), 'total_count': total_count, 'head': head}
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*(task for _, task in in_flight), return_exceptions=True)
+
+    async def fetch_envelope(self, session: aiohttp.ClientSession, base_url: str, params: Dict[str, Any],
+                             label: str, refresh: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """Fetch every page and merge them into a single [head, {'row': [...]}] envelope, or None if empty"""
+        head = None
+        all_rows = []
+        async for page in self.iter_pages(session, base_url, params, label, refresh=refresh):
+            head = head or page['head']
+            all_rows.extend(page['rows'])
+
+        if not all_rows:
+            return None
+        return [head, {'row': all_rows}]
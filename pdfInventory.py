@@ -0,0 +1,115 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
+
+DEFAULT_SCAN_WORKERS = 8
+
+
+class PdfInventory:
+    """In-memory listing of every PDF under pdf_downloads/, built in one os.scandir pass
+
+    Files are grouped by their directory relative to the root ('' for the root itself, the BILL_ID for
+    the usual per-bill directories), each with its size and mtime. Lookups are dict hits instead of a
+    stat() per file, which is what makes existence checks cheap on a network mount.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.directories: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.errors: List[str] = []
+
+    @classmethod
+    def scan(cls, root: Path, workers: int = DEFAULT_SCAN_WORKERS, stat_files: bool = True) -> 'PdfInventory':
+        """List root with the top-level directories walked in parallel threads
+
+        With stat_files=False only names are collected, skipping the one stat() per file that sizes and
+        mtimes cost on platforms where scandir does not return them.
+        """
+        inventory = cls(root)
+        if not root.is_dir():
+            return inventory
+
+        files, subdirectories = inventory.scan_directory(root, '', stat_files)
+        inventory.directories[''] = files
+        # Directory listings are I/O bound and release the GIL, so threads overlap the round trips
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for listing in executor.map(lambda item: inventory.walk(*item, stat_files), subdirectories):
+                inventory.directories.update(listing)
+        return inventory
+
+    def scan_directory(self, path: Path, relative: str,
+                       stat_files: bool) -> Tuple[Dict[str, Dict[str, Any]], List[Tuple[Path, str]]]:
+        """PDF files of one directory and its subdirectories to visit next"""
+        files: Dict[str, Dict[str, Any]] = {}
+        subdirectories: List[Tuple[Path, str]] = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    # d_type from the listing itself, no stat() needed
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append((Path(entry.path), os.path.join(relative, entry.name)))
+                    elif entry.name.lower().endswith('.pdf'):
+                        files[entry.name] = self.describe_entry(entry, stat_files)
+        except OSError as error:
+            self.errors.append(f'{path}: {error}')
+        return files, subdirectories
+
+    def walk(self, path: Path, relative: str, stat_files: bool) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Listings of a directory tree, relative directory -> files"""
+        listings = {}
+        pending = [(path, relative)]
+        while pending:
+            current, current_relative = pending.pop()
+            files, subdirectories = self.scan_directory(current, current_relative, stat_files)
+            listings[current_relative] = files
+            pending.extend(subdirectories)
+        return listings
+
+    def describe_entry(self, entry: os.DirEntry, stat_files: bool) -> Dict[str, Any]:
+        """Size and mtime of a listed file; a link is described by its target, None if it dangles"""
+        info: Dict[str, Any] = {'is_link': entry.is_symlink(), 'size': None, 'mtime': None}
+        if stat_files:
+            try:
+                stat = entry.stat()
+                info['size'] = stat.st_size
+                info['mtime'] = stat.st_mtime
+            except OSError:
+                pass
+        return info
+
+    def contains(self, directory: str, filename: str) -> bool:
+        """Whether a file is on disk, e.g. contains(BILL_ID, filename)"""
+        return filename in self.directories.get(directory, {})
+
+    def get_path(self, directory: str, filename: str) -> Path:
+        """Full path of a listed file"""
+        return self.root / directory / filename
+
+    def iter_files(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """(directory, filename, listing) of every file, directories in sorted order"""
+        for directory in sorted(self.directories):
+            for filename, info in self.directories[directory].items():
+                yield directory, filename, info
+
+    def find_orphans(self, referenced: Iterable[Tuple[str, str]]) -> List[str]:
+        """Relative paths of files on disk that no conference row refers to"""
+        referenced = set(referenced)
+        return [os.path.join(directory, filename) for directory, filename, _ in self.iter_files()
+                if (directory, filename) not in referenced]
+
+    def total_size(self) -> int:
+        """Bytes of every listed file whose size is known"""
+        return sum(info['size'] or 0 for _, _, info in self.iter_files())
+
+    def __len__(self) -> int:
+        return sum(len(files) for files in self.directories.values())
+
+
+def print_orphans(orphans: List[str], limit: int = 20) -> None:
+    """Report files no conference row refers to, listing the first few"""
+    print(f'Orphaned files (on disk, not in any conference row): {len(orphans)}')
+    for path in orphans[:limit]:
+        print(f'  ? pdf_downloads/{path}')
+    if len(orphans) > limit:
+        print(f'  ... and {len(orphans) - limit} more')
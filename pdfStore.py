@@ -0,0 +1,175 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+PDF_STORE_DIRNAME = 'pdf_store'
+CONFERENCE_INDEX_FILENAME = 'conference_pdf_index.json'
+
+HASH_CHUNK_SIZE = 1024 * 1024
+PDF_MAGIC = b'%PDF-'
+PDF_TRAILER = b'%%EOF'
+# Readers accept the end-of-file marker anywhere in the last 1KB
+PDF_TRAILER_WINDOW = 1024
+
+
+def get_conference_rows(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Conference rows of a VCONFBILLCONFLIST result, or [] if it has none"""
+    api_response = result.get('api_response')
+    if not isinstance(api_response, list) or len(api_response) < 2 or not api_response[1]:
+        return []
+    rows = api_response[1].get('row')
+    return rows if isinstance(rows, list) else []
+
+
+def build_conference_index(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Map each DOWN_URL to its conference and every bill that lists it
+
+    The same plenary or committee meeting is linked from many bills, so this is the list of PDFs that
+    actually have to be downloaded.
+    """
+    index: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        for row in get_conference_rows(result):
+            download_url = row.get('DOWN_URL')
+            bill_id = row.get('BILL_ID') or result.get('BILL_ID')
+            if not download_url or not bill_id:
+                continue
+            conference = index.setdefault(download_url, {
+                'conference_id': row.get('CONF_ID'),
+                'download_url': download_url,
+                'bills': {}
+            })
+            conference['bills'].setdefault(bill_id, row)
+    return index
+
+
+def hash_into(digest: Any, path: Path) -> Any:
+    """Feed a file's bytes into a hashlib object, e.g. to continue hashing a resumed download"""
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 hex digest of a file"""
+    return hash_into(hashlib.sha256(), path).hexdigest()
+
+
+def has_pdf_magic(path: Path) -> bool:
+    """Whether a file starts with the %PDF- header"""
+    with open(path, 'rb') as f:
+        return f.read(len(PDF_MAGIC)) == PDF_MAGIC
+
+
+def check_pdf_file(path: Path, expected_digest: Optional[str] = None) -> Optional[str]:
+    """Why a PDF on disk is unusable (missing, empty, not a PDF, truncated, checksum mismatch), or None if it is fine"""
+    try:
+        size = path.stat().st_size
+        if size == 0:
+            return 'empty'
+        if not has_pdf_magic(path):
+            return 'not a PDF'
+        with open(path, 'rb') as f:
+            f.seek(max(0, size - PDF_TRAILER_WINDOW))
+            if PDF_TRAILER not in f.read():
+                return 'truncated'
+        if expected_digest and hash_file(path) != expected_digest:
+            return 'checksum mismatch'
+    except FileNotFoundError:
+        return 'missing'
+    except OSError as error:
+        return f'unreadable ({error})'
+    return None
+
+
+def link_file(source: Path, target: Path) -> str:
+    """Expose source at target as a hardlink, else a relative symlink, else a copy; returns which one"""
+    try:
+        os.link(source, target)
+        return 'hardlink'
+    except OSError:
+        pass
+    try:
+        # Relative, so the whole data directory can be moved
+        os.symlink(os.path.relpath(source, target.parent), target)
+        return 'symlink'
+    except OSError:
+        shutil.copy2(source, target)
+        return 'copy'
+
+
+class ContentAddressedPdfStore:
+    """PDF files stored once under pdf_store/<sha256[:2]>/<sha256>.pdf
+
+    Kept outside pdf_downloads/ so cleanupPdfFilenames.py and createPdfTrackingList.py, which walk the
+    per-bill directories, never see the store itself.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.temp_dir = root / 'tmp'
+
+    def get_path(self, digest: str) -> Path:
+        """Store path of the content with the given SHA-256 digest"""
+        return self.root / digest[:2] / f'{digest}.pdf'
+
+    def contains(self, digest: Optional[str]) -> bool:
+        """Whether content with this digest is stored"""
+        return bool(digest) and self.get_path(digest).exists()
+
+    def new_temp_path(self, name: str) -> Path:
+        """Scratch path for a download in progress"""
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        return self.temp_dir / f'{name}.part'
+
+    def add_temp_file(self, temp_path: Path, digest: str) -> Path:
+        """Move a finished download into place; identical content already stored is kept instead"""
+        store_path = self.get_path(digest)
+        if store_path.exists():
+            temp_path.unlink()
+        else:
+            store_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(temp_path, store_path)
+        return store_path
+
+    def add_existing_file(self, path: Path) -> str:
+        """Adopt a PDF downloaded before the store existed, without copying it; returns its digest"""
+        digest = hash_file(path)
+        store_path = self.get_path(digest)
+        if not store_path.exists():
+            store_path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(path, store_path)
+            except OSError:
+                shutil.copy2(path, store_path)
+        return digest
+
+    def link_into(self, digest: str, target: Path) -> Tuple[str, str]:
+        """Place the stored content at target, replacing a separate copy with the same content
+
+        Returns the link type and the digest of what is now at target. A different, intact PDF already
+        at target is kept: the link type is then 'existing' and the digest is that file's own.
+        """
+        store_path = self.get_path(digest)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.is_symlink() and not target.exists():
+            # Dangling link, e.g. to a store that was moved
+            target.unlink()
+        if target.exists():
+            if os.path.samefile(target, store_path):
+                return ('symlink' if target.is_symlink() else 'hardlink'), digest
+            target_digest = hash_file(target)
+            if target_digest != digest and check_pdf_file(target) is None:
+                # A different, intact PDF under the same name is left alone; a corrupt one is replaced
+                return 'existing', target_digest
+        # Built under a temporary name and renamed, so a bill directory never holds a half-copied file;
+        # an existing copy with the same bytes is swapped for the link to free the space
+        temp_target = target.with_name(target.name + '.link')
+        if temp_target.exists() or temp_target.is_symlink():
+            temp_target.unlink()
+        link_type = link_file(store_path, temp_target)
+        os.replace(temp_target, target)
+        return link_type, digest
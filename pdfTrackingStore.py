@@ -0,0 +1,144 @@
+import argparse
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
+from jsonBackend import read_json, write_json
+
+TRACKING_DB_FILENAME = 'pdf_tracking.sqlite'
+TRACKING_JSON_FILENAME = 'pdf_tracking_list.json'
+
+# Columns of a tracking entry, in the order of the pdf_tracking_list.json entries
+TRACKING_FIELDS = [
+    'bill_id', 'bill_name', 'conference_kind', 'conference_id', 'eraco', 'session', 'degree',
+    'conference_date', 'download_url', 'filename', 'full_path', 'relative_path', 'file_exists',
+    'sha256', 'store_path', 'link_type', 'tracked_date'
+]
+KEY_FIELDS = ['bill_id', 'conference_id', 'download_url']
+
+
+class PdfTrackingStore:
+    """Conference PDF tracking entries keyed by (bill_id, conference_id, download_url), backed by SQLite
+
+    Entries are upserted one row at a time instead of rewriting pdf_tracking_list.json, and the keys are
+    loaded into a dict on open so the already-downloaded check is O(1). The JSON file is only written
+    on demand by export_json; an existing one is imported the first time the database is created.
+    """
+
+    def __init__(self, db_path: Path, legacy_json_path: Optional[Path] = None):
+        self.db_path = db_path
+        created = not db_path.exists()
+        self.connection = sqlite3.connect(str(db_path))
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        columns = ', '.join(f'{field} {"INTEGER" if field == "file_exists" else "TEXT"}' for field in TRACKING_FIELDS)
+        self.connection.execute(f'''
+            CREATE TABLE IF NOT EXISTS pdf_tracking (
+                {columns},
+                PRIMARY KEY ({', '.join(KEY_FIELDS)})
+            )
+        ''')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS pdf_tracking_download_url ON pdf_tracking (download_url)')
+        self.connection.commit()
+        self.downloaded: Dict[Tuple[str, str, str], bool] = {
+            (bill_id, conference_id, download_url): bool(file_exists)
+            for bill_id, conference_id, download_url, file_exists in self.connection.execute(
+                'SELECT bill_id, conference_id, download_url, file_exists FROM pdf_tracking')
+        }
+
+        if created and legacy_json_path and legacy_json_path.exists():
+            entries = read_json(legacy_json_path).get('pdfs', [])
+            self.upsert_many(entries)
+            print(f'Imported {len(entries)} tracking entries from {legacy_json_path.name}')
+
+    def get_key(self, bill_id: Any, conference_id: Any, download_url: Any) -> Tuple[str, str, str]:
+        """Primary key of an entry"""
+        return str(bill_id), str(conference_id), str(download_url)
+
+    def is_downloaded(self, bill_id: Any, conference_id: Any, download_url: Any) -> bool:
+        """Whether the bill's copy of a PDF is tracked as present on disk"""
+        return self.downloaded.get(self.get_key(bill_id, conference_id, download_url), False)
+
+    def upsert(self, entry: Dict[str, Any], commit: bool = True) -> None:
+        """Insert an entry or update it; columns missing from entry keep their stored values"""
+        key = self.get_key(*(entry.get(field) for field in KEY_FIELDS))
+        fields = KEY_FIELDS + [field for field in TRACKING_FIELDS if field in entry and field not in KEY_FIELDS]
+        values = list(key) + [entry[field] for field in fields[len(KEY_FIELDS):]]
+        updates = ', '.join(f'{field} = excluded.{field}' for field in fields if field not in KEY_FIELDS)
+        on_conflict = f'UPDATE SET {updates}' if updates else 'NOTHING'
+        self.connection.execute(f'''
+            INSERT INTO pdf_tracking ({', '.join(fields)}) VALUES ({', '.join('?' for _ in fields)})
+            ON CONFLICT ({', '.join(KEY_FIELDS)}) DO {on_conflict}
+        ''', values)
+        if commit:
+            self.connection.commit()
+        if 'file_exists' in entry or key not in self.downloaded:
+            self.downloaded[key] = bool(entry.get('file_exists'))
+
+    def upsert_many(self, entries: Iterable[Dict[str, Any]]) -> None:
+        """Upsert several entries in one transaction"""
+        for entry in entries:
+            self.upsert(entry, commit=False)
+        self.connection.commit()
+
+    def iter_entries(self) -> Iterator[Dict[str, Any]]:
+        """Every entry in insertion order"""
+        cursor = self.connection.execute(f'SELECT {", ".join(TRACKING_FIELDS)} FROM pdf_tracking ORDER BY rowid')
+        for values in cursor:
+            entry = dict(zip(TRACKING_FIELDS, values))
+            entry['file_exists'] = bool(entry['file_exists'])
+            yield entry
+
+    def get_known_digests(self) -> Dict[str, str]:
+        """DOWN_URL -> SHA-256 of every stored PDF; kept files outside the store are not counted"""
+        return dict(self.connection.execute(
+            'SELECT download_url, sha256 FROM pdf_tracking WHERE sha256 IS NOT NULL AND store_path IS NOT NULL'))
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Entry counts for the JSON export and the run summaries"""
+        existing = sum(1 for file_exists in self.downloaded.values() if file_exists)
+        return {
+            'total_pdfs_tracked': len(self.downloaded),
+            'total_existing_files': existing,
+            'total_to_download': len(self.downloaded) - existing,
+            'generated_date': datetime.now().isoformat()
+        }
+
+    def export_json(self, path: Path) -> int:
+        """Write every entry in the pdf_tracking_list.json format; returns the number of entries"""
+        entries = list(self.iter_entries())
+        write_json(path, {'summary': self.get_summary(), 'pdfs': entries})
+        return len(entries)
+
+    def __len__(self) -> int:
+        return len(self.downloaded)
+
+    def close(self) -> None:
+        """Close the database connection"""
+        self.connection.close()
+
+
+def open_tracking_store(base_dir: Path) -> PdfTrackingStore:
+    """The tracking database of a data directory, importing its pdf_tracking_list.json on first use"""
+    return PdfTrackingStore(base_dir / TRACKING_DB_FILENAME, base_dir / TRACKING_JSON_FILENAME)
+
+
+def main():
+    """Export the PDF tracking database as pdf_tracking_list.json"""
+    parser = argparse.ArgumentParser(description='Export the PDF tracking database to JSON')
+    parser.add_argument('--output', type=Path, default=None,
+                       help=f'JSON file to write (default: {TRACKING_JSON_FILENAME})')
+
+    args = parser.parse_args()
+    base_dir = Path(__file__).parent
+    output_path = args.output or base_dir / TRACKING_JSON_FILENAME
+
+    store = open_tracking_store(base_dir)
+    try:
+        count = store.export_json(output_path)
+    finally:
+        store.close()
+    print(f'Exported {count} tracking entries to: {output_path}')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Set
+from billStatusIndex import BillStatusIndex
+from resultJournal import ResultJournal, dedupe_results
+
+
+class PerBillRun:
+    """Resume bookkeeping of one per-bill endpoint: previous results, result journal and status index
+
+    Results are journaled before their status is recorded, so a crash never marks an unsaved bill as
+    done and a restart only calls the bills that are still missing.
+    """
+
+    def __init__(self, label: str, existing_results: List[Dict[str, Any]], journal_path: Path, index_path: Path):
+        self.label = label
+        self.existing_results = existing_results
+        self.bills_to_process: List[Dict[str, Any]] = []
+        self.completed = 0
+        self.incremental = False
+        # Bills with a fresh success/no_data result, which clears them from the pending changed bills
+        self.fetched_bill_ids: Set[str] = set()
+        print(f'Found {len(existing_results)} existing {label} results')
+
+        # Results of an unfinished run are still in the journal and count as done
+        self.journal = ResultJournal(journal_path)
+        self.recovered_results = self.journal.load_results(repair=True)
+        if self.recovered_results:
+            print(f'Recovered {len(self.recovered_results)} {label} results from the journal of an unfinished run')
+
+        # Per-bill statuses live in a SQLite index so resume checks are O(1) per bill; it is checked
+        # against the results on every start, so only bills with a saved result are skipped
+        self.status_index = BillStatusIndex(index_path)
+        dropped, recorded = self.status_index.reconcile(chain(existing_results, self.recovered_results))
+        if dropped or recorded:
+            print(f'Reconciled {label} status index with the saved results: '
+                  f'{dropped} stale statuses dropped, {recorded} recorded')
+
+    def select_bills(self, bills: List[Dict[str, Any]], incremental: bool = False,
+                     retry_statuses: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """Bills that still need a call: no recorded result, or a status selected for retry"""
+        self.incremental = incremental
+        if incremental:
+            # Changed bills are re-queried, so drop their stale results
+            changed_bill_ids = {bill['BILL_ID'] for bill in bills}
+            self.status_index.remove_bills(changed_bill_ids)
+            self.existing_results = [r for r in self.existing_results if r.get('BILL_ID') not in changed_bill_ids]
+            print(f'Dropped stale {self.label} results for changed bills, {len(self.existing_results)} kept')
+
+        retry_statuses = list(retry_statuses)
+        self.bills_to_process = [
+            bill for bill in bills
+            if self.status_index.needs_call(bill['BILL_ID'], bill['AGE'], retry_statuses)
+        ]
+
+        if retry_statuses:
+            # The fresh result of a retried bill is journaled later and replaces the old one when compiling
+            print(f'Retrying {self.label} calls with status {", ".join(retry_statuses)}')
+
+        print(f'After skipping fetched bills: {len(self.bills_to_process)} bills need {self.label} API calls')
+        return self.bills_to_process
+
+    def has_work(self) -> bool:
+        """Whether there are bills to call or journaled results to compile"""
+        return bool(self.bills_to_process or self.recovered_results)
+
+    def handle_result(self, bill: Dict[str, Any], result: Any) -> None:
+        """Journal a finished call and record its status; result may be the exception the call raised"""
+        self.completed += 1
+        if isinstance(result, Exception):
+            print(f'Processing error for BILL_ID {bill["BILL_ID"]}: {result}')
+        else:
+            self.journal.append(result)
+            self.status_index.record(result['BILL_ID'], result['AGE'], result['status'], result.get('error'))
+            if result['status'] in ('success', 'no_data'):
+                self.fetched_bill_ids.add(result['BILL_ID'])
+        if self.completed % 100 == 0:
+            print(f'Progress: {self.completed}/{len(self.bills_to_process)} {self.label} results journaled')
+
+    def compile(self) -> Dict[str, Any]:
+        """Final results: previous results first, journaled results replacing them"""
+        self.journal.close()
+        if self.has_work():
+            results, duplicates_removed = dedupe_results(chain(self.existing_results, self.journal.iter_results()))
+        else:
+            results, duplicates_removed = self.existing_results, 0
+
+        summary = {
+            'total_bills_processed': len(results),
+            'successful_calls': sum(1 for r in results if r.get('status') == 'success'),
+            'failed_calls': sum(1 for r in results if r.get('status') == 'error'),
+            'no_data_calls': sum(1 for r in results if r.get('status') == 'no_data'),
+            'not_cached_calls': sum(1 for r in results if r.get('status') == 'not_cached'),
+            'processed_date': datetime.now().isoformat(),
+            'duplicates_removed': duplicates_removed
+        }
+        if not self.has_work():
+            summary['note'] = 'No new API calls made - all bills already processed'
+        return {'summary': summary, 'results': results}
+
+    def finish(self, saved: bool) -> None:
+        """Drop the journal once the compiled results are safely on disk, and close the index"""
+        if saved and self.has_work():
+            self.journal.clear()
+        else:
+            self.journal.close()
+        self.status_index.close()
@@ -0,0 +1,164 @@
+import asyncio
+import aiohttp
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+from responseCache import ResponseCache
+
+# Open API result codes that mean the server is overloaded or throttling us
+# ERROR-337: 일별 트래픽 제한 초과, ERROR-500: 서버 오류, ERROR-600/601: 데이터베이스 오류
+THROTTLE_RESULT_CODES = {'ERROR-337', 'ERROR-500', 'ERROR-600', 'ERROR-601'}
+
+
+def is_throttle_status(status: int) -> bool:
+    """Whether an HTTP status means the server is overloaded or throttling us (429 or 5xx)"""
+    return status == 429 or status >= 500
+
+
+def get_result_code(data: Any) -> Optional[str]:
+    """Extract RESULT.CODE from an Open API response envelope"""
+    try:
+        if not isinstance(data, dict):
+            return None
+
+        # Error responses look like {'RESULT': {'CODE': ..., 'MESSAGE': ...}}
+        if 'RESULT' in data:
+            return data['RESULT'].get('CODE')
+
+        # Normal responses look like {API: [{'head': [{'list_total_count': N}, {'RESULT': {...}}]}, {'row': [...]}]}
+        data_key = next(iter(data.keys()))
+        for entry in data[data_key][0].get('head', []):
+            if 'RESULT' in entry:
+                return entry['RESULT'].get('CODE')
+    except Exception:
+        pass
+    return None
+
+
+class HostBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def refill(self) -> None:
+        """Add the tokens accumulated since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class AdaptiveRateLimiter:
+    """Per-host token bucket that backs off on throttling signals and recovers on success"""
+
+    def __init__(self, requests_per_second: float = 5.0, burst: Optional[float] = None,
+                 min_rate: float = 0.2, backoff_factor: float = 0.5, recovery_step: Optional[float] = None):
+        self.max_rate = requests_per_second
+        self.capacity = burst if burst is not None else max(1.0, requests_per_second)
+        self.min_rate = min(min_rate, requests_per_second)
+        self.backoff_factor = backoff_factor
+        # Additive increase: recover to the configured rate after ~20 clean responses
+        self.recovery_step = recovery_step if recovery_step is not None else requests_per_second / 20
+        self.buckets: Dict[str, HostBucket] = {}
+
+    def get_bucket(self, url: str) -> HostBucket:
+        """Get or create the bucket for the host of a URL"""
+        host = urlparse(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = HostBucket(self.max_rate, self.capacity)
+        return self.buckets[host]
+
+    async def acquire(self, url: str) -> None:
+        """Wait until a request to the URL's host is allowed"""
+        bucket = self.get_bucket(url)
+        async with bucket.lock:
+            while True:
+                bucket.refill()
+                if bucket.tokens >= 1:
+                    bucket.tokens -= 1
+                    return
+                await asyncio.sleep((1 - bucket.tokens) / bucket.rate)
+
+    def backoff(self, url: str) -> None:
+        """Cut the host's rate after a throttling signal"""
+        bucket = self.get_bucket(url)
+        new_rate = max(self.min_rate, bucket.rate * self.backoff_factor)
+        if new_rate < bucket.rate:
+            print(f'Rate limiter: backing off {urlparse(url).netloc} to {new_rate:.2f} req/s')
+        bucket.rate = new_rate
+        bucket.tokens = 0
+
+    def recover(self, url: str) -> None:
+        """Raise the host's rate back towards the configured maximum"""
+        bucket = self.get_bucket(url)
+        bucket.rate = min(self.max_rate, bucket.rate + self.recovery_step)
+
+    def record_response(self, url: str, status: int, result_code: Optional[str] = None) -> None:
+        """Adjust the host's rate from an HTTP status and optional Open API result code"""
+        if is_throttle_status(status) or result_code in THROTTLE_RESULT_CODES:
+            self.backoff(url)
+        else:
+            self.recover(url)
+
+    def record_error(self, url: str) -> None:
+        """Treat a transport error (timeout, reset) as a throttling signal"""
+        self.backoff(url)
+
+
+class BandwidthLimiter:
+    """Global byte-rate cap shared by concurrent downloads
+
+    A token bucket in bytes that may go into debt: a chunk is always accepted, and the caller then
+    sleeps until the bucket is back to zero, so concurrent readers together stay near the cap.
+    """
+
+    def __init__(self, bytes_per_second: float, burst: Optional[float] = None):
+        self.rate = bytes_per_second
+        self.capacity = burst if burst is not None else bytes_per_second
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def consume(self, amount: int) -> None:
+        """Account for amount bytes just received, waiting if the cap is exceeded"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate) - amount
+        self.updated = now
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+async def fetch_json(session: aiohttp.ClientSession, url: str, rate_limiter: AdaptiveRateLimiter,
+                     cache: Optional[ResponseCache] = None, refresh: bool = False, **kwargs) -> Any:
+    """GET a JSON document through the response cache and rate limiter, reporting the outcome back to it
+
+    With refresh=True the cached copy is ignored and replaced by the fresh response.
+    """
+    if cache is not None and not refresh:
+        cached = cache.get(url)
+        if cached is not None:
+            return cached
+
+    await rate_limiter.acquire(url)
+
+    status = None
+    try:
+        async with session.get(url, **kwargs) as response:
+            status = response.status
+            response.raise_for_status()
+            data = await response.json()
+    except Exception:
+        if status is None:
+            rate_limiter.record_error(url)
+        else:
+            rate_limiter.record_response(url, status)
+        raise
+
+    result_code = get_result_code(data)
+    rate_limiter.record_response(url, status, result_code)
+
+    # Only cache real answers, never error envelopes
+    if cache is not None and not (result_code or '').startswith('ERROR-'):
+        cache.put(url, data)
+    return data
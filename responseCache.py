@@ -0,0 +1,214 @@
+import argparse
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse, parse_qsl, urlencode
+from jsonBackend import read_json, write_json
+
+# Assembly term that is still in session; every earlier term is historically closed
+CURRENT_TERM = 22
+
+_NOT_SET = object()
+
+
+class OfflineCacheMiss(Exception):
+    """Raised in offline mode when a response is not in the cache"""
+
+
+def normalize_url(url: str) -> str:
+    """Drop the API key and sort query parameters so equivalent requests share a cache entry"""
+    parsed = urlparse(url)
+    params = sorted((key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+                    if key.upper() != 'KEY')
+    return f'{parsed.scheme}://{parsed.netloc}{parsed.path}?{urlencode(params)}'
+
+
+def get_endpoint_and_term(url: str) -> Tuple[str, Optional[int]]:
+    """Endpoint name (last path segment) and AGE/DAESU term of an Open API URL"""
+    parsed = urlparse(url)
+    endpoint = parsed.path.rstrip('/').split('/')[-1]
+    params = dict(parse_qsl(parsed.query))
+    term = params.get('AGE') or params.get('DAESU')
+    try:
+        return endpoint, int(term) if term else None
+    except ValueError:
+        return endpoint, None
+
+
+class CacheTtlPolicy:
+    """Decides how long a cached response stays fresh, per endpoint and per term
+
+    TTLs are in hours; None means the entry never expires.
+    Lookup order: endpoint+term override, term override, closed term rule, endpoint default, global default.
+    """
+
+    def __init__(self, default_ttl_hours: Optional[float] = 6.0, current_term: int = CURRENT_TERM,
+                 closed_term_ttl_hours: Optional[float] = None,
+                 endpoint_ttl_hours: Optional[Dict[str, Optional[float]]] = None,
+                 term_ttl_hours: Optional[Dict[int, Optional[float]]] = None,
+                 endpoint_term_ttl_hours: Optional[Dict[str, Dict[int, Optional[float]]]] = None):
+        self.default_ttl_hours = default_ttl_hours
+        self.current_term = current_term
+        self.closed_term_ttl_hours = closed_term_ttl_hours
+        self.endpoint_ttl_hours = endpoint_ttl_hours or {}
+        self.term_ttl_hours = term_ttl_hours or {}
+        self.endpoint_term_ttl_hours = endpoint_term_ttl_hours or {}
+
+    @classmethod
+    def from_file(cls, config_path: Path) -> 'CacheTtlPolicy':
+        """Load a policy from a JSON file
+
+        Example:
+            {"default_ttl_hours": 6, "current_term": 22, "closed_term_ttl_hours": null,
+             "endpoints": {"ALLNAMEMBER": 24}, "terms": {"21": 168},
+             "endpoint_terms": {"nzmimeepazxkubdpn": {"22": 2}}}
+        """
+        config = read_json(config_path)
+
+        return cls(
+            default_ttl_hours=config.get('default_ttl_hours', 6.0),
+            current_term=config.get('current_term', CURRENT_TERM),
+            closed_term_ttl_hours=config.get('closed_term_ttl_hours'),
+            endpoint_ttl_hours=config.get('endpoints', {}),
+            term_ttl_hours={int(term): hours for term, hours in config.get('terms', {}).items()},
+            endpoint_term_ttl_hours={
+                endpoint: {int(term): hours for term, hours in terms.items()}
+                for endpoint, terms in config.get('endpoint_terms', {}).items()
+            }
+        )
+
+    def get_ttl_hours(self, url: str) -> Optional[float]:
+        """TTL in hours for a URL, or None if it never expires"""
+        endpoint, term = get_endpoint_and_term(url)
+
+        if term is not None:
+            ttl = self.endpoint_term_ttl_hours.get(endpoint, {}).get(term, _NOT_SET)
+            if ttl is not _NOT_SET:
+                return ttl
+            ttl = self.term_ttl_hours.get(term, _NOT_SET)
+            if ttl is not _NOT_SET:
+                return ttl
+            if term < self.current_term:
+                return self.closed_term_ttl_hours
+
+        return self.endpoint_ttl_hours.get(endpoint, self.default_ttl_hours)
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of Open API JSON responses with TTL and LRU size cap"""
+
+    def __init__(self, cache_dir: Path, ttl_policy: Optional[CacheTtlPolicy] = None,
+                 max_bytes: Optional[int] = 2 * 1024 ** 3, offline: bool = False):
+        self.cache_dir = cache_dir
+        self.ttl_policy = ttl_policy or CacheTtlPolicy()
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.total_bytes = sum(path.stat().st_size for path in self.cache_dir.glob('*/*.json'))
+
+    def get_entry_path(self, url: str) -> Path:
+        """Cache file for a URL, sharded by the first two hex digits of its hash"""
+        digest = hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+        return self.cache_dir / digest[:2] / f'{digest}.json'
+
+    def get(self, url: str) -> Optional[Any]:
+        """Return a fresh cached response, or None on a miss
+
+        In offline mode stale entries are served too, and a miss raises OfflineCacheMiss.
+        """
+        entry_path = self.get_entry_path(url)
+        try:
+            entry = read_json(entry_path)
+        except (OSError, ValueError):
+            entry = None
+
+        if entry is not None:
+            ttl_hours = self.ttl_policy.get_ttl_hours(url)
+            is_fresh = ttl_hours is None or time.time() - entry['stored_at'] < ttl_hours * 3600
+            if is_fresh or self.offline:
+                # Touch the file so eviction sees it as recently used
+                os.utime(entry_path)
+                self.hits += 1
+                return entry['data']
+
+        self.misses += 1
+        if self.offline:
+            raise OfflineCacheMiss(f'Not in cache (offline mode): {normalize_url(url)}')
+        return None
+
+    def put(self, url: str, data: Any) -> None:
+        """Store a response and evict least recently used entries beyond the size cap"""
+        entry_path = self.get_entry_path(url)
+        entry_path.parent.mkdir(exist_ok=True)
+
+        previous_size = entry_path.stat().st_size if entry_path.exists() else 0
+        temp_path = entry_path.with_suffix('.tmp')
+        write_json(temp_path, {'url': normalize_url(url), 'stored_at': time.time(), 'data': data}, compact=True)
+        os.replace(temp_path, entry_path)
+
+        self.total_bytes += entry_path.stat().st_size - previous_size
+        if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache is under 90% of its cap"""
+        entries = []
+        for path in self.cache_dir.glob('*/*.json'):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        target = self.max_bytes * 0.9
+        self.total_bytes = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in entries:
+            if self.total_bytes <= target:
+                break
+            path.unlink()
+            self.total_bytes -= size
+            evicted += 1
+        print(f'Response cache: evicted {evicted} entries ({self.total_bytes / 1024 ** 2:.1f} MB kept)')
+
+    def print_stats(self) -> None:
+        """Print hit/miss counts"""
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0
+        print(f'Response cache: {self.hits} hits, {self.misses} misses ({hit_rate:.1f}% hit rate)')
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the response cache command line options"""
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Disable the on-disk response cache')
+    parser.add_argument('--offline', action='store_true',
+                       help='Serve responses only from the cache, never calling the API')
+    parser.add_argument('--cache-dir', type=Path, default=None,
+                       help='Response cache directory (default: api_cache/ next to the scripts)')
+    parser.add_argument('--cache-ttl-hours', type=float, default=6.0,
+                       help='TTL for the current term and term-less endpoints (default: 6); closed terms never expire')
+    parser.add_argument('--cache-config', type=Path, default=None,
+                       help='JSON file with per-endpoint and per-term TTLs (overrides --cache-ttl-hours)')
+    parser.add_argument('--cache-max-mb', type=float, default=2048,
+                       help='Size cap of the response cache before LRU eviction (default: 2048)')
+
+
+def create_cache_from_args(args: argparse.Namespace, base_dir: Path) -> Optional[ResponseCache]:
+    """Build a ResponseCache from parsed command line options"""
+    if args.no_cache and not args.offline:
+        return None
+
+    if args.cache_config:
+        ttl_policy = CacheTtlPolicy.from_file(args.cache_config)
+    else:
+        ttl_policy = CacheTtlPolicy(default_ttl_hours=args.cache_ttl_hours)
+
+    return ResponseCache(
+        args.cache_dir or base_dir / 'api_cache',
+        ttl_policy,
+        max_bytes=int(args.cache_max_mb * 1024 ** 2),
+        offline=args.offline
+    )
@@ -0,0 +1,81 @@
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Iterator, Optional, IO, Tuple
+from jsonBackend import loads, dumps_bytes
+
+VOTE_RESULTS_JOURNAL = 'assembly_bills_api_results.journal.ndjson'
+CONFERENCE_RESULTS_JOURNAL = 'assembly_bills_conference_api_results.journal.ndjson'
+
+
+def dedupe_results(results: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """Keep one result per (BILL_ID, AGE), the latest one winning; returns (results, duplicates removed)"""
+    latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    total = 0
+    for result in results:
+        total += 1
+        key = (str(result.get('BILL_ID')), str(result.get('AGE')))
+        # Re-inserting moves the key to the end, so the output follows the order results were produced
+        latest.pop(key, None)
+        latest[key] = result
+    return list(latest.values()), total - len(latest)
+
+
+class ResultJournal:
+    """Append-only NDJSON journal of per-bill API results
+
+    Every result is flushed as soon as it is appended, so a crash loses at most the record being written.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.file: Optional[IO[bytes]] = None
+        self.appended = 0
+
+    def iter_results(self, repair: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield every complete record in the journal, skipping a torn trailing line
+
+        With repair=True the torn line is truncated away; only the writer should do that, before appending.
+        """
+        if not self.path.exists():
+            return
+
+        good_offset = 0
+        torn = False
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    result = loads(line)
+                except ValueError:
+                    torn = True
+                    break
+                good_offset += len(line)
+                yield result
+
+        if torn and repair:
+            # Cut the partial record so later appends start on a clean line
+            print(f'Dropping a partially written record at the end of {self.path.name}')
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_offset)
+
+    def load_results(self, repair: bool = False) -> List[Dict[str, Any]]:
+        """Every complete record in the journal"""
+        return list(self.iter_results(repair))
+
+    def append(self, result: Dict[str, Any]) -> None:
+        """Append one result and flush it to the OS"""
+        if self.file is None:
+            self.file = open(self.path, 'ab')
+        self.file.write(dumps_bytes(result) + b'\n')
+        self.file.flush()
+        self.appended += 1
+
+    def close(self) -> None:
+        """Close the journal file"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def clear(self) -> None:
+        """Delete the journal once its results are compiled into the final file"""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
@@ -0,0 +1,38 @@
+import asyncio
+import random
+from typing import Any, Awaitable, Callable, Tuple, Type
+from responseCache import OfflineCacheMiss
+
+# Failures that another attempt cannot fix, re-raised without backoff
+NON_RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (OfflineCacheMiss,)
+
+
+class RetryPolicy:
+    """Bounded retries with jittered exponential backoff for a single request"""
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 30.0,
+                 non_retryable: Tuple[Type[BaseException], ...] = NON_RETRYABLE_ERRORS):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.non_retryable = non_retryable
+
+    def get_delay(self, attempt: int) -> float:
+        """Full-jitter delay before the given retry attempt (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    async def run(self, operation: Callable[[], Awaitable[Any]], label: str) -> Any:
+        """Run an async operation, retrying on any exception but the non-retryable ones until attempts run out"""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return await operation()
+            except self.non_retryable:
+                raise
+            except Exception as error:
+                if attempt == self.max_attempts:
+                    print(f'Giving up on {label} after {attempt} attempts: {error}')
+                    raise
+
+                delay = self.get_delay(attempt)
+                print(f'Retry {attempt}/{self.max_attempts - 1} for {label} in {delay:.1f}s: {error}')
+                await asyncio.sleep(delay)
@@ -0,0 +1,59 @@
+import hashlib
+from pathlib import Path
+
+from downloadConferencePdfs import ConferencePdfDownloader
+from pdfStore import ContentAddressedPdfStore, PDF_STORE_DIRNAME
+from pdfTrackingStore import open_tracking_store
+
+STORED_PDF = b'%PDF-1.4\nstored conference transcript\n%%EOF\n'
+EXISTING_PDF = b'%PDF-1.4\na different transcript already on disk\n%%EOF\n'
+
+
+def store_pdf(base_dir: Path, data: bytes) -> str:
+    """Put data into the base directory's PDF store and return its digest"""
+    store = ContentAddressedPdfStore(base_dir / PDF_STORE_DIRNAME)
+    temp_path = store.new_temp_path('test')
+    temp_path.write_bytes(data)
+    digest = hashlib.sha256(data).hexdigest()
+    store.add_temp_file(temp_path, digest)
+    return digest
+
+
+def test_link_into_keeps_a_different_existing_pdf(tmp_path):
+    digest = store_pdf(tmp_path, STORED_PDF)
+    target = tmp_path / 'pdf_downloads' / 'BILL' / 'conference.pdf'
+    target.parent.mkdir(parents=True)
+    target.write_bytes(EXISTING_PDF)
+
+    link_type, target_digest = ContentAddressedPdfStore(tmp_path / PDF_STORE_DIRNAME).link_into(digest, target)
+
+    assert link_type == 'existing'
+    assert target_digest == hashlib.sha256(EXISTING_PDF).hexdigest()
+    assert target.read_bytes() == EXISTING_PDF
+
+
+def test_audit_keeps_a_different_existing_pdf_after_linking(tmp_path):
+    digest = store_pdf(tmp_path, STORED_PDF)
+    downloader = ConferencePdfDownloader(base_dir=tmp_path)
+    row = {'CONF_KND': 'KND', 'CONF_ID': '1', 'ERACO': 'E', 'SESS': 'S', 'DGR': 'D', 'CONF_DT': '20240101',
+           'BILL_NM': 'bill'}
+    target = downloader.downloads_dir / 'BILL' / downloader.get_pdf_filename(row)
+    target.parent.mkdir(parents=True)
+    target.write_bytes(EXISTING_PDF)
+    job = {'conference': {'download_url': 'http://example.test/1.pdf'}, 'pending': {'BILL': row}}
+
+    downloader.tracking = open_tracking_store(tmp_path)
+    try:
+        placements = downloader.place_conference_pdf(job, digest)
+        assert downloader.link_conference_pdf(job, digest, placements) == (1, 0)
+        entry, = downloader.tracking.iter_entries()
+    finally:
+        downloader.tracking.close()
+        downloader.tracking = None
+
+    assert entry['sha256'] == hashlib.sha256(EXISTING_PDF).hexdigest()
+    assert entry['store_path'] is None
+    assert entry['link_type'] == 'existing'
+
+    assert downloader.audit_downloads() == 0
+    assert target.read_bytes() == EXISTING_PDF
@@ -0,0 +1,223 @@
+import argparse
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+from jsonBackend import read_json, write_json
+
+VOTE_STORE_FILENAME = 'assembly_bills_api_results.votes.json'
+VOTE_STORE_FORMAT = 'assembly-vote-store'
+VOTE_STORE_VERSION = 1
+
+# Per-member columns, dictionary-encoded once per term instead of repeated on every vote row
+MEMBER_FIELDS = ['HG_NM', 'HJ_NM', 'POLY_NM', 'ORIG_NM', 'MEMBER_NO', 'POLY_CD', 'ORIG_CD', 'MONA_CD']
+RESULT_FIELD = 'RESULT_VOTE_MOD'
+
+
+def get_envelope_rows(result: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Vote rows of a result whose api_response is the usual [head, {'row': [...]}], else None"""
+    api_response = result.get('api_response')
+    if not isinstance(api_response, list) or len(api_response) != 2 or not isinstance(api_response[1], dict):
+        return None
+    rows = api_response[1].get('row')
+    if not isinstance(rows, list) or not rows or len(api_response[1]) != 1:
+        return None
+    return rows
+
+
+class VoteStoreEncoder:
+    """Builds the dictionary-encoded form of compiled vote results
+
+    Each bill keeps its bill-level columns (BILL_NAME, LAW_TITLE, BILL_URL, ...) once. Member columns
+    go into a per-term member dictionary and RESULT_VOTE_MOD into a result code dictionary, so a vote
+    is [bill_idx, member_idx, result_code] plus any column that really differs between a bill's votes.
+    """
+
+    def __init__(self):
+        self.layouts: List[Dict[str, List[str]]] = []
+        self.layout_indexes: Dict[Tuple[Any, ...], int] = {}
+        self.result_codes: List[Any] = []
+        self.result_code_indexes: Dict[Any, int] = {}
+        self.terms: Dict[str, List[List[Any]]] = {}
+        self.member_indexes: Dict[str, Dict[Tuple[Any, ...], int]] = {}
+        self.bills: List[Dict[str, Any]] = []
+        self.votes: List[List[Any]] = []
+
+    def get_layout(self, fields: Tuple[str, ...], rows: List[Dict[str, Any]]) -> int:
+        """Index of the column layout of a bill's rows, splitting columns by where they are stored"""
+        member = [field for field in fields if field in MEMBER_FIELDS]
+        others = [field for field in fields if field not in MEMBER_FIELDS and field != RESULT_FIELD]
+        bill = [field for field in others if all(row[field] == rows[0][field] for row in rows)]
+        vote = [field for field in others if field not in bill]
+        key = (fields, tuple(bill))
+        if key not in self.layout_indexes:
+            self.layout_indexes[key] = len(self.layouts)
+            self.layouts.append({'fields': list(fields), 'bill': bill, 'member': member, 'vote': vote,
+                                 'result': [RESULT_FIELD] if RESULT_FIELD in fields else []})
+        return self.layout_indexes[key]
+
+    def get_member(self, term: str, row: Dict[str, Any]) -> int:
+        """Index of a member in the term's member dictionary"""
+        values = tuple(row.get(field) for field in MEMBER_FIELDS)
+        indexes = self.member_indexes.setdefault(term, {})
+        if values not in indexes:
+            indexes[values] = len(indexes)
+            self.terms.setdefault(term, []).append(list(values))
+        return indexes[values]
+
+    def get_result_code(self, value: Any) -> int:
+        """Index of a RESULT_VOTE_MOD value"""
+        if value not in self.result_code_indexes:
+            self.result_code_indexes[value] = len(self.result_codes)
+            self.result_codes.append(value)
+        return self.result_code_indexes[value]
+
+    def add_result(self, result: Dict[str, Any]) -> None:
+        """Encode one per-bill API result"""
+        bill_idx = len(self.bills)
+        entry = {'result': {key: value for key, value in result.items() if key != 'api_response'}}
+        rows = get_envelope_rows(result)
+        fields = tuple(rows[0].keys()) if rows else None
+
+        if rows is None or any(tuple(row.keys()) != fields for row in rows):
+            # No data, an error, or rows with differing columns: kept as they are
+            entry['result']['api_response'] = result.get('api_response')
+            self.bills.append(entry)
+            return
+
+        layout_idx = self.get_layout(fields, rows)
+        layout = self.layouts[layout_idx]
+        term = str(result.get('AGE'))
+        entry['head'] = result['api_response'][0]
+        entry['layout'] = layout_idx
+        entry['values'] = [rows[0][field] for field in layout['bill']]
+        self.bills.append(entry)
+
+        for row in rows:
+            vote = [bill_idx, self.get_member(term, row),
+                    self.get_result_code(row[RESULT_FIELD]) if layout['result'] else None]
+            vote.extend(row[field] for field in layout['vote'])
+            self.votes.append(vote)
+
+    def to_document(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """The JSON document written to disk"""
+        return {
+            'format': VOTE_STORE_FORMAT,
+            'version': VOTE_STORE_VERSION,
+            'summary': summary,
+            'member_fields': MEMBER_FIELDS,
+            'result_codes': self.result_codes,
+            'layouts': self.layouts,
+            'terms': self.terms,
+            'bills': self.bills,
+            'votes': self.votes
+        }
+
+
+def decode_vote_store(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild {'summary', 'results'} with the same per-bill results and vote row dicts as the JSON file"""
+    if document.get('format') != VOTE_STORE_FORMAT or document.get('version') != VOTE_STORE_VERSION:
+        raise ValueError(f'Not a version {VOTE_STORE_VERSION} vote store')
+
+    member_positions = {field: position for position, field in enumerate(document['member_fields'])}
+    result_codes = document['result_codes']
+
+    # Per layout, where each column of a row comes from: bill values, member entry, result code or the vote
+    layout_sources = []
+    for layout in document['layouts']:
+        sources = {field: ('bill', index) for index, field in enumerate(layout['bill'])}
+        sources.update({field: ('member', member_positions[field]) for field in layout['member']})
+        sources.update({field: ('result', 0) for field in layout['result']})
+        sources.update({field: ('vote', 3 + index) for index, field in enumerate(layout['vote'])})
+        layout_sources.append([(field, *sources[field]) for field in layout['fields']])
+
+    rows_by_bill: List[List[Dict[str, Any]]] = [[] for _ in document['bills']]
+    bills = document['bills']
+    terms = document['terms']
+    for vote in document['votes']:
+        bill = bills[vote[0]]
+        members = terms[str(bill['result'].get('AGE'))]
+        member = members[vote[1]]
+        values = bill['values']
+        row = {}
+        for field, source, index in layout_sources[bill['layout']]:
+            if source == 'bill':
+                row[field] = values[index]
+            elif source == 'member':
+                row[field] = member[index]
+            elif source == 'result':
+                row[field] = result_codes[vote[2]]
+            else:
+                row[field] = vote[index]
+        rows_by_bill[vote[0]].append(row)
+
+    results = []
+    for bill, rows in zip(bills, rows_by_bill):
+        result = dict(bill['result'])
+        if 'layout' in bill:
+            result['api_response'] = [bill['head'], {'row': rows}]
+        results.append(result)
+
+    return {'summary': document.get('summary', {}), 'results': results}
+
+
+def write_vote_store(path: Path, compiled_data: Dict[str, Any]) -> int:
+    """Write compiled vote results as a compact vote store and return its size in bytes"""
+    encoder = VoteStoreEncoder()
+    for result in compiled_data.get('results', []):
+        encoder.add_result(result)
+    return write_json(path, encoder.to_document(compiled_data.get('summary', {})), compact=True)
+
+
+def read_vote_store(path: Path) -> Dict[str, Any]:
+    """Read a vote store back into the {'summary', 'results'} shape of assembly_bills_api_results.json"""
+    return decode_vote_store(read_json(path))
+
+
+def load_compiled_results(base_dir: Path) -> Optional[Tuple[Dict[str, Any], str]]:
+    """(compiled results, file name) from whichever of the vote store and the JSON file is newer, or None"""
+    candidates = [path for path in (base_dir / VOTE_STORE_FILENAME, base_dir / 'assembly_bills_api_results.json')
+                  if path.exists()]
+    if not candidates:
+        return None
+    # A run with --output-format store leaves an older JSON file behind, so the newest one wins
+    path = max(candidates, key=lambda candidate: candidate.stat().st_mtime)
+    if path.name == VOTE_STORE_FILENAME:
+        return read_vote_store(path), path.name
+    return read_json(path), path.name
+
+
+def main():
+    """Convert assembly_bills_api_results.json into a vote store and report the size and load time"""
+    parser = argparse.ArgumentParser(description='Convert vote results JSON into the compact vote store')
+    parser.add_argument('--input', type=Path, default=Path(__file__).parent / 'assembly_bills_api_results.json',
+                       help='Vote results JSON file (default: assembly_bills_api_results.json)')
+    parser.add_argument('--output', type=Path, default=None,
+                       help=f'Vote store file (default: {VOTE_STORE_FILENAME} next to the input)')
+    parser.add_argument('--verify', action='store_true',
+                       help='Read the store back and check it rebuilds the same results')
+
+    args = parser.parse_args()
+    output_path = args.output or args.input.with_name(VOTE_STORE_FILENAME)
+
+    started = time.perf_counter()
+    compiled_data = read_json(args.input)
+    json_seconds = time.perf_counter() - started
+
+    store_size = write_vote_store(output_path, compiled_data)
+    json_size = args.input.stat().st_size
+    print(f'Vote store saved to: {output_path}')
+    print(f'Size: {json_size} -> {store_size} bytes ({json_size / max(1, store_size):.1f}x smaller)')
+
+    started = time.perf_counter()
+    rebuilt = read_vote_store(output_path)
+    store_seconds = time.perf_counter() - started
+    print(f'Load time: JSON {json_seconds:.2f}s, vote store {store_seconds:.2f}s')
+
+    if args.verify:
+        if rebuilt['results'] == compiled_data.get('results', []):
+            print('Verification: vote store rebuilds identical results')
+        else:
+            raise SystemExit('Verification failed: rebuilt results differ from the JSON file')
+
+if __name__ == "__main__":
+    main()
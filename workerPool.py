@@ -0,0 +1,32 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+async def run_worker_pool(items: Iterable[T], worker: Callable[[T], Awaitable[R]],
+                          on_result: Callable[[T, Any], None], concurrency: int) -> None:
+    """Run worker over items with at most `concurrency` calls in flight
+
+    Each worker pulls the next item as soon as its previous call finishes, so one slow item never
+    holds up the others. on_result(item, result) runs as each call completes; an exception raised
+    by worker is passed as the result.
+    """
+    pending = iter(items)
+
+    async def run_worker() -> None:
+        # The iterator is shared, so every worker takes the next unclaimed item
+        for item in pending:
+            try:
+                result = await worker(item)
+            except Exception as error:
+                result = error
+            on_result(item, result)
+
+    workers = [asyncio.create_task(run_worker()) for _ in range(max(1, concurrency))]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()